@@ -0,0 +1,214 @@
+// Reference timings for the wrapper-overhead benchmark. Solves the same
+// Robertson (IDA) and Van der Pol (CVODE) problems as tests/C_programs, with
+// matching tolerances and solver settings, but without any file output.
+//
+// Usage: overhead <repeats>
+//
+// For each problem, prints one CSV line "name,seconds,nsteps,ncalls" where
+// 'seconds' is the fastest of the repeated solves and 'ncalls' counts all
+// residual/right-hand-side calls, including difference quotient Jacobians.
+
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include <ida/ida.h>
+#include <cvode/cvode.h>
+#include <nvector/nvector_serial.h>
+#include <sundials/sundials_types.h>
+#include <sunmatrix/sunmatrix_dense.h>
+#include <sunlinsol/sunlinsol_dense.h>
+
+static double wall_time(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + 1.0e-9*ts.tv_nsec;
+}
+
+static int robertson_res(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                         void *data) {
+
+    sunrealtype *yy_p = N_VGetArrayPointer(yy);
+    sunrealtype *yp_p = N_VGetArrayPointer(yp);
+    sunrealtype *rr_p = N_VGetArrayPointer(rr);
+
+    rr_p[0] = yp_p[0] + 0.04*yy_p[0] - 1.0e4*yy_p[1]*yy_p[2];
+    rr_p[1] = yp_p[1] - 0.04*yy_p[0] + 1.0e4*yy_p[1]*yy_p[2] + 3.0e7*yy_p[1]*yy_p[1];
+    rr_p[2] = yy_p[0] + yy_p[1] + yy_p[2] - 1.0;
+
+    return 0;
+}
+
+static int van_der_pol_rhs(sunrealtype t, N_Vector yy, N_Vector yp,
+                           void *data) {
+
+    sunrealtype *yy_p = N_VGetArrayPointer(yy);
+    sunrealtype *yp_p = N_VGetArrayPointer(yp);
+
+    yp_p[0] = yy_p[1];
+    yp_p[1] = (1.0 - yy_p[0]*yy_p[0])*yy_p[1] - yy_p[0];
+
+    return 0;
+}
+
+static int robertson(SUNContext ctx, double *seconds, long *nsteps,
+                     long *ncalls) {
+    void *mem;
+    N_Vector yy, yp, algidx;
+    sunrealtype *yy_p, *yp_p, *alg_p;
+    sunrealtype tout, tend;
+    SUNMatrix A;
+    SUNLinearSolver LS;
+    long nre, nreLS;
+    int flag = 0;
+    int log_num = 50;
+    sunrealtype step = 12.0 / (log_num - 1.0);
+
+    double start = wall_time();
+
+    yy = N_VNew_Serial(3, ctx);
+    yy_p = N_VGetArrayPointer(yy);
+    yy_p[0] = 1.0;
+    yy_p[1] = 0.0;
+    yy_p[2] = 0.0;
+
+    yp = N_VNew_Serial(3, ctx);
+    yp_p = N_VGetArrayPointer(yp);
+    yp_p[0] = -0.04;
+    yp_p[1] = 0.04;
+    yp_p[2] = 0.0;
+
+    algidx = N_VNew_Serial(3, ctx);
+    alg_p = N_VGetArrayPointer(algidx);
+    alg_p[0] = 1.0;
+    alg_p[1] = 1.0;
+    alg_p[2] = 0.0;
+
+    tend = 4.0*pow(10, 6.0);
+
+    mem = IDACreate(ctx);
+    IDAInit(mem, robertson_res, 4.0e-6, yy, yp);
+    IDASStolerances(mem, 1.0e-4, 1.0e-8);
+
+    A = SUNDenseMatrix(3, 3, ctx);
+    LS = SUNLinSol_Dense(yy, A, ctx);
+    IDASetLinearSolver(mem, LS, A);
+
+    IDASetMaxNonlinIters(mem, 4);
+    IDASetMaxConvFails(mem, 10);
+    IDASetId(mem, algidx);
+    IDASetMaxOrd(mem, 5);
+    IDASetMaxNumSteps(mem, 500);
+    IDASetStopTime(mem, tend);
+
+    for (int i = 1; i < log_num; i++) {
+        flag = IDASolve(mem, 4.0*pow(10, -6.0 + i*step), &tout, yy, yp,
+                        IDA_NORMAL);
+        if (flag < 0 || flag == IDA_TSTOP_RETURN) {
+            break;
+        }
+    }
+
+    *seconds = wall_time() - start;
+
+    IDAGetNumSteps(mem, nsteps);
+    IDAGetNumResEvals(mem, &nre);
+    IDAGetNumLinResEvals(mem, &nreLS);
+    *ncalls = nre + nreLS;
+
+    N_VDestroy(yy);
+    N_VDestroy(yp);
+    N_VDestroy(algidx);
+    SUNMatDestroy(A);
+    SUNLinSolFree(LS);
+    IDAFree(&mem);
+
+    return flag < 0 ? flag : 0;
+}
+
+static int van_der_pol(SUNContext ctx, double *seconds, long *nsteps,
+                       long *ncalls) {
+    void *mem;
+    N_Vector yy;
+    sunrealtype *yy_p;
+    sunrealtype tout;
+    SUNMatrix A;
+    SUNLinearSolver LS;
+    long nfe, nfeLS;
+    int flag = 0;
+    int lin_num = 500;
+    sunrealtype step = 20.0 / (lin_num - 1.0);
+
+    double start = wall_time();
+
+    yy = N_VNew_Serial(2, ctx);
+    yy_p = N_VGetArrayPointer(yy);
+    yy_p[0] = 2.0;
+    yy_p[1] = 0.0;
+
+    mem = CVodeCreate(CV_BDF, ctx);
+    CVodeInit(mem, van_der_pol_rhs, 0.0, yy);
+    CVodeSStolerances(mem, 1.0e-6, 1.0e-8);
+
+    A = SUNDenseMatrix(2, 2, ctx);
+    LS = SUNLinSol_Dense(yy, A, ctx);
+    CVodeSetLinearSolver(mem, LS, A);
+
+    CVodeSetMaxNonlinIters(mem, 3);
+    CVodeSetMaxConvFails(mem, 10);
+    CVodeSetMaxOrd(mem, 5);
+    CVodeSetMaxNumSteps(mem, 500);
+    CVodeSetStopTime(mem, 20.0);
+
+    for (int i = 1; i < lin_num; i++) {
+        flag = CVode(mem, i*step, yy, &tout, CV_NORMAL);
+        if (flag < 0 || flag == CV_TSTOP_RETURN) {
+            break;
+        }
+    }
+
+    *seconds = wall_time() - start;
+
+    CVodeGetNumSteps(mem, nsteps);
+    CVodeGetNumRhsEvals(mem, &nfe);
+    CVodeGetNumLinRhsEvals(mem, &nfeLS);
+    *ncalls = nfe + nfeLS;
+
+    N_VDestroy(yy);
+    SUNMatDestroy(A);
+    SUNLinSolFree(LS);
+    CVodeFree(&mem);
+
+    return flag < 0 ? flag : 0;
+}
+
+int main(int argc, char *argv[]) {
+    SUNContext ctx;
+    double seconds, best;
+    long nsteps, ncalls;
+    int repeats = argc > 1 ? atoi(argv[1]) : 100;
+
+    const char *names[] = {"robertson", "van_der_pol"};
+    int (*problems[])(SUNContext, double *, long *, long *) = {
+        robertson, van_der_pol
+    };
+
+    SUNContext_Create(SUN_COMM_NULL, &ctx);
+
+    for (int p = 0; p < 2; p++) {
+        best = INFINITY;
+        for (int r = 0; r < repeats; r++) {
+            if (problems[p](ctx, &seconds, &nsteps, &ncalls) != 0) {
+                printf("Error: %s failed\n", names[p]);
+                return -1;
+            }
+            best = seconds < best ? seconds : best;
+        }
+
+        printf("%s,%.9e,%ld,%ld\n", names[p], best, nsteps, ncalls);
+    }
+
+    SUNContext_Free(&ctx);
+
+    return 0;
+}
@@ -0,0 +1,129 @@
+"""
+Wall time, peak memory, and function evaluation counts for each workload in
+`problems.py` across all linear solvers, with and without 'sparsity'.
+Unsupported combinations raise NotImplementedError in `setup`, which asv
+reports as skipped rather than failed.
+
+"""
+
+from sksundae._cy_common import config
+
+from . import problems
+
+has_lapack = config['SUNDIALS_BLAS_LAPACK_ENABLED'] == 'True'
+has_superlu = config['SUNDIALS_SUPERLUMT_ENABLED'] == 'True'
+
+LINSOLVERS = ['dense', 'lapackdense', 'band', 'lapackband', 'sparse',
+              'gmres', 'bicgstab', 'tfqmr']
+
+KRYLOV = {'gmres', 'bicgstab', 'tfqmr'}
+
+SIZES = [100, 1000, 10000, 100000]
+
+MAX_DENSE_SIZE = 2000  # dense storage grows with N**2
+MAX_BAND_STORAGE = 10_000_000  # (lband + 2*uband + 1)*N doubles
+
+
+def solver_options(problem, linsolver, sparsity, krylov=True):
+    """Map a parameter combination to solver options. Raises
+    NotImplementedError when the combination cannot be benchmarked."""
+
+    if linsolver.startswith('lapack') and not has_lapack:
+        raise NotImplementedError("LAPACK is not enabled.")
+    elif linsolver == 'sparse' and not has_superlu:
+        raise NotImplementedError("SuperLU_MT is not enabled.")
+    elif linsolver == 'sparse' and not sparsity:
+        raise NotImplementedError("'sparse' requires 'sparsity'.")
+    elif linsolver in KRYLOV and (sparsity or not krylov):
+        raise NotImplementedError("Not supported with Krylov solvers.")
+
+    options = {'linsolver': linsolver}
+    if sparsity:
+        options['sparsity'] = problem.sparsity
+
+    if linsolver.endswith('dense') and problem.size > MAX_DENSE_SIZE:
+        raise NotImplementedError("Too large for dense storage.")
+    elif linsolver.endswith('band'):
+        lband, uband = problem.bands()
+        if (lband + 2*uband + 1)*problem.size > MAX_BAND_STORAGE:
+            raise NotImplementedError("Too large for band storage.")
+
+        options.update(lband=lband, uband=uband)
+
+    return options
+
+
+class _LinearSolverSuite:
+    """Shared benchmarks. Subclasses define 'params', 'param_names', and
+    `problem`, which builds the workload from the size parameters."""
+
+    timeout = 600.
+    krylov = True
+
+    def problem(self, *sizes):
+        raise NotImplementedError  # pragma: no cover
+
+    def setup(self, linsolver, sparsity, *sizes):
+        self.prob = self.problem(*sizes)
+
+        options = solver_options(self.prob, linsolver, sparsity, self.krylov)
+        self.solver = self.prob.build(**options)
+
+    def time_solve(self, *params):
+        self.prob.solve(self.solver)
+
+    def peakmem_solve(self, *params):
+        self.prob.solve(self.solver)
+
+    def track_nfev(self, *params):
+        return int(self.prob.solve(self.solver).nfev)
+
+    def track_njev(self, *params):
+        return int(self.prob.solve(self.solver).njev)
+
+    track_nfev.unit = 'evaluations'
+    track_njev.unit = 'evaluations'
+
+
+class Robertson(_LinearSolverSuite):
+    params = [LINSOLVERS, [False, True]]
+    param_names = ['linsolver', 'sparsity']
+
+    def problem(self):
+        return problems.robertson()
+
+
+class VanDerPol(_LinearSolverSuite):
+    params = [LINSOLVERS, [False, True]]
+    param_names = ['linsolver', 'sparsity']
+
+    def problem(self):
+        return problems.van_der_pol()
+
+
+class DiffusionReaction1D(_LinearSolverSuite):
+    params = [LINSOLVERS, [False, True], SIZES]
+    param_names = ['linsolver', 'sparsity', 'size']
+
+    def problem(self, size):
+        return problems.diffusion_reaction(size, ndim=1)
+
+
+class DiffusionReaction2D(_LinearSolverSuite):
+    params = [LINSOLVERS, [False, True], SIZES]
+    param_names = ['linsolver', 'sparsity', 'size']
+
+    def problem(self, size):
+        return problems.diffusion_reaction(size, ndim=2)
+
+
+class Battery(_LinearSolverSuite):
+    params = [LINSOLVERS, [False, True], SIZES]
+    param_names = ['linsolver', 'sparsity', 'size']
+
+    # without a preconditioner, Krylov methods cannot converge the consistent
+    # initial condition of the algebraic potentials
+    krylov = False
+
+    def problem(self, size):
+        return problems.battery(size)
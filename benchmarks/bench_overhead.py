@@ -0,0 +1,217 @@
+"""
+Python-binding overhead relative to plain C. The reference program in
+`C_programs/overhead.c` solves the same problems as `tests/C_programs`
+directly against SUNDIALS. The same problems are solved here through
+`IDA` and `CVODE` at matching tolerances and settings, and the wall times
+are compared per residual evaluation and per step.
+
+The C program is compiled with 'CC' (default 'cc') against the SUNDIALS
+installation found the same way as in `setup.py`. Run this file directly,
+i.e., `python -m benchmarks.bench_overhead`, to print a summary table.
+
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import timeit
+
+import numpy as np
+
+from sksundae.ida import IDA
+from sksundae.cvode import CVODE
+
+here = os.path.dirname(__file__)
+
+REPEATS = 200
+
+SUNDIALS_LIBS = ['sundials_ida', 'sundials_cvode', 'sundials_nvecserial',
+                 'sundials_sunmatrixdense', 'sundials_sunlinsoldense',
+                 'sundials_core']
+
+
+def _robertson_resfn(t, y, yp, res):
+    res[0] = yp[0] + 0.04*y[0] - 1e4*y[1]*y[2]
+    res[1] = yp[1] - 0.04*y[0] + 1e4*y[1]*y[2] + 3e7*y[1]**2
+    res[2] = y[0] + y[1] + y[2] - 1
+
+
+def _van_der_pol_rhsfn(t, y, yp):
+    yp[0] = y[1]
+    yp[1] = (1 - y[0]**2)*y[1] - y[0]
+
+
+def robertson(**options):
+    """Match the reference Robertson problem. Returns a 0-argument solve."""
+
+    solver = IDA(_robertson_resfn, rtol=1e-4, atol=1e-8, algebraic_idx=[2],
+                 **options)
+
+    tspan = 4*np.logspace(-6, 6, 50)
+    y0 = np.array([1., 0., 0.])
+    yp0 = np.array([-0.04, 0.04, 0.])
+
+    return lambda: solver.solve(tspan, y0, yp0)
+
+
+def van_der_pol(**options):
+    """Match the reference Van der Pol problem. Returns a 0-argument solve."""
+
+    solver = CVODE(_van_der_pol_rhsfn, method='BDF', rtol=1e-6, atol=1e-8,
+                   **options)
+
+    tspan = np.linspace(0, 20, 500)
+    y0 = np.array([2., 0.])
+
+    return lambda: solver.solve(tspan, y0)
+
+
+PROBLEMS = {'robertson': robertson, 'van_der_pol': van_der_pol}
+
+
+def sundials_prefix() -> str:
+    """SUNDIALS installation directory, searched like `setup.py`."""
+
+    search_paths = []
+    for name in ['SUNDIALS_PREFIX', 'CONDA_PREFIX']:
+        if os.environ.get(name):
+            search_paths.append(os.environ[name])
+
+    search_paths.extend(['/usr', '/usr/local'])
+
+    for base in search_paths:
+        config_h = os.path.join(base, 'include', 'sundials',
+                                'sundials_config.h')
+        if os.path.exists(config_h):
+            return base
+
+    raise FileNotFoundError("Can't find SUNDIALS. Set SUNDIALS_PREFIX.")
+
+
+def run_reference(repeats: int = REPEATS) -> dict:
+    """
+    Compile and run the C program. Returns {name: (seconds, nsteps, ncalls)}
+    where 'seconds' is the fastest of 'repeats' solves.
+
+    """
+
+    prefix = sundials_prefix()
+    libdir = os.path.join(prefix, 'lib')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        exe = os.path.join(tmpdir, 'overhead')
+
+        command = [
+            os.environ.get('CC', 'cc'), '-O2',
+            os.path.join(here, 'C_programs', 'overhead.c'),
+            '-I' + os.path.join(prefix, 'include'), '-L' + libdir,
+            '-Wl,-rpath,' + libdir,
+            *['-l' + lib for lib in SUNDIALS_LIBS], '-lm', '-o', exe,
+        ]
+
+        subprocess.run(command, check=True, capture_output=True)
+        output = subprocess.run([exe, str(repeats)], check=True,
+                                capture_output=True, text=True).stdout
+
+    reference = {}
+    for line in output.strip().splitlines():
+        name, seconds, nsteps, ncalls = line.split(',')
+        reference[name] = (float(seconds), int(nsteps), int(ncalls))
+
+    return reference
+
+
+def run_python(name: str, repeats: int = REPEATS, **options) -> tuple:
+    """Same as `run_reference`, for one problem solved from Python."""
+
+    solve = PROBLEMS[name](**options)
+
+    soln = solve()
+    seconds = min(timeit.repeat(solve, number=1, repeat=repeats))
+
+    nsteps = soln.stats['nsteps']
+    ncalls = soln.stats['nfev'] + soln.stats['nfevls']
+
+    return seconds, nsteps, ncalls
+
+
+def overhead(reference: tuple, python: tuple) -> dict:
+    """Overhead ratios and the extra time per call/step in microseconds."""
+
+    c_time, c_steps, c_calls = reference
+    py_time, py_steps, py_calls = python
+
+    return {
+        'ratio_per_call': (py_time/py_calls) / (c_time/c_calls),
+        'ratio_per_step': (py_time/py_steps) / (c_time/c_steps),
+        'us_per_call': 1e6*(py_time/py_calls - c_time/c_calls),
+        'us_per_step': 1e6*(py_time/py_steps - c_time/c_steps),
+    }
+
+
+class WrapperOverhead:
+    params = [list(PROBLEMS), [False, True]]
+    param_names = ['problem', 'zero_copy']
+    timeout = 600.
+
+    def setup_cache(self):
+        try:
+            reference = run_reference()
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise NotImplementedError("Can't build the C reference.") from e
+
+        results = {}
+        for name in PROBLEMS:
+            for zero_copy in self.params[1]:
+                python = run_python(name, zero_copy=zero_copy)
+                results[name, zero_copy] = overhead(reference[name], python)
+
+        return results
+
+    def track_ratio_per_call(self, results, name, zero_copy):
+        return results[name, zero_copy]['ratio_per_call']
+
+    def track_ratio_per_step(self, results, name, zero_copy):
+        return results[name, zero_copy]['ratio_per_step']
+
+    def track_us_per_call(self, results, name, zero_copy):
+        return results[name, zero_copy]['us_per_call']
+
+    def track_us_per_step(self, results, name, zero_copy):
+        return results[name, zero_copy]['us_per_step']
+
+    track_ratio_per_call.unit = 'Python/C'
+    track_ratio_per_step.unit = 'Python/C'
+    track_us_per_call.unit = 'us'
+    track_us_per_step.unit = 'us'
+
+
+def main():
+    reference = run_reference()
+
+    header = f"{'problem':<12} {'zero_copy':<10} {'steps (C/Py)':<14}" \
+             f" {'calls (C/Py)':<14} {'x/call':>7} {'x/step':>7}" \
+             f" {'us/call':>8} {'us/step':>8}"
+
+    print(header)
+    print('-'*len(header))
+
+    for name in PROBLEMS:
+        for zero_copy in [False, True]:
+            python = run_python(name, zero_copy=zero_copy)
+            stats = overhead(reference[name], python)
+
+            steps = f"{reference[name][1]}/{python[1]}"
+            calls = f"{reference[name][2]}/{python[2]}"
+
+            print(f"{name:<12} {str(zero_copy):<10} {steps:<14} {calls:<14}"
+                  f" {stats['ratio_per_call']:>7.1f}"
+                  f" {stats['ratio_per_step']:>7.1f}"
+                  f" {stats['us_per_call']:>8.2f}"
+                  f" {stats['us_per_step']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
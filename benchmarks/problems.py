@@ -0,0 +1,277 @@
+"""
+Benchmark workloads. Each builder returns a `Problem` that holds everything
+needed to construct and run a solver, so the benchmark classes only need to
+pick the linear solver and decide whether to pass 'sparsity'.
+
+"""
+
+from __future__ import annotations
+from typing import Callable, NamedTuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from sksundae.ida import IDA
+from sksundae.cvode import CVODE
+from sksundae.jacband import bandwidth
+
+
+class Problem(NamedTuple):
+    solver: type
+    fn: Callable
+    tspan: np.ndarray
+    y0: np.ndarray
+    yp0: np.ndarray | None
+    sparsity: sp.csc_matrix
+    options: dict
+
+    @property
+    def size(self) -> int:
+        return self.y0.size
+
+    def bands(self) -> tuple[int]:
+        return bandwidth(self.sparsity)
+
+    def build(self, **options) -> IDA | CVODE:
+        return self.solver(self.fn, **self.options, **options)
+
+    def solve(self, solver: IDA | CVODE):
+        if self.yp0 is None:
+            return solver.solve(self.tspan, self.y0)
+        else:
+            return solver.solve(self.tspan, self.y0, self.yp0)
+
+
+def _laplacian(n: int) -> sp.csc_matrix:
+    """1D no-flux Laplacian stencil (unscaled) for 'n' cell centers."""
+
+    diag = -2.*np.ones(n)
+    diag[[0, -1]] = -1.
+
+    off = np.ones(n - 1)
+
+    return sp.diags([off, diag, off], [-1, 0, 1], format='csc')
+
+
+# Robertson ------------------------------------------------------------------
+def _robertson_resfn(t, y, yp, res):
+    res[0] = yp[0] + 0.04*y[0] - 1e4*y[1]*y[2]
+    res[1] = yp[1] - 0.04*y[0] + 1e4*y[1]*y[2] + 3e7*y[1]**2
+    res[2] = y[0] + y[1] + y[2] - 1
+
+
+def robertson() -> Problem:
+    """Stiff chemical kinetics DAE, 3 states."""
+
+    y0 = np.array([1., 0., 0.])
+    yp0 = np.array([-0.04, 0.04, 0.])
+
+    options = {'rtol': 1e-4, 'atol': 1e-8, 'algebraic_idx': [2]}
+
+    return Problem(IDA, _robertson_resfn, 4*np.logspace(-6, 6, 50), y0, yp0,
+                   sp.csc_matrix(np.ones((3, 3))), options)
+
+
+# Van der Pol ----------------------------------------------------------------
+def _van_der_pol_rhsfn(t, y, yp):
+    yp[0] = y[1]
+    yp[1] = 1000.*(1. - y[0]**2)*y[1] - y[0]
+
+
+def van_der_pol() -> Problem:
+    """Stiff Van der Pol oscillator (mu = 1000), 2 states."""
+
+    options = {'method': 'BDF', 'rtol': 1e-6, 'atol': 1e-8}
+
+    return Problem(CVODE, _van_der_pol_rhsfn, np.array([0., 3000.]),
+                   np.array([2., 0.]), None, sp.csc_matrix(np.ones((2, 2))),
+                   options)
+
+
+# Diffusion-reaction ---------------------------------------------------------
+def _brusselator(y, diffusion, a=1., b=3.):
+    u, v = y[0::2], y[1::2]
+
+    uuv = u*u*v
+
+    dudt = a + uuv - (b + 1.)*u + diffusion @ u
+    dvdt = b*u - uuv + diffusion @ v
+
+    return dudt, dvdt
+
+
+def _diffusion_reaction_rhsfn(t, y, yp, userdata):
+    yp[0::2], yp[1::2] = _brusselator(y, userdata['diffusion'])
+
+
+def diffusion_reaction(size: int, ndim: int = 1) -> Problem:
+    """
+    Brusselator reaction with no-flux diffusion along a line or over a square.
+    The grid spacing is fixed, so the domain (not the stiffness) grows with
+    'size', the approximate number of states. Two species are interleaved at
+    each grid point so the Jacobian is banded.
+
+    """
+
+    alpha, dx = 0.02, 0.02
+
+    if ndim == 1:
+        nx = max(size // 2, 3)
+
+        diffusion = alpha/dx**2*_laplacian(nx)
+        x = (np.arange(nx) + 0.5)*dx
+        u0 = 1. + np.sin(2.*np.pi*x)
+
+    elif ndim == 2:
+        nx = max(int(np.sqrt(size / 2)), 3)
+
+        lap, eye = _laplacian(nx), sp.identity(nx)
+        diffusion = alpha/dx**2*(sp.kron(eye, lap) + sp.kron(lap, eye))
+
+        x = (np.arange(nx) + 0.5)*dx
+        u0 = 1. + np.outer(np.sin(2.*np.pi*x), np.sin(2.*np.pi*x)).ravel()
+
+    else:
+        raise ValueError("'ndim' must be 1 or 2.")
+
+    diffusion = diffusion.tocsr()
+    ngrid = diffusion.shape[0]
+
+    y0 = np.zeros(2*ngrid)
+    y0[0::2], y0[1::2] = u0, 3.
+
+    pattern = sp.kron(diffusion != 0, sp.identity(2)) \
+        + sp.kron(sp.identity(ngrid), np.ones((2, 2)))
+
+    options = {'method': 'BDF', 'rtol': 1e-6, 'atol': 1e-8,
+               'userdata': {'diffusion': diffusion}}
+
+    return Problem(CVODE, _diffusion_reaction_rhsfn, np.linspace(0., 1., 11),
+                   y0, None, sp.csc_matrix(pattern != 0, dtype=float),
+                   options)
+
+
+# P2D-like battery DAE -------------------------------------------------------
+class _Cell:
+    """
+    Index maps and parameters for a pseudo-2D style lithium-ion cell. Each
+    anode and cathode node carries the electrolyte concentration and
+    potential (c_e, phi_e) plus an averaged particle concentration and solid
+    potential (c_s, phi_s). Separator nodes only carry (c_e, phi_e). States
+    are stored node by node so the Jacobian is banded.
+
+    """
+
+    def __init__(self, nodes: int) -> None:
+        self.nodes = nodes
+
+        region = np.repeat([0, 1, 2], nodes)  # anode, separator, cathode
+        nvars = np.where(region == 1, 2, 4)
+        start = np.concatenate([[0], np.cumsum(nvars)[:-1]])
+
+        self.size = int(nvars.sum())
+        self.region = region
+
+        self.ce = start
+        self.phie = start + 1
+
+        self.an = np.flatnonzero(region == 0)
+        self.ca = np.flatnonzero(region == 2)
+
+        self.cs_an, self.phis_an = start[self.an] + 2, start[self.an] + 3
+        self.cs_ca, self.phis_ca = start[self.ca] + 2, start[self.ca] + 3
+
+        self.dx = 1. / nodes
+        self.lap = _laplacian(3*nodes).tocsr() / self.dx**2
+
+        self.ocv_an = lambda cs: 0.1 - 0.05*np.log(cs / (1. - cs))
+        self.ocv_ca = lambda cs: 4.0 - 0.05*np.log(cs / (1. - cs))
+
+        self.current = 1.
+        self.sigma, self.kappa, self.diff_e = 10., 1., 1.
+        self.tp, self.ks, self.i0 = 0.6, 0.1, 1.
+
+    def flux(self, ce, cs, eta):
+        i0 = self.i0*np.sqrt(np.clip(ce*cs*(1. - cs), 1e-12, None))
+        return 2.*i0*np.sinh(0.5*eta)
+
+    def solid(self, phis, left):
+        """Solid-phase Laplacian with no flux between electrode nodes and the
+        separator. 'left' is the Dirichlet value at the anode collector, or
+        None for the cathode with an applied current."""
+
+        n, dx = phis.size, self.dx
+
+        flux = np.zeros(n + 1)
+        flux[1:-1] = self.sigma*np.diff(phis) / dx
+
+        if left is None:
+            flux[-1] = -self.current
+        else:
+            flux[-1] = 0.
+            flux[0] = self.sigma*(phis[0] - left) / (0.5*dx)
+
+        return np.diff(flux) / dx
+
+
+def _battery_resfn(t, y, yp, res, cell):
+    ce, phie = y[cell.ce], y[cell.phie]
+
+    cs_an, phis_an = y[cell.cs_an], y[cell.phis_an]
+    cs_ca, phis_ca = y[cell.cs_ca], y[cell.phis_ca]
+
+    eta_an = phis_an - phie[cell.an] - cell.ocv_an(cs_an)
+    eta_ca = phis_ca - phie[cell.ca] - cell.ocv_ca(cs_ca)
+
+    j = np.zeros_like(ce)
+    j[cell.an] = cell.flux(ce[cell.an], cs_an, eta_an)
+    j[cell.ca] = cell.flux(ce[cell.ca], cs_ca, eta_ca)
+
+    res[cell.ce] = yp[cell.ce] - cell.diff_e*(cell.lap @ ce) \
+        - (1. - cell.tp)*j
+    res[cell.phie] = cell.kappa*(cell.lap @ phie) + j
+
+    res[cell.cs_an] = yp[cell.cs_an] + cell.ks*j[cell.an]
+    res[cell.cs_ca] = yp[cell.cs_ca] + cell.ks*j[cell.ca]
+
+    res[cell.phis_an] = cell.solid(phis_an, 0.) - j[cell.an]
+    res[cell.phis_ca] = cell.solid(phis_ca, None) - j[cell.ca]
+
+
+def battery(size: int) -> Problem:
+    """
+    Pseudo-2D style battery discharge DAE. Electrolyte transport and charge
+    conservation couple to Butler-Volmer kinetics in both electrodes. The
+    number of states is approximately 'size'.
+
+    """
+
+    cell = _Cell(max(size // 10, 3))
+
+    y0 = np.zeros(cell.size)
+    y0[cell.ce] = 1.
+    y0[cell.cs_an], y0[cell.cs_ca] = 0.8, 0.4
+
+    y0[cell.phie] = -cell.ocv_an(0.8)
+    y0[cell.phis_ca] = y0[cell.phie][cell.ca] + cell.ocv_ca(0.4)
+
+    algebraic_idx = np.sort(np.concatenate([cell.phie, cell.phis_an,
+                                            cell.phis_ca]))
+
+    options = {'rtol': 1e-6, 'atol': 1e-8, 'userdata': cell,
+               'algebraic_idx': algebraic_idx, 'calc_initcond': 'yp0'}
+
+    # every state at a node couples to every state at the neighboring nodes
+    owner = np.zeros(cell.size, dtype=int)
+    for idx in [cell.ce, cell.phie]:
+        owner[idx] = np.arange(3*cell.nodes)
+    for idx, nodes in [(cell.cs_an, cell.an), (cell.phis_an, cell.an),
+                       (cell.cs_ca, cell.ca), (cell.phis_ca, cell.ca)]:
+        owner[idx] = nodes
+
+    owner = sp.csr_matrix((np.ones(cell.size), (np.arange(cell.size), owner)))
+    pattern = owner @ (_laplacian(3*cell.nodes) != 0) @ owner.T
+
+    return Problem(IDA, _battery_resfn, np.linspace(0., 1., 11), y0,
+                   np.zeros_like(y0), sp.csc_matrix(pattern != 0, dtype=float),
+                   options)
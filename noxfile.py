@@ -122,6 +122,24 @@ def run_pytest(session: nox.Session) -> None:
     run_cleanup(session)
 
 
+@nox.session(name='benchmarks', python=False)
+def run_asv(session: nox.Session) -> None:
+    """
+    Run the asv benchmarks
+
+    By default, compares HEAD against main and reports significant changes.
+    Any posargs are passed directly to asv instead, e.g., 'run --quick'.
+
+    """
+
+    session.run('pip', 'install', '--upgrade', '--quiet', 'asv')
+
+    if session.posargs:
+        session.run('asv', *session.posargs)
+    else:
+        session.run('asv', 'continuous', 'main', 'HEAD')
+
+
 @nox.session(name='badges', python=False)
 def run_genbadge(session: nox.Session) -> None:
     """Run genbadge to make test/coverage badges"""
@@ -57,9 +57,12 @@ from ._cy_common import SUNDIALS_VERSION
 
 from . import ida
 from . import utils
+from . import sinks
 from . import cvode
 from . import jacband
+from . import ensemble
 
-__all__ = ['ida', 'utils', 'cvode', 'jacband', 'SUNDIALS_VERSION']
+__all__ = ['ida', 'utils', 'sinks', 'cvode', 'jacband', 'ensemble',
+           'SUNDIALS_VERSION']
 
 __version__ = '1.2.0.dev0'
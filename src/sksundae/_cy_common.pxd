@@ -14,5 +14,115 @@ cdef np2svec(np.ndarray[DTYPE_t, ndim=1] np_array, N_Vector nvec)
 cdef ptr2np(sunrealtype* nv_ptr, np.ndarray[DTYPE_t, ndim=1] np_array)
 cdef np2ptr(np.ndarray[DTYPE_t, ndim=1] np_array, sunrealtype* nv_ptr)
 
+# Cached numpy views over N_Vector and sunrealtype* data (no copies)
+cdef np.ndarray svec2view(N_Vector nvec, dict views)
+cdef np.ndarray ptr2view(sunrealtype* nv_ptr, sunindextype size, dict views)
+
+# Unpack function and user_data pointers from a scipy.LowLevelCallable
+cdef void* llc2func(object func) except NULL
+cdef void* llc2data(object func)
+
 # Fill SUNMatrrix with values from 2D numpy array
 cdef np2smat(np.ndarray np_A, SUNMatrix smat, object sparsity)
+
+# Fill SUNMatrix with values from a row-major buffer (no GIL)
+cdef void ptr2smat(sunrealtype* A, SUNMatrix smat, sunindextype* indices,
+                   sunindextype* indptr) noexcept nogil
+
+# Write values in place of a SUNSparseMatrix with a fixed CSC pattern (no GIL)
+cdef void smat_pattern(SUNMatrix smat, sunindextype* indices,
+                       sunindextype* indptr) noexcept nogil
+cdef sunrealtype* smat_compact(SUNMatrix smat, sunindextype* indices,
+                               sunindextype* indptr) noexcept nogil
+cdef void band2smat(sunrealtype* A, SUNMatrix smat) noexcept nogil
+
+# Numpy view over SUNMatrix data, in the 'compact' jacfn layouts
+cdef np.ndarray smat2view(SUNMatrix smat, sunindextype* indices,
+                          sunindextype* indptr, dict views)
+
+# Growable row storage for solution outputs, with optional column selection
+cdef class OutputStore:
+    cdef object t
+    cdef object y
+    cdef object yp
+    cdef object oo
+    cdef object idx
+    cdef object order
+    cdef bint with_y
+    cdef bint with_yp
+    cdef public Py_ssize_t size
+
+    cdef _grow(self)
+    cdef append(self, sunrealtype tt, np.ndarray yy, np.ndarray yp,
+                np.ndarray oo)
+    cdef tuple arrays(self)
+    cdef select(self, object values)
+
+# Decides which onestep outputs to keep when thinning is enabled
+cdef class OutputThinning:
+    cdef object rtol
+    cdef object atol
+    cdef object max_dt
+    cdef sunrealtype t_last
+    cdef object y_last
+
+    cdef reset(self, sunrealtype tt, np.ndarray yy)
+    cdef bint keep(self, sunrealtype tt, np.ndarray yy)
+
+# Timed regions for the 'profile' option, indexes into Profiler arrays
+cdef enum:
+    PROF_SOLVE
+    PROF_FN
+    PROF_EVENTS
+    PROF_JAC
+    PROF_PSETUP
+    PROF_PSOLVE
+    PROF_JVSETUP
+    PROF_JVSOLVE
+    PROF_OUTPUT
+    PROF_NREGIONS
+
+cdef enum:
+    PROF_MAXDEPTH = 8  # deeper nesting is counted in the enclosing region
+
+# Call counts and inclusive/exclusive times of callbacks and solver calls
+cdef class Profiler:
+    cdef tuple names
+    cdef tuple timers
+    cdef SUNProfiler sunprofiler
+    cdef long int calls[PROF_NREGIONS]
+    cdef long long inclusive[PROF_NREGIONS]
+    cdef long long exclusive[PROF_NREGIONS]
+    cdef int depth
+    cdef int stack[PROF_MAXDEPTH]
+    cdef long long start[PROF_MAXDEPTH]
+    cdef long long inner[PROF_MAXDEPTH]
+
+    cdef attach(self, SUNContext ctx)
+    cdef reset(self)
+    cdef void begin(self, int region) noexcept
+    cdef void end(self) noexcept
+    cdef dict summary(self)
+
+# Fixed-capacity ring buffer of per-step integrator records, in C memory
+cdef struct TraceRecord:
+    long long wall              # perf_counter_ns at the solver return
+    sunrealtype t
+    sunrealtype h
+    int order
+    long int nsteps
+    long int nni
+    long int netf
+    long int njev
+
+cdef class StepTracer:
+    cdef TraceRecord* buffer
+    cdef Py_ssize_t capacity
+    cdef Py_ssize_t head
+    cdef Py_ssize_t count
+    cdef long long wall0
+
+    cdef reset(self)
+    cdef void record(self, sunrealtype t, sunrealtype h, int order,
+                     long int nsteps, long int nni, long int netf,
+                     long int njev) noexcept nogil
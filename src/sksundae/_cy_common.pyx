@@ -1,8 +1,16 @@
 # _cy_common.pyx
 
 # Dependencies
+import numpy as np
 cimport numpy as np
 
+from scipy import LowLevelCallable
+from libc.stdlib cimport malloc, free
+from cpython.time cimport perf_counter_ns
+from cpython.pycapsule cimport (
+    PyCapsule_GetName, PyCapsule_GetPointer, PyCapsule_GetContext,
+)
+
 # Extern cdef headers
 from .c_sundials cimport *  # Access to C types
 from .c_nvector cimport *  # Access to N_Vector functions
@@ -67,6 +75,392 @@ cdef np2ptr(np.ndarray[DTYPE_t, ndim=1] np_array, sunrealtype* nv_ptr):
     nv_ptr[0:size] = &np_array[0]
 
 
+cdef np.ndarray svec2view(N_Vector nvec, dict views):
+    """Return a numpy array that views (not copies) the N_Vector data."""
+    cdef sunrealtype* nv_ptr = N_VGetArrayPointer(nvec)
+    cdef sunindextype size = N_VGetLength(nvec)
+
+    return ptr2view(nv_ptr, size, views)
+
+
+cdef np.ndarray ptr2view(sunrealtype* nv_ptr, sunindextype size, dict views):
+    """
+    Return a numpy array that views (not copies) data at a sunrealtype pointer.
+    
+    Views are cached in 'views' using the pointer address as the key. SUNDIALS
+    only passes a handful of distinct vectors to the user-defined callbacks, so
+    after the first few calls every lookup returns an existing view. A new view
+    is only built when SUNDIALS passes a vector that has not been seen before.
+
+    """
+    cdef size_t key = <size_t> nv_ptr
+
+    view = views.get(key)
+    if view is None or view.size != size:
+        view = np.asarray(<sunrealtype[:size]> nv_ptr)
+        views[key] = view
+
+    return view
+
+
+cdef class OutputStore:
+    """
+    Row storage for solution outputs, i.e., 't', 'y', 'yp', and 'outputfn'
+    values. Only the 'idx' columns of 'y' and 'yp' are kept (all if None),
+    'y' and 'yp' are skipped unless 'with_y' and 'with_yp', and 'order' sets
+    the memory layout of the 2D arrays. Capacity doubles whenever the store
+    is full. Callers that stream rows, rather than accumulate them, reset
+    'size' to zero after consuming the arrays.
+
+    """
+
+    def __init__(self, Py_ssize_t capacity, Py_ssize_t NEQ, object idx,
+                 bint with_y, bint with_yp, Py_ssize_t num_outputs,
+                 object order):
+
+        if idx is not None:
+            idx = np.asarray(idx, dtype=np.intp)
+            if idx.ndim != 1 or idx.size == 0:
+                raise ValueError("'save_idx' must be a non-empty 1D sequence.")
+            elif idx.min() < 0 or idx.max() >= NEQ:
+                raise ValueError(f"'save_idx' values must be in [0, {NEQ}).")
+
+        ncols = NEQ if idx is None else idx.size
+
+        self.t = np.empty(capacity, DTYPE)
+        self.y = np.empty((capacity if with_y else 0, ncols), DTYPE,
+                          order=order)
+        self.yp = np.empty((capacity if with_yp else 0, ncols), DTYPE,
+                           order=order)
+        self.oo = np.empty((capacity, num_outputs), DTYPE, order=order)
+
+        self.idx = idx
+        self.order = order
+        self.with_y = with_y
+        self.with_yp = with_yp
+        self.size = 0
+
+    cdef _grow(self):
+        cdef Py_ssize_t n = self.size
+
+        cdef Py_ssize_t rows = max(2*n, 1)
+
+        t = np.empty(rows, DTYPE)
+        t[:n] = self.t[:n]
+
+        arrays = []
+        for old, keep in [(self.y, self.with_y), (self.yp, self.with_yp),
+                          (self.oo, True)]:
+            new = np.empty((rows if keep else 0, old.shape[1]), DTYPE,
+                           order=self.order)
+            new[:n] = old[:n]
+            arrays.append(new)
+
+        self.t = t
+        self.y, self.yp, self.oo = arrays
+
+    cdef append(self, sunrealtype tt, np.ndarray yy, np.ndarray yp,
+                np.ndarray oo):
+        cdef Py_ssize_t n = self.size
+
+        if n == self.t.shape[0]:
+            self._grow()
+
+        self.t[n] = tt
+        if self.idx is None:
+            if self.with_y:
+                self.y[n] = yy
+            if self.with_yp:
+                self.yp[n] = yp
+        else:
+            if self.with_y:
+                np.take(yy, self.idx, out=self.y[n])
+            if self.with_yp:
+                np.take(yp, self.idx, out=self.yp[n])
+
+        if oo is not None:
+            self.oo[n] = oo
+
+        self.size = n + 1
+
+    cdef tuple arrays(self):
+        """Return views of the stored rows, as (t, y, yp, outputs)."""
+        cdef Py_ssize_t n = self.size
+
+        y = self.y[:n] if self.with_y else None
+        yp = self.yp[:n] if self.with_yp else None
+        oo = self.oo[:n] if self.oo.shape[1] else None
+
+        return self.t[:n], y, yp, oo
+
+    cdef select(self, object values):
+        """Keep the 'idx' columns of stacked rows, e.g., 'y_events'."""
+        if values is None or self.idx is None:
+            return values
+
+        return values[:, self.idx]
+
+
+cdef class OutputThinning:
+    """
+    Output filter for onestep solves. A step is kept when any state changed
+    by more than `atol + rtol*|y_last|` since the last kept step, or when at
+    least 'max_dt' has passed. Criteria set to None are not checked, but the
+    tolerance check is used if either 'rtol' or 'atol' is given.
+
+    """
+
+    def __init__(self, object rtol, object atol, object max_dt):
+        if rtol is None and atol is not None:
+            rtol = 0.
+        elif atol is None and rtol is not None:
+            atol = 0.
+
+        self.rtol = rtol
+        self.atol = atol
+        self.max_dt = max_dt
+
+    cdef reset(self, sunrealtype tt, np.ndarray yy):
+        """Record the last kept step."""
+        self.t_last = tt
+        self.y_last = yy.copy()
+
+    cdef bint keep(self, sunrealtype tt, np.ndarray yy):
+        """Return True, and reset, if the step at 'tt' should be kept."""
+        cdef bint keep = False
+
+        if self.max_dt is not None and abs(tt - self.t_last) >= self.max_dt:
+            keep = True
+        elif self.rtol is not None:
+            tol = self.atol + self.rtol*np.abs(self.y_last)
+            keep = np.any(np.abs(yy - self.y_last) > tol)
+
+        if keep:
+            self.reset(tt, yy)
+
+        return keep
+
+
+cdef class Profiler:
+    """
+    Wall-time profiler for the 'profile' option. Regions are timed with a
+    monotonic, high-resolution clock and may nest, e.g., 'resfn' calls within
+    'solve'. Inclusive times cover a whole region and exclusive times remove
+    any nested regions. Exclusive 'solve' time is therefore spent in SUNDIALS
+    itself, i.e., factorizations, Krylov iterations, vector operations, etc.
+
+    When SUNDIALS was built with profiling enabled, the elapsed times of its
+    own 'timers' are also reported, from the context's SUNProfiler.
+
+    """
+
+    def __init__(self, tuple names, tuple timers):
+        self.names = names
+        self.timers = timers
+        self.sunprofiler = NULL
+        self.reset()
+
+    cdef attach(self, SUNContext ctx):
+        """Use the SUNProfiler of 'ctx', if SUNDIALS provides one."""
+        cdef SUNProfiler sunprofiler = NULL
+
+        flag = SUNContext_GetProfiler(ctx, &sunprofiler)
+        self.sunprofiler = sunprofiler if flag == 0 else NULL
+
+        if self.sunprofiler is not NULL:
+            SUNProfiler_Reset(self.sunprofiler)
+
+    cdef reset(self):
+        """Zero all counters."""
+        cdef int i
+
+        for i in range(PROF_NREGIONS):
+            self.calls[i] = 0
+            self.inclusive[i] = 0
+            self.exclusive[i] = 0
+
+        self.depth = 0
+
+        if self.sunprofiler is not NULL:
+            SUNProfiler_Reset(self.sunprofiler)
+
+    cdef void begin(self, int region) noexcept:
+        """Start timing 'region', nested in any region that is running."""
+        cdef int d = self.depth
+
+        if d < PROF_MAXDEPTH:
+            self.stack[d] = region
+            self.inner[d] = 0
+            self.start[d] = perf_counter_ns()
+
+        self.depth += 1
+
+    cdef void end(self) noexcept:
+        """Stop timing the most recently started region."""
+        cdef long long elapsed
+        cdef int region
+        cdef int d
+
+        self.depth -= 1
+
+        d = self.depth
+        if d >= PROF_MAXDEPTH:
+            return
+
+        elapsed = perf_counter_ns() - self.start[d]
+        region = self.stack[d]
+
+        self.calls[region] += 1
+        self.inclusive[region] += elapsed
+        self.exclusive[region] += elapsed - self.inner[d]
+
+        if d > 0:
+            self.inner[d - 1] += elapsed
+
+    cdef dict summary(self):
+        """Return {region: {'calls', 'inclusive', 'exclusive'}}, in seconds."""
+        cdef double elapsed
+        cdef int i
+
+        out = {}
+        for i in range(PROF_NREGIONS):
+            if self.calls[i] > 0:
+                out[self.names[i]] = {
+                    'calls': self.calls[i],
+                    'inclusive': 1e-9*self.inclusive[i],
+                    'exclusive': 1e-9*self.exclusive[i],
+                }
+
+        if self.sunprofiler is NULL:
+            return out
+
+        for name in self.timers:
+            bname = name.encode("utf-8")
+            flag = SUNProfiler_GetElapsedTime(self.sunprofiler, bname,
+                                              &elapsed)
+            if flag == 0 and elapsed > 0.:
+                out[name] = {'calls': None, 'inclusive': elapsed,
+                             'exclusive': None}
+
+        return out
+
+
+TRACE_DTYPE = np.dtype([
+    ("wall", np.float64), ("t", DTYPE), ("h", DTYPE), ("order", np.int32),
+    ("nsteps", np.int64), ("nni", np.int64), ("netf", np.int64),
+    ("njev", np.int64),
+])
+
+
+cdef class StepTracer:
+    """
+    Ring buffer for the 'trace' option. Records are written to C memory, so
+    tracing does not allocate or need the GIL. Once full, the oldest records
+    are overwritten. Consecutive records with unchanged counters are skipped,
+    so onestep solves record exactly one entry per internal step.
+
+    """
+
+    def __cinit__(self, Py_ssize_t capacity):
+        self.buffer = <TraceRecord*> malloc(capacity*sizeof(TraceRecord))
+        if self.buffer is NULL:
+            raise MemoryError("Failed to allocate the 'trace' buffer.")
+
+        self.capacity = capacity
+        self.reset()
+
+    def __dealloc__(self):
+        free(self.buffer)
+
+    cdef reset(self):
+        """Clear all records, and restart the wall clock."""
+        self.head = 0
+        self.count = 0
+        self.wall0 = perf_counter_ns()
+
+    cdef void record(self, sunrealtype t, sunrealtype h, int order,
+                     long int nsteps, long int nni, long int netf,
+                     long int njev) noexcept nogil:
+        """Append a record, unless it repeats the last one, e.g., roots."""
+        cdef Py_ssize_t i
+        cdef TraceRecord* rec
+
+        if self.count > 0:
+            i = self.head - 1 if self.head > 0 else self.capacity - 1
+
+            rec = &self.buffer[i]
+            if rec.t == t and rec.nsteps == nsteps and rec.nni == nni \
+                    and rec.netf == netf and rec.njev == njev:
+                return
+
+        rec = &self.buffer[self.head]
+        rec.wall = perf_counter_ns()
+        rec.t = t
+        rec.h = h
+        rec.order = order
+        rec.nsteps = nsteps
+        rec.nni = nni
+        rec.netf = netf
+        rec.njev = njev
+
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+
+        if self.count < self.capacity:
+            self.count += 1
+
+    def to_numpy(self):
+        """Return the records, oldest first, as a structured array."""
+        cdef Py_ssize_t i, j
+        cdef TraceRecord rec
+
+        out = np.empty(self.count, TRACE_DTYPE)
+
+        start = self.head - self.count
+        for i in range(self.count):
+            j = (start + i) % self.capacity
+            rec = self.buffer[j]
+
+            out[i] = (1e-9*(rec.wall - self.wall0), rec.t, rec.h, rec.order,
+                      rec.nsteps, rec.nni, rec.netf, rec.njev)
+
+        return out
+
+
+def native_signature(*args: str) -> str:
+    """
+    Build the LowLevelCallable signature for a native (compiled) callback.
+
+    All native callbacks return int. Arguments are C type names, where 'real'
+    is replaced by the floating point type SUNDIALS was compiled with.
+
+    """
+    types = [arg.replace("real", SUNDIALS_FLOAT_TYPE) for arg in args]
+    return "int (" + ", ".join(types) + ")"
+
+
+class _LowLevelEvents(LowLevelCallable):
+    """LowLevelCallable that accepts attributes, e.g., 'terminal'."""
+    pass
+
+
+cdef void* llc2func(object func) except NULL:
+    """Return the C function pointer wrapped by a scipy.LowLevelCallable."""
+
+    # LowLevelCallable is a tuple whose first item is a capsule named by the
+    # signature, holding the function pointer with user_data as its context.
+    # This is the same layout scipy reads in scipy/_lib/src/ccallback.h.
+    capsule = tuple.__getitem__(func, 0)
+    return PyCapsule_GetPointer(capsule, PyCapsule_GetName(capsule))
+
+
+cdef void* llc2data(object func):
+    """Return the 'user_data' pointer carried by a scipy.LowLevelCallable."""
+    capsule = tuple.__getitem__(func, 0)
+    return PyCapsule_GetContext(capsule)
+
+
 cdef np2smat_dense(np.ndarray[DTYPE_t, ndim=2] np_A, SUNMatrix smat):
     """Fill a SUNDenseMatrix with values from a 2D numpy array."""
     cdef sunindextype i, j
@@ -97,25 +491,6 @@ cdef np2smat_band(np.ndarray[DTYPE_t, ndim=2] np_A, SUNMatrix smat):
             sm_cols[j][i-j+smu] = np_A[i,j]
 
 
-cdef np2smat_sparse1D(np.ndarray[DTYPE_t, ndim=1] np_A, SUNMatrix smat,
-                      object sparsity):
-    """Fill a SUNSparseMatrix with values from a 1D numpy array."""
-    cdef sunindextype nnz, nidx, nptr
-    cdef sunrealtype* data = SUNSparseMatrix_Data(smat)
-    cdef sunindextype* indices = SUNSparseMatrix_IndexValues(smat)
-    cdef sunindextype* indptrs = SUNSparseMatrix_IndexPointers(smat)
-    cdef np.ndarray[INT_TYPE_t, ndim=1] np_indices = sparsity.indices
-    cdef np.ndarray[INT_TYPE_t, ndim=1] np_indptr = sparsity.indptr
-
-    nnz = <sunindextype> sparsity.nnz
-    nidx = <sunindextype> sparsity.indices.size
-    nptr = <sunindextype> sparsity.indptr.size
-
-    data[0:nnz] = &np_A[0]
-    indices[0:nidx] = <sunindextype*> &np_indices[0]
-    indptrs[0:nptr] = <sunindextype*> &np_indptr[0]
-
-
 cdef np2smat_sparse2D(np.ndarray[DTYPE_t, ndim=2] np_A, SUNMatrix smat,
                       object sparsity):
     """Fill a SUNSparseMatrix with values from a 2D numpy array."""
@@ -150,10 +525,162 @@ cdef np2smat(np.ndarray np_A, SUNMatrix smat, object sparsity):
         np2smat_dense(np_A, smat)
     elif matrix_id == SUNMATRIX_BAND:
         np2smat_band(np_A, smat)
-    elif matrix_id == SUNMATRIX_SPARSE and np_A.ndim == 1:
-        np2smat_sparse1D(np_A, smat, sparsity)
-    elif matrix_id == SUNMATRIX_SPARSE and np_A.ndim == 2:
+    elif matrix_id == SUNMATRIX_SPARSE:
         np2smat_sparse2D(np_A, smat, sparsity)
     else:
         raise TypeError("Only 'dense', 'band', or 'sparse' SUNMatrix are"
                         " supported for 'smat'.")
+
+
+cdef void ptr2smat(sunrealtype* A, SUNMatrix smat, sunindextype* indices,
+                   sunindextype* indptr) noexcept nogil:
+    """
+    Fill a SUNMatrix with values from a row-major (N, N) buffer.
+
+    Used by native Jacobians while the GIL is released. 'indices' and 'indptr'
+    are the CSC pattern of a sparse 'smat' and are ignored for other types.
+
+    """
+    cdef sunindextype i, j, k, N, i_min, i_max
+    cdef sunindextype lband, uband, smu
+    cdef sunrealtype** sm_cols
+    cdef sunrealtype* data
+    cdef SUNMatrix_ID matrix_id = SUNMatGetID(smat)
+
+    if matrix_id == SUNMATRIX_DENSE:
+        N = SUNDenseMatrix_Columns(smat)
+        sm_cols = SUNDenseMatrix_Cols(smat)
+
+        for j in range(N):
+            for i in range(N):
+                sm_cols[j][i] = A[i*N + j]
+
+    elif matrix_id == SUNMATRIX_BAND:
+        N = SUNBandMatrix_Columns(smat)
+        sm_cols = SUNBandMatrix_Cols(smat)
+        lband = SUNBandMatrix_LowerBandwidth(smat)
+        uband = SUNBandMatrix_UpperBandwidth(smat)
+        smu = SUNBandMatrix_StoredUpperBandwidth(smat)
+
+        for j in range(N):
+            i_min = max(0, j - uband)
+            i_max = min(N, j + lband + 1)
+            for i in range(i_min, i_max):
+                sm_cols[j][i-j+smu] = A[i*N + j]
+
+    elif matrix_id == SUNMATRIX_SPARSE:
+        N = SUNSparseMatrix_Columns(smat)
+        data = SUNSparseMatrix_Data(smat)
+
+        smat_pattern(smat, indices, indptr)
+
+        for j in range(N):
+            for k in range(indptr[j], indptr[j+1]):
+                data[k] = A[indices[k]*N + j]
+
+
+cdef void smat_pattern(SUNMatrix smat, sunindextype* indices,
+                       sunindextype* indptr) noexcept nogil:
+    """Copy a CSC 'indices' and 'indptr' pattern into a SUNSparseMatrix."""
+    cdef sunindextype N = SUNSparseMatrix_Columns(smat)
+    cdef sunindextype* sm_indices = SUNSparseMatrix_IndexValues(smat)
+    cdef sunindextype* sm_indptr = SUNSparseMatrix_IndexPointers(smat)
+
+    sm_indices[0:indptr[N]] = indices
+    sm_indptr[0:N+1] = indptr
+
+
+cdef sunrealtype* smat_compact(SUNMatrix smat, sunindextype* indices,
+                               sunindextype* indptr) noexcept nogil:
+    """
+    Return the data pointer of a SUNSparseMatrix, for writing values in place.
+
+    SUNDIALS calls SUNMatZero before each Jacobian evaluation, which also
+    zeros the sparse index arrays, so the pattern is copied back in whenever
+    the stored 'indptr[N]' does not match. In practice that is every call,
+    but it is an O(nnz) copy, small compared to filling the values. Values
+    follow the CSC order of 'indices'.
+
+    """
+    cdef sunindextype N = SUNSparseMatrix_Columns(smat)
+    cdef sunindextype* sm_indptr = SUNSparseMatrix_IndexPointers(smat)
+
+    if sm_indptr[N] != indptr[N]:
+        smat_pattern(smat, indices, indptr)
+
+    return SUNSparseMatrix_Data(smat)
+
+
+cdef void band2smat(sunrealtype* A, SUNMatrix smat) noexcept nogil:
+    """
+    Fill a SUNBandMatrix from a compact, column-major band buffer.
+
+    The buffer uses the LAPACK/SciPy 'solve_banded' layout with a leading
+    dimension of 'lband + uband + 1', i.e., `J[i,j]` is stored at
+    `A[(uband + i - j) + j*(lband + uband + 1)]`.
+
+    """
+    cdef sunindextype i, j, i_min, i_max
+    cdef sunindextype N = SUNBandMatrix_Columns(smat)
+    cdef sunindextype lband = SUNBandMatrix_LowerBandwidth(smat)
+    cdef sunindextype uband = SUNBandMatrix_UpperBandwidth(smat)
+    cdef sunindextype smu = SUNBandMatrix_StoredUpperBandwidth(smat)
+    cdef sunindextype ldim = lband + uband + 1
+    cdef sunrealtype** sm_cols = SUNBandMatrix_Cols(smat)
+
+    for j in range(N):
+        i_min = max(0, j - uband)
+        i_max = min(N, j + lband + 1)
+        for i in range(i_min, i_max):
+            sm_cols[j][i-j+smu] = A[(uband + i - j) + j*ldim]
+
+
+cdef np.ndarray smat2view(SUNMatrix smat, sunindextype* indices,
+                          sunindextype* indptr, dict views):
+    """
+    Return a numpy array that views (not copies) the data of a SUNMatrix.
+
+    Dense matrices give a Fortran-ordered (N, N) array, so `view[i,j]` is the
+    same as for a 'full' Jacobian. Band matrices give a (lband + uband + 1, N)
+    array in the LAPACK/SciPy 'solve_banded' layout, i.e., `J[i,j]` is at
+    `view[uband + i - j, j]`.
+    Sparse matrices give a 1D array with values in the CSC order of 'indices'
+    and 'indptr', see smat_compact. Views are cached in 'views' with the data
+    address as the key, like ptr2view.
+
+    """
+    cdef sunindextype N, ldim, lband, uband, smu
+    cdef sunrealtype* data
+    cdef SUNMatrix_ID matrix_id = SUNMatGetID(smat)
+
+    if matrix_id == SUNMATRIX_DENSE:
+        N = SUNDenseMatrix_Columns(smat)
+        data = SUNDenseMatrix_Data(smat)
+
+        return ptr2view(data, N*N, views).reshape(N, N).T
+
+    elif matrix_id == SUNMATRIX_BAND:
+        N = SUNBandMatrix_Columns(smat)
+        ldim = SUNBandMatrix_LDim(smat)
+        lband = SUNBandMatrix_LowerBandwidth(smat)
+        uband = SUNBandMatrix_UpperBandwidth(smat)
+        smu = SUNBandMatrix_StoredUpperBandwidth(smat)
+        data = SUNBandMatrix_Data(smat)
+
+        view = views.get(<size_t> data)
+        if view is None or view.shape != (lband + uband + 1, N):
+            flat = np.asarray(<sunrealtype[:ldim*N]> data)
+            view = flat.reshape(N, ldim).T[smu-uband:smu+lband+1]
+            views[<size_t> data] = view
+
+        return view
+
+    elif matrix_id == SUNMATRIX_SPARSE:
+        N = SUNSparseMatrix_Columns(smat)
+        data = smat_compact(smat, indices, indptr)
+
+        return ptr2view(data, indptr[N], views)
+
+    else:
+        raise TypeError("Only 'dense', 'band', or 'sparse' SUNMatrix are"
+                        " supported for 'smat'.")
@@ -15,7 +15,7 @@ from typing import Callable, Iterable
 import numpy as np
 cimport numpy as np
 
-from scipy import sparse as sp
+from scipy import sparse as sp, LowLevelCallable
 from scipy.optimize._numdiff import group_columns
 from cpython.exc cimport (
     PyErr_Fetch, PyErr_NormalizeException,
@@ -35,9 +35,12 @@ from .c_sunlinsol cimport *
 # Internal cdef headers
 from ._cy_common cimport *
 from ._cy_common import DTYPE, INT_TYPE, config  # Python precisions/config
+from ._cy_common import native_signature, _LowLevelEvents
 
 # Local python dependencies
-from .utils import RichResult
+from .utils import RichResult, DenseOutput
+from .jacband import (JacobianStructure, j_pattern, bandwidth,
+                      select_linsolver)
 from .ida._precond import IDAPrecond
 from .ida._jactimes import IDAJacTimes
 
@@ -92,22 +95,201 @@ LSMESSAGES = {
     -9: "An error occurred with the current SUNLinearSolver module.",
 }
 
+# Signatures for native (compiled) callbacks, given as LowLevelCallable. Args
+# mirror the Python callables, except arrays are passed as pointers and the
+# 'userdata' arg is replaced by the LowLevelCallable's 'user_data' pointer.
+NATIVE_SIGNATURES = {
+    "resfn": native_signature("real", "real *", "real *", "real *", "void *"),
+    "eventsfn": native_signature(
+        "real", "real *", "real *", "real *", "void *",
+    ),
+    "jacfn": native_signature(
+        "real", "real *", "real *", "real *", "real", "real *", "void *",
+    ),
+    "precond.setupfn": native_signature(
+        "real", "real *", "real *", "real *", "real", "void *",
+    ),
+    "precond.solvefn": native_signature(
+        "real", "real *", "real *", "real *", "real *", "real *", "real",
+        "real", "void *",
+    ),
+    "jactimes.setupfn": native_signature(
+        "real", "real *", "real *", "real *", "real", "void *",
+    ),
+    "jactimes.solvefn": native_signature(
+        "real", "real *", "real *", "real *", "real *", "real *", "real",
+        "void *",
+    ),
+}
+
+# Region names for the 'profile' option, ordered as the PROF_* enum, followed
+# by SUNDIALS timers that are reported when its SUNProfiler is available.
+_PROFILE_REGIONS = ("solve", "resfn", "eventsfn", "jacfn", "psetup", "psolve",
+                    "jvsetup", "jvsolve", "outputfn")
+
+_PROFILE_TIMERS = ("IDASolve", "IDACalcIC", "SUNNonlinSolSetup",
+                   "SUNNonlinSolSolve", "SUNLinSolSetup", "SUNLinSolSolve")
+
+ctypedef int (*NativeResFn)(sunrealtype t, sunrealtype* yy, sunrealtype* yp,
+                            sunrealtype* rr, void* data) noexcept nogil
+
+ctypedef int (*NativeEventsFn)(sunrealtype t, sunrealtype* yy, sunrealtype* yp,
+                               sunrealtype* ee, void* data) noexcept nogil
+
+ctypedef int (*NativeJacFn)(sunrealtype t, sunrealtype* yy, sunrealtype* yp,
+                            sunrealtype* rr, sunrealtype cj, sunrealtype* JJ,
+                            void* data) noexcept nogil
+
+ctypedef int (*NativeSetupFn)(sunrealtype t, sunrealtype* yy, sunrealtype* yp,
+                              sunrealtype* rr, sunrealtype cj,
+                              void* data) noexcept nogil
+
+ctypedef int (*NativePSolveFn)(sunrealtype t, sunrealtype* yy, sunrealtype* yp,
+                               sunrealtype* rr, sunrealtype* rv,
+                               sunrealtype* zv, sunrealtype cj,
+                               sunrealtype delta, void* data) noexcept nogil
+
+ctypedef int (*NativeJvSolveFn)(sunrealtype t, sunrealtype* yy, sunrealtype* yp,
+                                sunrealtype* rr, sunrealtype* vv,
+                                sunrealtype* Jv, sunrealtype cj,
+                                void* data) noexcept nogil
+
+
+cdef struct NativeFns:
+    NativeResFn resfn
+    NativeEventsFn eventsfn
+    NativeJacFn jacfn
+    NativeSetupFn psetup
+    NativePSolveFn psolve
+    NativeSetupFn jvsetup
+    NativeJvSolveFn jvsolve
+    void* resfn_data
+    void* eventsfn_data
+    void* jacfn_data
+    void* psetup_data
+    void* psolve_data
+    void* jvsetup_data
+    void* jvsolve_data
+    sunrealtype* JJ             # Jacobian buffer, AuxData.np_JJ
+    sunindextype* indices       # CSC indices, if 'sparsity' is given
+    sunindextype* indptr        # CSC index pointers, if 'sparsity' is given
+    bint compact                # 'JJ' aliases SUNMatrix data, 'jac_storage'
+
+
+# Native wrappers take a NativeFns pointer as 'data' and don't need the GIL.
+# They are attached in place of the Python wrappers when all callbacks are
+# native, and are also used by the Python wrappers for mixed callbacks.
+
+cdef int _resfn_nogil(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                      void* data) noexcept nogil:
+    """Calls a native 'resfn' directly with N_Vector data pointers."""
+    cdef NativeFns* fns = <NativeFns*> data
+
+    return fns.resfn(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp),
+                     N_VGetArrayPointer(rr), fns.resfn_data)
+
+
+cdef int _eventsfn_nogil(sunrealtype t, N_Vector yy, N_Vector yp,
+                         sunrealtype* ee, void* data) noexcept nogil:
+    """Calls a native 'eventsfn' directly with N_Vector data pointers."""
+    cdef NativeFns* fns = <NativeFns*> data
+
+    return fns.eventsfn(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp), ee,
+                        fns.eventsfn_data)
+
+
+cdef int _jacfn_nogil(sunrealtype t, sunrealtype cj, N_Vector yy, N_Vector yp,
+                      N_Vector rr, SUNMatrix JJ, void* data, N_Vector tmp1,
+                      N_Vector tmp2, N_Vector tmp3) noexcept nogil:
+    """Calls a native 'jacfn' directly with N_Vector data pointers."""
+    cdef int flag
+    cdef NativeFns* fns = <NativeFns*> data
+    cdef sunrealtype* jj = fns.JJ
+    cdef SUNMatrix_ID matrix_id = SUNMatGetID(JJ)
+
+    if fns.compact and matrix_id == SUNMATRIX_DENSE:
+        jj = SUNDenseMatrix_Data(JJ)
+    elif fns.compact and matrix_id == SUNMATRIX_SPARSE:
+        jj = smat_compact(JJ, fns.indices, fns.indptr)
+
+    flag = fns.jacfn(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp),
+                     N_VGetArrayPointer(rr), cj, jj, fns.jacfn_data)
+
+    if not fns.compact:
+        ptr2smat(jj, JJ, fns.indices, fns.indptr)
+    elif matrix_id == SUNMATRIX_BAND:
+        band2smat(jj, JJ)
+
+    return flag
+
+
+cdef int _psetup_nogil(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                       sunrealtype cj, void* data) noexcept nogil:
+    """Calls a native 'psetup' directly with N_Vector data pointers."""
+    cdef NativeFns* fns = <NativeFns*> data
+
+    return fns.psetup(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp),
+                      N_VGetArrayPointer(rr), cj, fns.psetup_data)
+
+
+cdef int _psolve_nogil(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                       N_Vector rv, N_Vector zv, sunrealtype cj,
+                       sunrealtype delta, void* data) noexcept nogil:
+    """Calls a native 'psolve' directly with N_Vector data pointers."""
+    cdef NativeFns* fns = <NativeFns*> data
+
+    return fns.psolve(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp),
+                      N_VGetArrayPointer(rr), N_VGetArrayPointer(rv),
+                      N_VGetArrayPointer(zv), cj, delta, fns.psolve_data)
+
+
+cdef int _jvsetup_nogil(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                        sunrealtype cj, void* data) noexcept nogil:
+    """Calls a native 'jvsetup' directly with N_Vector data pointers."""
+    cdef NativeFns* fns = <NativeFns*> data
+
+    return fns.jvsetup(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp),
+                       N_VGetArrayPointer(rr), cj, fns.jvsetup_data)
+
+
+cdef int _jvsolve_nogil(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                        N_Vector vv, N_Vector Jv, sunrealtype cj, void* data,
+                        N_Vector tmp1, N_Vector tmp2) noexcept nogil:
+    """Calls a native 'jvsolve' directly with N_Vector data pointers."""
+    cdef NativeFns* fns = <NativeFns*> data
+
+    return fns.jvsolve(t, N_VGetArrayPointer(yy), N_VGetArrayPointer(yp),
+                       N_VGetArrayPointer(rr), N_VGetArrayPointer(vv),
+                       N_VGetArrayPointer(Jv), cj, fns.jvsolve_data)
+
 
 cdef int _resfn_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
                         void* data) except? -1:
     """Wraps 'resfn' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_rr
 
     aux = <AuxData> data
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
+    if aux.native.resfn is not NULL:
+        return _resfn_nogil(t, yy, yp, rr, &aux.native)
+
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_rr = svec2view(rr, aux.views)
+    else:
+        np_yy, np_yp, np_rr = aux.np_yy, aux.np_yp, aux.np_rr
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
 
     if aux.with_userdata:
-        _ = aux.resfn(t, aux.np_yy, aux.np_yp, aux.np_rr, aux.userdata)
+        _ = aux.resfn(t, np_yy, np_yp, np_rr, aux.userdata)
     else:
-        _ = aux.resfn(t, aux.np_yy, aux.np_yp, aux.np_rr)
+        _ = aux.resfn(t, np_yy, np_yp, np_rr)
 
-    np2svec(aux.np_rr, rr)
+    if not aux.zero_copy:
+        np2svec(np_rr, rr)
     
     return 0
 
@@ -115,18 +297,30 @@ cdef int _resfn_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
 cdef int _eventsfn_wrapper(sunrealtype t, N_Vector yy, N_Vector yp,
                            sunrealtype* ee, void* data) except? -1:
     """Wraps 'eventsfn' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_ee
 
     aux = <AuxData> data
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
+    if aux.native.eventsfn is not NULL:
+        return _eventsfn_nogil(t, yy, yp, ee, &aux.native)
+
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_ee = ptr2view(ee, aux.np_ee.size, aux.views)
+    else:
+        np_yy, np_yp, np_ee = aux.np_yy, aux.np_yp, aux.np_ee
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
 
     if aux.with_userdata:
-        _ = aux.eventsfn(t, aux.np_yy, aux.np_yp, aux.np_ee, aux.userdata)
+        _ = aux.eventsfn(t, np_yy, np_yp, np_ee, aux.userdata)
     else:
-        _ = aux.eventsfn(t, aux.np_yy, aux.np_yp, aux.np_ee)
+        _ = aux.eventsfn(t, np_yy, np_yp, np_ee)
 
-    np2ptr(aux.np_ee, ee)
+    if not aux.zero_copy:
+        np2ptr(np_ee, ee)
     
     return 0
 
@@ -135,20 +329,37 @@ cdef int _jacfn_wrapper(sunrealtype t, sunrealtype cj, N_Vector yy, N_Vector yp,
                         N_Vector rr, SUNMatrix JJ, void* data, N_Vector tmp1,
                         N_Vector tmp2, N_Vector tmp3) except? -1:
     """Wraps 'jacfn' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_rr, np_JJ
     
     aux = <AuxData> data
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
-    svec2np(rr, aux.np_rr)
+    if aux.native.jacfn is not NULL:
+        return _jacfn_nogil(t, cj, yy, yp, rr, JJ, &aux.native, tmp1, tmp2,
+                            tmp3)
+
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_rr = svec2view(rr, aux.views)
+    else:
+        np_yy, np_yp, np_rr = aux.np_yy, aux.np_yp, aux.np_rr
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
+        svec2np(rr, np_rr)
+
+    if aux.jac_compact:
+        np_JJ = smat2view(JJ, aux.native.indices, aux.native.indptr, aux.views)
+    else:
+        np_JJ = aux.np_JJ
 
     if aux.with_userdata:
-        _ = aux.jacfn(t, aux.np_yy, aux.np_yp, aux.np_rr, cj, aux.np_JJ,
-                      aux.userdata)
+        _ = aux.jacfn(t, np_yy, np_yp, np_rr, cj, np_JJ, aux.userdata)
     else:
-        _ = aux.jacfn(t, aux.np_yy, aux.np_yp, aux.np_rr, cj, aux.np_JJ)
+        _ = aux.jacfn(t, np_yy, np_yp, np_rr, cj, np_JJ)
 
-    np2smat(aux.np_JJ, JJ, aux.sparsity)
+    if not aux.jac_compact:
+        np2smat(aux.np_JJ, JJ, aux.sparsity)
 
     return 0
 
@@ -156,18 +367,30 @@ cdef int _jacfn_wrapper(sunrealtype t, sunrealtype cj, N_Vector yy, N_Vector yp,
 cdef int _psetup_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
                          sunrealtype cj, void* data) except? -1:
     """Wraps 'psetup' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_rr
     
     aux = <AuxData> data
+
+    if aux.native.psetup is not NULL:
+        return _psetup_nogil(t, yy, yp, rr, cj, &aux.native)
+
     psetup = aux.precond.setupfn
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
-    svec2np(rr, aux.np_rr)
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_rr = svec2view(rr, aux.views)
+    else:
+        np_yy, np_yp, np_rr = aux.np_yy, aux.np_yp, aux.np_rr
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
+        svec2np(rr, np_rr)
 
     if aux.with_userdata:
-        _ = psetup(t, aux.np_yy, aux.np_yp, aux.np_rr, cj, aux.userdata)
+        _ = psetup(t, np_yy, np_yp, np_rr, cj, aux.userdata)
     else:
-        _ = psetup(t, aux.np_yy, aux.np_yp, aux.np_rr, cj)
+        _ = psetup(t, np_yy, np_yp, np_rr, cj)
 
     return 0
 
@@ -176,23 +399,38 @@ cdef int _psolve_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
                          N_Vector rv, N_Vector zv, sunrealtype cj,
                          sunrealtype delta, void* data) except? -1:
     """Wraps 'psolve' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_rr, np_rv, np_zv
     
     aux = <AuxData> data
+
+    if aux.native.psolve is not NULL:
+        return _psolve_nogil(t, yy, yp, rr, rv, zv, cj, delta, &aux.native)
+
     psolve = aux.precond.solvefn
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
-    svec2np(rr, aux.np_rr)
-    svec2np(rv, aux.np_rv)
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_rr = svec2view(rr, aux.views)
+        np_rv = svec2view(rv, aux.views)
+        np_zv = svec2view(zv, aux.views)
+    else:
+        np_yy, np_yp, np_rr = aux.np_yy, aux.np_yp, aux.np_rr
+        np_rv, np_zv = aux.np_rv, aux.np_zv
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
+        svec2np(rr, np_rr)
+        svec2np(rv, np_rv)
 
     if aux.with_userdata:
-        _ = psolve(t, aux.np_yy, aux.np_yp, aux.np_rr, aux.np_rv, aux.np_zv,
-                   cj, delta, aux.userdata)
+        _ = psolve(t, np_yy, np_yp, np_rr, np_rv, np_zv, cj, delta,
+                   aux.userdata)
     else:
-        _ = psolve(t, aux.np_yy, aux.np_yp, aux.np_rr, aux.np_rv, aux.np_zv,
-                   cj, delta)
+        _ = psolve(t, np_yy, np_yp, np_rr, np_rv, np_zv, cj, delta)
 
-    np2svec(aux.np_zv, zv)
+    if not aux.zero_copy:
+        np2svec(np_zv, zv)
 
     return 0
 
@@ -200,18 +438,30 @@ cdef int _psolve_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
 cdef int _jvsetup_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
                           sunrealtype cj, void* data) except? -1:
     """Wraps 'jvsolve' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_rr
     
     aux = <AuxData> data
+
+    if aux.native.jvsetup is not NULL:
+        return _jvsetup_nogil(t, yy, yp, rr, cj, &aux.native)
+
     jvsetup = aux.jactimes.setupfn
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
-    svec2np(rr, aux.np_rr)
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_rr = svec2view(rr, aux.views)
+    else:
+        np_yy, np_yp, np_rr = aux.np_yy, aux.np_yp, aux.np_rr
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
+        svec2np(rr, np_rr)
 
     if aux.with_userdata:
-        _ = jvsetup(t, aux.np_yy, aux.np_yp, aux.np_rr, cj, aux.userdata)
+        _ = jvsetup(t, np_yy, np_yp, np_rr, cj, aux.userdata)
     else:
-        _ = jvsetup(t, aux.np_yy, aux.np_yp, aux.np_rr, cj)
+        _ = jvsetup(t, np_yy, np_yp, np_rr, cj)
 
     return 0
 
@@ -220,30 +470,138 @@ cdef int _jvsolve_wrapper(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
                           N_Vector vv, N_Vector Jv, sunrealtype cj, void* data,
                           N_Vector tmp1, N_Vector tmp2) except? -1:
     """Wraps 'jvsolve' by converting between N_Vector and ndarray types."""
+    cdef np.ndarray np_yy, np_yp, np_rr, np_vv, np_Jv
     
     aux = <AuxData> data
+
+    if aux.native.jvsolve is not NULL:
+        return _jvsolve_nogil(t, yy, yp, rr, vv, Jv, cj, &aux.native, tmp1,
+                              tmp2)
+
     jvsolve = aux.jactimes.solvefn
 
-    svec2np(yy, aux.np_yy)
-    svec2np(yp, aux.np_yp)
-    svec2np(rr, aux.np_rr)
-    svec2np(vv, aux.np_vv)
+    if aux.zero_copy:
+        np_yy = svec2view(yy, aux.views)
+        np_yp = svec2view(yp, aux.views)
+        np_rr = svec2view(rr, aux.views)
+        np_vv = svec2view(vv, aux.views)
+        np_Jv = svec2view(Jv, aux.views)
+    else:
+        np_yy, np_yp, np_rr = aux.np_yy, aux.np_yp, aux.np_rr
+        np_vv, np_Jv = aux.np_vv, aux.np_Jv
+
+        svec2np(yy, np_yy)
+        svec2np(yp, np_yp)
+        svec2np(rr, np_rr)
+        svec2np(vv, np_vv)
 
     if aux.with_userdata:
-        _ = jvsolve(t, aux.np_yy, aux.np_yp, aux.np_rr, aux.np_vv,
-                    aux.np_Jv, cj, aux.userdata)
+        _ = jvsolve(t, np_yy, np_yp, np_rr, np_vv, np_Jv, cj, aux.userdata)
     else:
-        _ = jvsolve(t, aux.np_yy, aux.np_yp, aux.np_rr, aux.np_vv,
-                    aux.np_Jv, cj)
+        _ = jvsolve(t, np_yy, np_yp, np_rr, np_vv, np_Jv, cj)
 
-    np2svec(aux.np_Jv, Jv)
+    if not aux.zero_copy:
+        np2svec(np_Jv, Jv)
 
     return 0
 
 
+# Profiled wrappers time the Python wrappers above for the 'profile' option.
+# They are only attached when profiling, so there is no cost otherwise.
+
+cdef int _resfn_profiled(sunrealtype t, N_Vector yy, N_Vector yp, N_Vector rr,
+                         void* data) except? -1:
+    """Times '_resfn_wrapper' as the 'resfn' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_FN)
+    try:
+        return _resfn_wrapper(t, yy, yp, rr, data)
+    finally:
+        prof.end()
+
+
+cdef int _eventsfn_profiled(sunrealtype t, N_Vector yy, N_Vector yp,
+                            sunrealtype* ee, void* data) except? -1:
+    """Times '_eventsfn_wrapper' as the 'eventsfn' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_EVENTS)
+    try:
+        return _eventsfn_wrapper(t, yy, yp, ee, data)
+    finally:
+        prof.end()
+
+
+cdef int _jacfn_profiled(sunrealtype t, sunrealtype cj, N_Vector yy,
+                         N_Vector yp, N_Vector rr, SUNMatrix JJ, void* data,
+                         N_Vector tmp1, N_Vector tmp2,
+                         N_Vector tmp3) except? -1:
+    """Times '_jacfn_wrapper' as the 'jacfn' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_JAC)
+    try:
+        return _jacfn_wrapper(t, cj, yy, yp, rr, JJ, data, tmp1, tmp2, tmp3)
+    finally:
+        prof.end()
+
+
+cdef int _psetup_profiled(sunrealtype t, N_Vector yy, N_Vector yp,
+                          N_Vector rr, sunrealtype cj, void* data) except? -1:
+    """Times '_psetup_wrapper' as the 'psetup' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_PSETUP)
+    try:
+        return _psetup_wrapper(t, yy, yp, rr, cj, data)
+    finally:
+        prof.end()
+
+
+cdef int _psolve_profiled(sunrealtype t, N_Vector yy, N_Vector yp,
+                          N_Vector rr, N_Vector rv, N_Vector zv,
+                          sunrealtype cj, sunrealtype delta,
+                          void* data) except? -1:
+    """Times '_psolve_wrapper' as the 'psolve' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_PSOLVE)
+    try:
+        return _psolve_wrapper(t, yy, yp, rr, rv, zv, cj, delta, data)
+    finally:
+        prof.end()
+
+
+cdef int _jvsetup_profiled(sunrealtype t, N_Vector yy, N_Vector yp,
+                           N_Vector rr, sunrealtype cj, void* data) except? -1:
+    """Times '_jvsetup_wrapper' as the 'jvsetup' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_JVSETUP)
+    try:
+        return _jvsetup_wrapper(t, yy, yp, rr, cj, data)
+    finally:
+        prof.end()
+
+
+cdef int _jvsolve_profiled(sunrealtype t, N_Vector yy, N_Vector yp,
+                           N_Vector rr, N_Vector vv, N_Vector Jv,
+                           sunrealtype cj, void* data, N_Vector tmp1,
+                           N_Vector tmp2) except? -1:
+    """Times '_jvsolve_wrapper' as the 'jvsolve' region."""
+    cdef Profiler prof = (<AuxData> data).profiler
+
+    prof.begin(PROF_JVSOLVE)
+    try:
+        return _jvsolve_wrapper(t, yy, yp, rr, vv, Jv, cj, data, tmp1, tmp2)
+    finally:
+        prof.end()
+
+
 cdef void _err_handler(int line, const char* func, const char* file,
                        const char* msg, int err_code, void* err_user_data,
-                       SUNContext ctx) except *:
+                       SUNContext ctx) noexcept with gil:
     """Custom error handler for shorter messages (no line or file)."""
     cdef PyObject *errtype, *errvalue, *errtraceback
     
@@ -274,6 +632,7 @@ cdef class AuxData:
     cdef np.ndarray np_yp       # yy time derivatives
     cdef np.ndarray np_rr       # residuals array
     cdef np.ndarray np_ee       # events array
+    cdef np.ndarray np_oo       # outputfn array
     cdef np.ndarray np_JJ       # Jacobian matrix
     cdef np.ndarray np_rv       # precond rvec
     cdef np.ndarray np_zv       # precond zvec
@@ -282,16 +641,25 @@ cdef class AuxData:
     cdef np.ndarray np_cc       # constraints (-2, -1, 0, 1, 2)
     cdef bint with_userdata
     cdef bint is_constrained
-
+    cdef bint zero_copy
+    cdef bint nogil             # all callbacks are native, see _all_native
+    cdef bint jac_compact       # 'JJ' aliases SUNMatrix data, 'jac_storage'
+
+    cdef NativeFns native       # LowLevelCallable pointers, NULL if Python
+    cdef np.ndarray indices     # sparsity.indices, as sunindextype
+    cdef np.ndarray indptr      # sparsity.indptr, as sunindextype
+    cdef dict views             # dict[int, np.ndarray], see ptr2view
     cdef object pyerr           # Exception
     cdef object resfn           # Callable
     cdef object userdata        # Any
     cdef object eventsfn        # Callable
+    cdef object outputfn        # Callable
     cdef object jacfn           # Callable
     cdef object linsolver       # str
     cdef object sparsity        # csc_matrix
     cdef object precond         # IDAPrecond
     cdef object jactimes        # IDAJacTimes
+    cdef Profiler profiler      # None unless 'profile'
 
     def __cinit__(self, sunindextype NEQ, object options):
         self.pyerr = None
@@ -299,26 +667,73 @@ cdef class AuxData:
         self.np_yp = np.empty(NEQ, DTYPE)
         self.np_rr = np.empty(NEQ, DTYPE)
         
+        self.views = {}
+        self.zero_copy = options["zero_copy"]
+
         self.resfn = options["resfn"]
         self.userdata = options["userdata"]
         self.with_userdata = 1 if self.userdata is not None else 0
 
+        if isinstance(self.resfn, LowLevelCallable):
+            self.native.resfn = <NativeResFn> llc2func(self.resfn)
+            self.native.resfn_data = llc2data(self.resfn)
+
         self.eventsfn = options["eventsfn"]
         self.np_ee = np.empty(options["num_events"], DTYPE)
 
+        self.outputfn = options["outputfn"]
+        self.np_oo = np.empty(options["num_outputs"], DTYPE)
+
+        if isinstance(self.eventsfn, LowLevelCallable):
+            self.native.eventsfn = <NativeEventsFn> llc2func(self.eventsfn)
+            self.native.eventsfn_data = llc2data(self.eventsfn)
+
         self.jacfn = options["jacfn"]
-        if self.jacfn is not None:
+        self.linsolver = options["linsolver"]
+        self.sparsity = options["sparsity"]
+        self.jac_compact = options["jac_storage"] == "compact"
+
+        # with 'full' storage, 'jacfn' fills a persistent row-major (N, N)
+        # array that is copied into SUNDIALS. With 'compact', Python functions
+        # get a view of the SUNMatrix data (Fortran order for dense solvers)
+        # and compiled functions the raw buffer, see _jacfn_nogil.
+        native_jacfn = isinstance(self.jacfn, LowLevelCallable)
+
+        if self.jacfn is None:
+            self.np_JJ = np.empty(0, DTYPE)
+        elif not self.jac_compact:
             self.np_JJ = np.zeros((NEQ, NEQ), DTYPE)
+        elif "band" in self.linsolver and native_jacfn:
+            nbands = options["lband"] + options["uband"] + 1
+            self.np_JJ = np.zeros(nbands*NEQ, DTYPE)  # see band2smat
         else:
-            self.np_JJ = np.empty(0, DTYPE)
+            self.np_JJ = np.empty(0, DTYPE)  # Python gets a smat2view
 
-        self.linsolver = options["linsolver"]
-        self.sparsity = options["sparsity"]
+        if self.sparsity is not None:
+            self.indices = np.asarray(self.sparsity.indices, INT_TYPE)
+            self.indptr = np.asarray(self.sparsity.indptr, INT_TYPE)
+
+            self.native.indices = <sunindextype*> self.indices.data
+            self.native.indptr = <sunindextype*> self.indptr.data
+
+        if native_jacfn:
+            self.native.jacfn = <NativeJacFn> llc2func(self.jacfn)
+            self.native.jacfn_data = llc2data(self.jacfn)
+            self.native.JJ = <sunrealtype*> self.np_JJ.data
+            self.native.compact = self.jac_compact
 
         self.precond = options["precond"]
         if self.precond is not None:
             self.np_rv = np.empty(NEQ, DTYPE)
             self.np_zv = np.empty(NEQ, DTYPE)
+
+            setupfn, solvefn = self.precond.setupfn, self.precond.solvefn
+            if isinstance(setupfn, LowLevelCallable):
+                self.native.psetup = <NativeSetupFn> llc2func(setupfn)
+                self.native.psetup_data = llc2data(setupfn)
+            if isinstance(solvefn, LowLevelCallable):
+                self.native.psolve = <NativePSolveFn> llc2func(solvefn)
+                self.native.psolve_data = llc2data(solvefn)
         else:
             self.np_rv = np.empty(0, DTYPE)
             self.np_zv = np.empty(0, DTYPE)
@@ -327,6 +742,14 @@ cdef class AuxData:
         if self.jactimes is not None:
             self.np_vv = np.empty(NEQ, DTYPE)
             self.np_Jv = np.empty(NEQ, DTYPE)
+
+            setupfn, solvefn = self.jactimes.setupfn, self.jactimes.solvefn
+            if isinstance(setupfn, LowLevelCallable):
+                self.native.jvsetup = <NativeSetupFn> llc2func(setupfn)
+                self.native.jvsetup_data = llc2data(setupfn)
+            if isinstance(solvefn, LowLevelCallable):
+                self.native.jvsolve = <NativeJvSolveFn> llc2func(solvefn)
+                self.native.jvsolve_data = llc2data(solvefn)
         else:
             self.np_vv = np.empty(0, DTYPE)
             self.np_Jv = np.empty(0, DTYPE)
@@ -344,37 +767,73 @@ cdef class AuxData:
             self.is_constrained = False
             self.np_cc = np.zeros(0, INT_TYPE)
 
+        if options["profile"]:
+            self.profiler = Profiler(_PROFILE_REGIONS, _PROFILE_TIMERS)
+        else:
+            self.profiler = None
+
+        # profiling times each callback, so the Python wrappers are required
+        self.nogil = _all_native(options) and self.profiler is None
+
 
 cdef class _idaLSSparseDQJac:
     """
     Sparse Jacobian approximation.
     
     This routine generates a sparse difference quotient approximation to the
-    system Jacobian. If the dense or banded solvers are being used the routine
-    fills a 2D array and is therefore less memory efficient, however, this can
-    still improve computational times to evaluate the Jacobian. In contrast,
-    if the sparse linear solver is used then a 1D array with NNZ elements is
-    used to carry around the output.
+    system Jacobian. If the banded solvers are being used the routine fills a
+    2D array and is therefore less memory efficient, however, this can still
+    improve computational times to evaluate the Jacobian. In contrast, values
+    are written in place to the SUNMatrix data for the dense and sparse linear
+    solvers.
 
     """
     cdef void* mem
     cdef AuxData aux
 
-    cdef object groups      # dict[int, np.ndarray[int]]
     cdef object sparsity    # csc_matrix, shape(NEQ, NEQ)
 
-    def __cinit__(self, AuxData aux, object sparsity):
+    # Scatter plan, built once. Columns and nonzeros are sorted by group, so
+    # group k spans cols[colptr[k]:colptr[k+1]] and rows[nzptr[k]:nzptr[k+1]].
+    cdef np.ndarray colptr  # int[ngroups + 1]
+    cdef np.ndarray cols    # int[NEQ], columns sorted by group
+    cdef np.ndarray nzptr   # int[ngroups + 1]
+    cdef np.ndarray rows    # int[nnz], row of each nonzero
+    cdef np.ndarray jcols   # int[nnz], column of each nonzero
+    cdef np.ndarray dest    # int[nnz], flat index into JJ for each nonzero
+    cdef np.ndarray ytemp, yptemp, rtemp   # preallocated work arrays
 
-        grouped_cols = group_columns(sparsity)
+    def __cinit__(self, AuxData aux, object sparsity, object groups = None):
+
+        if groups is None:
+            grouped_cols = group_columns(sparsity)
+        else:
+            grouped_cols = np.asarray(groups)
         ngroups = np.max(grouped_cols) + 1
 
-        groups = {}
-        for i in range(ngroups):
-            cols = np.where(grouped_cols == i)[0]           
-            groups[i] = np.array(cols, INT_TYPE)       
-        
+        NEQ = sparsity.shape[0]
+        counts = np.diff(sparsity.indptr)
+        nz_cols = np.repeat(np.arange(NEQ), counts)
+        nz_order = np.argsort(grouped_cols[nz_cols], kind="stable")
+
+        col_sizes = np.bincount(grouped_cols, minlength=ngroups)
+        nz_sizes = np.bincount(grouped_cols[nz_cols], minlength=ngroups)
+
+        self.colptr = np.zeros(ngroups + 1, INT_TYPE)
+        self.colptr[1:] = np.cumsum(col_sizes)
+        self.cols = np.argsort(grouped_cols, kind="stable").astype(INT_TYPE)
+
+        self.nzptr = np.zeros(ngroups + 1, INT_TYPE)
+        self.nzptr[1:] = np.cumsum(nz_sizes)
+        self.rows = sparsity.indices[nz_order].astype(INT_TYPE)
+        self.jcols = nz_cols[nz_order].astype(INT_TYPE)
+        self.dest = nz_order.astype(INT_TYPE)  # position in CSC data
+
+        self.ytemp = np.empty(NEQ, DTYPE)
+        self.yptemp = np.empty(NEQ, DTYPE)
+        self.rtemp = np.empty(NEQ, DTYPE)
+
         self.aux = aux
-        self.groups = groups
         self.sparsity = sparsity
 
     def __call__(
@@ -389,17 +848,23 @@ cdef class _idaLSSparseDQJac:
     ):
 
         cdef sunrealtype hh, uround, srur
-        cdef sunindextype j, k, start, end
-        cdef np.ndarray[INT_TYPE_t, ndim=1] cols, indices
-        cdef np.ndarray[DTYPE_t, ndim=1] diff, inc, inc_inv
-        cdef np.ndarray[DTYPE_t, ndim=1] ytemp, yptemp, rtemp
+        cdef sunindextype i, j, k, m
+        cdef sunrealtype* jj = <sunrealtype*> JJ.data
+        cdef np.ndarray[INT_TYPE_t, ndim=1] colptr = self.colptr
+        cdef np.ndarray[INT_TYPE_t, ndim=1] cols = self.cols
+        cdef np.ndarray[INT_TYPE_t, ndim=1] nzptr = self.nzptr
+        cdef np.ndarray[INT_TYPE_t, ndim=1] rows = self.rows
+        cdef np.ndarray[INT_TYPE_t, ndim=1] jcols = self.jcols
+        cdef np.ndarray[INT_TYPE_t, ndim=1] dest = self.dest
+        cdef np.ndarray[DTYPE_t, ndim=1] inc, inc_inv
+        cdef np.ndarray[DTYPE_t, ndim=1] ytemp = self.ytemp
+        cdef np.ndarray[DTYPE_t, ndim=1] yptemp = self.yptemp
+        cdef np.ndarray[DTYPE_t, ndim=1] rtemp = self.rtemp
         
         aux = <AuxData> self.aux
-        sparsity = self.sparsity
 
-        ytemp = y.copy()
-        yptemp = yp.copy()
-        rtemp = res.copy()
+        ytemp[:] = y
+        yptemp[:] = yp
         
         IDAGetCurrentStep(self.mem, &hh)
 
@@ -423,52 +888,74 @@ cdef class _idaLSSparseDQJac:
 
         inc_inv = 1. / inc
 
-        ngroups = len(self.groups)
-        for k in range(ngroups):
-            cols = self.groups[k]
-
-            ytemp[cols] += inc[cols]
-            yptemp[cols] += cj*inc[cols]
+        for k in range(colptr.shape[0] - 1):
+            for m in range(colptr[k], colptr[k+1]):
+                j = cols[m]
+                ytemp[j] += inc[j]
+                yptemp[j] += cj*inc[j]
           
-            if aux.with_userdata:
+            if aux.native.resfn is not NULL:
+                _ = aux.native.resfn(t, <sunrealtype*> ytemp.data,
+                                     <sunrealtype*> yptemp.data,
+                                     <sunrealtype*> rtemp.data,
+                                     aux.native.resfn_data)
+            elif aux.with_userdata:
                 _ = aux.resfn(t, ytemp, yptemp, rtemp, aux.userdata)
             else:
                 _ = aux.resfn(t, ytemp, yptemp, rtemp)
 
-            diff = rtemp - res
-            
-            for j in cols:
-                start = sparsity.indptr[j]
-                end = sparsity.indptr[j+1]
-
-                indices = sparsity.indices[start:end]
-                if JJ.ndim == 1:
-                    JJ[start:end] = inc_inv[j]*diff[indices]
-                elif JJ.ndim == 2:
-                    JJ[indices, j] = inc_inv[j]*diff[indices]
-                
-            ytemp[cols] = y[cols]
-            yptemp[cols] = yp[cols]
-
-    cdef _setup_memory(self, void* mem, sunindextype NEQ):
+            for m in range(nzptr[k], nzptr[k+1]):
+                i = rows[m]
+                jj[dest[m]] = inc_inv[jcols[m]]*(rtemp[i] - res[i])
+
+            for m in range(colptr[k], colptr[k+1]):
+                j = cols[m]
+                ytemp[j] = y[j]
+                yptemp[j] = yp[j]
+
+    cdef _setup_memory(self, void* mem, SUNMatrix A, sunindextype NEQ):
         """
-        Store mem for access to current step, and prep either 1D or 2D array
-        for Jacobian storage.
+        Store mem for access to current step, and point 'dest' at the SUNMatrix
+        data so that all Jacobians are written in place.
         
         """
+        cdef sunindextype ldim, lband, uband
+
         self.mem = mem
         self.aux.jacfn = self
 
         if self.aux.linsolver == "sparse":
-            nnz = self.sparsity.nnz
-            self.aux.np_JJ = np.zeros(nnz, DTYPE)
+            self.aux.jac_compact = True  # 'dest' indexes the CSC data
+        elif "dense" in self.aux.linsolver:
+            self.aux.jac_compact = True  # column-major SUNDenseMatrix data
+            self.dest = (self.rows + self.jcols*NEQ).astype(INT_TYPE)
         else:
-            self.aux.np_JJ = np.zeros((NEQ, NEQ), DTYPE)
+            self.aux.jac_compact = True  # 'solve_banded' view, see smat2view
+
+            ldim = SUNBandMatrix_LDim(A)
+            lband = SUNBandMatrix_LowerBandwidth(A)
+            uband = SUNBandMatrix_UpperBandwidth(A)
+
+            # drop nonzeros outside of the band, which have no storage
+            ngroups = self.nzptr.size - 1
+            groups = np.repeat(np.arange(ngroups), np.diff(self.nzptr))
+
+            keep = (self.rows - self.jcols <= lband) \
+                & (self.jcols - self.rows <= uband)
+
+            self.nzptr[1:] = np.cumsum(np.bincount(groups[keep],
+                                                   minlength=ngroups))
+
+            self.rows = self.rows[keep]
+            self.jcols = self.jcols[keep]
+            self.dest = (uband + self.rows - self.jcols
+                         + self.jcols*ldim).astype(INT_TYPE)
     
 
 class IDAResult(RichResult):
-    _order_keys = ["message", "success", "status", "t", "y", "yp", "i_events",
-                   "t_events", "y_events", "yp_events", "nfev", "njev",]
+    _order_keys = ["message", "success", "status", "t", "y", "yp", "outputs",
+                   "i_events", "t_events", "y_events", "yp_events", "nfev",
+                   "njev", "stats", "profile", "auto", "sol",]
 
 
 cdef class IDA:
@@ -479,6 +966,7 @@ cdef class IDA:
     cdef N_Vector constraints
     cdef N_Vector yy
     cdef N_Vector yp
+    cdef N_Vector dky           # work vector for IDAGetDky
     cdef SUNMatrix A 
     cdef SUNLinearSolver LS
     cdef sunindextype NEQ
@@ -488,6 +976,10 @@ cdef class IDA:
     cdef object _malloc         # bool - flag for memory allocation
     cdef object _options        # dict[str, Any]
     cdef object _initialized    # bool - flag for init_step completion
+    cdef StepTracer _tracer     # None unless 'trace'
+    cdef object _groups         # 'sparsity' coloring from a JacobianStructure
+    cdef object _auto_request   # dict of 'auto' options as given, or None
+    cdef object _auto           # dict of resolved 'auto' choices, or None
 
     def __cinit__(self, object resfn, **options):
         self._free_memory()
@@ -518,8 +1010,22 @@ cdef class IDA:
             "eventsfn": None,
             "num_events": 0,
             "jacfn": None,
+            "jac_storage": "full",
             "precond": None,
             "jactimes": None,
+            "zero_copy": False,
+            "dense_output": False,
+            "save_idx": None,
+            "save_yp": True,
+            "save_order": "C",
+            "thin_rtol": None,
+            "thin_atol": None,
+            "thin_dt": None,
+            "outputfn": None,
+            "num_outputs": 0,
+            "save_y": True,
+            "profile": False,
+            "trace": 0,
         }
 
         invalid_keys = set(options.keys()) - set(self._options.keys())
@@ -528,8 +1034,30 @@ cdef class IDA:
         
         self._options.update(options)
 
+        structure = self._options["sparsity"]
+        if isinstance(structure, JacobianStructure):
+            self._options["sparsity"] = sp.csc_matrix(structure.pattern)
+            self._groups = structure.groups
+        else:
+            self._groups = None
+
         _check_options(self._options)
 
+        linsolver = self._options["linsolver"].lower()
+        if linsolver == "auto" or isinstance(self._options["sparsity"], str):
+            keys = ["linsolver", "lband", "uband", "sparsity"]
+            self._auto_request = {key: self._options[key] for key in keys}
+            self._auto_request["groups"] = self._groups
+        else:
+            self._auto_request = None
+
+        self._auto = None
+
+        if self._options["trace"]:
+            self._tracer = StepTracer(self._options["trace"])
+        else:
+            self._tracer = None
+
         self._initialized = False
 
     cdef _create_linsolver(self):
@@ -639,6 +1167,10 @@ cdef class IDA:
             N_VDestroy(self.yp)
             self.yp = NULL
 
+        if self.dky is not NULL:
+            N_VDestroy(self.dky)
+            self.dky = NULL
+
         if self.A is not NULL:
             SUNMatDestroy(self.A)
             self.A = NULL
@@ -650,6 +1182,63 @@ cdef class IDA:
         self._size = None
         self._malloc = False
 
+    cdef _resolve_auto(self, sunrealtype t0, np.ndarray y0, object yp0):
+        """
+        Replace 'auto' values of 'linsolver' and 'sparsity' with concrete
+        options. The Jacobian pattern is detected by probing 'resfn' at the
+        initial point, unless 'sparsity' was given. Only runs from _setup,
+        i.e., again if the size of the system changes.
+
+        """
+        request = self._auto_request
+        options = self._options
+
+        linsolver = request["linsolver"].lower()
+        sparsity = request["sparsity"]
+
+        if sparsity is None or isinstance(sparsity, str):
+            pattern = j_pattern(options["resfn"], t0, y0, yp0,
+                                options["userdata"], "probing", sparse=True)
+            pattern = sp.csc_matrix(pattern)
+            pattern.sum_duplicates()
+            groups = None
+        else:
+            pattern = sparsity
+            groups = request["groups"]
+
+        if linsolver == "auto":
+            choice = select_linsolver(pattern)
+        else:
+            lband, uband = request["lband"], request["uband"]
+            if "band" in linsolver and (lband is None or uband is None):
+                bands = bandwidth(pattern)
+                lband = bands[0] if lband is None else lband
+                uband = bands[1] if uband is None else uband
+
+            choice = {
+                "linsolver": linsolver, "lband": lband, "uband": uband,
+                "nnz": pattern.nnz, "density": pattern.nnz / y0.size**2,
+                "reason": "'linsolver' was given",
+            }
+
+        # the 'sparse' solver always needs the pattern, otherwise it is only
+        # kept for the difference quotient Jacobian when it was requested
+        use_sparsity = sparsity is not None or choice["linsolver"] == "sparse"
+
+        options["linsolver"] = choice["linsolver"]
+        options["lband"] = choice["lband"]
+        options["uband"] = choice["uband"]
+        options["sparsity"] = pattern if use_sparsity else None
+
+        self._groups = groups if use_sparsity else None
+
+        # a difference quotient Jacobian from a previous setup has the wrong
+        # size, a new one is made in _setup if 'sparsity' is used
+        if isinstance(options["jacfn"], _idaLSSparseDQJac):
+            options["jacfn"] = None
+
+        self._auto = {**choice, "sparsity": use_sparsity}
+
     cdef _setup(self, sunrealtype t0, np.ndarray[DTYPE_t, ndim=1] y0,
                 np.ndarray[DTYPE_t, ndim=1] yp0):
 
@@ -659,6 +1248,13 @@ cdef class IDA:
         cdef int flag
         cdef np.ndarray np_eventsdir
 
+        if len(y0) != len(yp0):
+            raise ValueError("'y0' and 'yp0' must be the same size.")
+
+        # 0) Resolve 'auto' linear solver and sparsity options
+        if self._auto_request is not None:
+            self._resolve_auto(t0, y0, yp0)
+
         # 1) Initialize parallel environment (skip, only use serial here)
 
         # 2) Create sundials context object
@@ -667,12 +1263,12 @@ cdef class IDA:
             raise RuntimeError(f"SUNContext_Create failed with {flag=}.")
 
         # 3) Create vectors of initial values
-        if len(y0) != len(yp0):
-            raise ValueError("'y0' and 'yp0' must be the same size.")
-        
         self.NEQ = <sunindextype> y0.size
         self.aux = AuxData(self.NEQ, self._options)
 
+        if self.aux.profiler is not None:
+            self.aux.profiler.attach(self.ctx)
+
         self.yy = N_VNew_Serial(self.NEQ, self.ctx)
         if self.yy is NULL:
             raise MemoryError("N_VNew_Serial returned a NULL pointer for yy.")
@@ -681,6 +1277,10 @@ cdef class IDA:
         if self.yp is NULL:
             raise MemoryError("N_VNew_Serial returned a NULL pointer for yp.")
 
+        self.dky = N_VNew_Serial(self.NEQ, self.ctx)
+        if self.dky is NULL:
+            raise MemoryError("N_VNew_Serial returned a NULL pointer for dky.")
+
         np2svec(y0.copy(), self.yy)
         np2svec(yp0.copy(), self.yp)
 
@@ -695,13 +1295,24 @@ cdef class IDA:
             raise MemoryError("IDACreate returned a NULL pointer for 'mem'.")
 
         # Attach AuxData - usually done in step 15, but needs to occur here,
-        # before attaching preconditioner.
-        flag = IDASetUserData(self.mem, <void*> self.aux)
+        # before attaching preconditioner. When all callbacks are native only
+        # the function pointers are needed, so SUNDIALS can run without GIL.
+        if self.aux.nogil:
+            flag = IDASetUserData(self.mem, <void*> &self.aux.native)
+        else:
+            flag = IDASetUserData(self.mem, <void*> self.aux)
+
         if flag < 0:
             raise RuntimeError("IDASetUserData - " + IDAMESSAGES[flag])
 
         # 8) Initialize IDA solver
-        flag = IDAInit(self.mem, _resfn_wrapper, t0, self.yy, self.yp)
+        if self.aux.nogil:
+            flag = IDAInit(self.mem, _resfn_nogil, t0, self.yy, self.yp)
+        elif self.aux.profiler is not None:
+            flag = IDAInit(self.mem, _resfn_profiled, t0, self.yy, self.yp)
+        else:
+            flag = IDAInit(self.mem, _resfn_wrapper, t0, self.yy, self.yp)
+
         if flag < 0:
             raise RuntimeError("IDAInit - " + IDAMESSAGES[flag])
 
@@ -715,16 +1326,33 @@ cdef class IDA:
 
         # 11) Set linear solver optional inputs
         sparsity = self._options["sparsity"]
-        if sparsity is not None:
-            spjac = _idaLSSparseDQJac(self.aux, sparsity)
-            spjac._setup_memory(self.mem, self.NEQ)
+        if sparsity is not None and self._options["jacfn"] is None:
+            spjac = _idaLSSparseDQJac(self.aux, sparsity, self._groups)
+            spjac._setup_memory(self.mem, self.A, self.NEQ)
             
-            if self._options["jacfn"] is None:
-                self._options["jacfn"] = spjac 
+            self._options["jacfn"] = spjac 
+
+        cdef IDALsJacFn jacfn_wrapper = _jacfn_wrapper
+        cdef IDALsPrecSetupFn psetup_wrapper = _psetup_wrapper
+        cdef IDALsPrecSolveFn psolve_wrapper = _psolve_wrapper
+        cdef IDALsJacTimesSetupFn jvsetup_wrapper = _jvsetup_wrapper
+        cdef IDALsJacTimesVecFn jvsolve_wrapper = _jvsolve_wrapper
+        if self.aux.nogil:
+            jacfn_wrapper = _jacfn_nogil
+            psetup_wrapper = _psetup_nogil
+            psolve_wrapper = _psolve_nogil
+            jvsetup_wrapper = _jvsetup_nogil
+            jvsolve_wrapper = _jvsolve_nogil
+        elif self.aux.profiler is not None:
+            jacfn_wrapper = _jacfn_profiled
+            psetup_wrapper = _psetup_profiled
+            psolve_wrapper = _psolve_profiled
+            jvsetup_wrapper = _jvsetup_profiled
+            jvsolve_wrapper = _jvsolve_profiled
 
         jacfn = self._options["jacfn"]
         if jacfn:
-            flag = IDASetJacFn(self.mem, _jacfn_wrapper)
+            flag = IDASetJacFn(self.mem, jacfn_wrapper)
             if flag < 0:
                 raise RuntimeError("IDASetJacFn - " + LSMESSAGES[flag])
 
@@ -732,12 +1360,12 @@ cdef class IDA:
         if precond is None:
             pass
         elif precond.setupfn is None:
-            flag = IDASetPreconditioner(self.mem, NULL, _psolve_wrapper)
+            flag = IDASetPreconditioner(self.mem, NULL, psolve_wrapper)
             if flag < 0:
                 raise RuntimeError("IDASetPrecond - " + LSMESSAGES[flag])
         else:
-            flag = IDASetPreconditioner(self.mem, _psetup_wrapper,
-                                        _psolve_wrapper)
+            flag = IDASetPreconditioner(self.mem, psetup_wrapper,
+                                        psolve_wrapper)
             if flag < 0:
                 raise RuntimeError("IDASetPrecond - " + LSMESSAGES[flag])
 
@@ -745,11 +1373,11 @@ cdef class IDA:
         if jactimes is None:
             pass
         elif jactimes.setupfn is None:
-            flag = IDASetJacTimes(self.mem, NULL, _jvsolve_wrapper)
+            flag = IDASetJacTimes(self.mem, NULL, jvsolve_wrapper)
             if flag < 0:
                 raise RuntimeError("IDASetJacTimes - " + LSMESSAGES[flag])
         else:
-            flag = IDASetJacTimes(self.mem, _jvsetup_wrapper, _jvsolve_wrapper)
+            flag = IDASetJacTimes(self.mem, jvsetup_wrapper, jvsolve_wrapper)
             if flag < 0:
                 raise RuntimeError("IDASetJacTimes - " + LSMESSAGES[flag])
 
@@ -769,8 +1397,14 @@ cdef class IDA:
         # 14) Specify rootfinding problem
         eventsfn = self._options["eventsfn"]
         num_events = self._options["num_events"]
-        if eventsfn:
+        if eventsfn and self.aux.nogil:
+            flag = IDARootInit(self.mem, <int> num_events, _eventsfn_nogil)
+        elif eventsfn and self.aux.profiler is not None:
+            flag = IDARootInit(self.mem, <int> num_events, _eventsfn_profiled)
+        elif eventsfn:
             flag = IDARootInit(self.mem, <int> num_events, _eventsfn_wrapper)
+
+        if eventsfn:
             if flag < 0:
                 raise RuntimeError("IDARootInit - " + IDAMESSAGES[flag])
 
@@ -871,6 +1505,15 @@ cdef class IDA:
             if flag < 0:
                 raise RuntimeError("IDAReInit - " + IDAMESSAGES[flag])
 
+        if self.aux.profiler is not None:
+            self.aux.profiler.reset()
+
+        if self._tracer is not None:
+            self._tracer.reset()
+
+        if self.aux.eventsfn:
+            _reset_events(self.aux.eventsfn)
+
         # 16) Correct initial values
         calc_initcond = self._options["calc_initcond"]
         ic_t0 = t0 + self._options["calc_init_dt"]
@@ -895,17 +1538,39 @@ cdef class IDA:
         svec2np(self.yy, yy_tmp)
         svec2np(self.yp, yp_tmp)
 
-        nfev, njev = _collect_stats(self.mem)
+        stats = _collect_stats(self.mem)
 
         result = IDAResult(
             message=IDAMESSAGES[flag], success=flag >= 0, status=flag,
             t=t0, y=yy_tmp.copy(), yp=yp_tmp.copy(),
             i_events=None, t_events=None, y_events=None, yp_events=None,
-            nfev=nfev, njev=njev,
+            nfev=stats['nfev'], njev=stats['njev'], stats=stats,
+            profile=self._profile(),
+            auto=self._auto,
         )
 
         return result
 
+    cdef int _solve(self, sunrealtype tend, sunrealtype* tret,
+                    int itask) noexcept:
+        """Call IDASolve, releasing the GIL if all callbacks are native."""
+        cdef int flag
+
+        if self.aux.nogil:
+            with nogil:
+                flag = IDASolve(self.mem, tend, tret, self.yy, self.yp, itask)
+        elif self.aux.profiler is not None:
+            self.aux.profiler.begin(PROF_SOLVE)
+            flag = IDASolve(self.mem, tend, tret, self.yy, self.yp, itask)
+            self.aux.profiler.end()
+        else:
+            flag = IDASolve(self.mem, tend, tret, self.yy, self.yp, itask)
+
+        if self._tracer is not None:
+            _trace_step(self.mem, self._tracer)
+
+        return flag
+
     cdef _step(self, sunrealtype tt, object method, object tstop):
         cdef int itask
         cdef sunrealtype tout
@@ -925,7 +1590,7 @@ cdef class IDA:
         yp_tmp = self.aux.np_yp
         
         # 17) Advance solution in time
-        flag = IDASolve(self.mem, tt, &tout, self.yy, self.yp, itask)
+        flag = self._solve(tt, &tout, itask)
 
         svec2np(self.yy, yy_tmp)
         svec2np(self.yp, yp_tmp)
@@ -938,13 +1603,15 @@ cdef class IDA:
         else:
             i_ev, t_ev, y_ev, yp_ev = [None]*4
 
-        nfev, njev = _collect_stats(self.mem)
+        stats = _collect_stats(self.mem)
 
         result = IDAResult(
             message=IDAMESSAGES[flag], success=flag >= 0, status=flag,
             t=tout, y=yy_tmp.copy(), yp=yp_tmp.copy(),
             i_events=i_ev, t_events=t_ev, y_events=y_ev, yp_events=yp_ev,
-            nfev=nfev, njev=njev,
+            nfev=stats['nfev'], njev=stats['njev'], stats=stats,
+            profile=self._profile(),
+            auto=self._auto,
         )
 
         flag = IDAClearStopTime(self.mem)
@@ -953,6 +1620,91 @@ cdef class IDA:
 
         return result
 
+    cdef OutputStore _new_store(self, Py_ssize_t capacity):
+        """Solution storage that follows the 'save_*' options."""
+        return OutputStore(capacity, self.NEQ, self._options["save_idx"],
+                           self._options["save_y"], self._options["save_yp"],
+                           self._options["num_outputs"],
+                           self._options["save_order"])
+
+    def _output_fields(self):
+        """Names of the 'iter_steps' record fields, in order."""
+        save = [True, self._options["save_y"], self._options["save_yp"],
+                self._options["num_outputs"] > 0]
+
+        names = ("t", "y", "yp", "outputs")
+        return tuple(name for name, keep in zip(names, save) if keep)
+
+    cdef _save(self, OutputStore store, sunrealtype tt, np.ndarray yy,
+               np.ndarray yp):
+        """Append a point to 'store', evaluating 'outputfn' when set."""
+        aux = self.aux
+
+        if aux.outputfn is None:
+            store.append(tt, yy, yp, None)
+            return
+
+        if aux.profiler is not None:
+            aux.profiler.begin(PROF_OUTPUT)
+
+        try:
+            if aux.with_userdata:
+                _ = aux.outputfn(tt, yy, yp, aux.np_oo, aux.userdata)
+            else:
+                _ = aux.outputfn(tt, yy, yp, aux.np_oo)
+        finally:
+            if aux.profiler is not None:
+                aux.profiler.end()
+
+        store.append(tt, yy, yp, aux.np_oo)
+
+    cdef _profile(self):
+        """Return the 'profile' summary, or None if profiling is disabled."""
+        if self.aux.profiler is None:
+            return None
+
+        return self.aux.profiler.summary()
+
+    cdef OutputThinning _new_thinning(self):
+        """Onestep output filter from the 'thin_*' options, or None."""
+        opts = self._options
+
+        if opts["thin_rtol"] is None and opts["thin_atol"] is None \
+                and opts["thin_dt"] is None:
+            return None
+
+        return OutputThinning(opts["thin_rtol"], opts["thin_atol"],
+                              opts["thin_dt"])
+
+    cdef _store_result(self, OutputStore store, int flag):
+        """Collect stored outputs, events, and stats into an IDAResult."""
+
+        if self.aux.eventsfn:
+            i_ev, t_ev, y_ev, yp_ev = _collect_events(self.aux)
+        else:
+            i_ev, t_ev, y_ev, yp_ev = [None]*4
+
+        y_ev = store.select(y_ev)
+        yp_ev = store.select(yp_ev) if self._options["save_yp"] else None
+
+        stats = _collect_stats(self.mem)
+
+        tt_out, yy_out, yp_out, oo_out = store.arrays()
+
+        if self._options["dense_output"] and tt_out[-1] != tt_out[0]:
+            sol = DenseOutput(tt_out, yy_out, yp_out)
+        else:
+            sol = None
+
+        return IDAResult(
+            message=IDAMESSAGES[flag], success=flag >= 0, status=flag,
+            t=tt_out, y=yy_out, yp=yp_out, outputs=oo_out, i_events=i_ev,
+            t_events=t_ev, y_events=y_ev, yp_events=yp_ev,
+            nfev=stats['nfev'], njev=stats['njev'], stats=stats,
+            profile=self._profile(),
+            auto=self._auto, sol=sol,
+        )
+
     cdef _normal_solve(self, np.ndarray[DTYPE_t, ndim=1] tspan,
                              np.ndarray[DTYPE_t, ndim=1] y0,
                              np.ndarray[DTYPE_t, ndim=1] yp0
@@ -963,20 +1715,19 @@ cdef class IDA:
         cdef int stop
         cdef sunrealtype tt
         cdef sunrealtype tend
+        cdef OutputStore store
 
         _ = self._init_step(tspan[0], y0, yp0)
 
         # Setup solution storage
-        tt_out = np.empty(tspan.size, DTYPE)
-        yy_out = np.empty((tspan.size, self.NEQ), DTYPE)
-        yp_out = np.empty((tspan.size, self.NEQ), DTYPE)
+        store = self._new_store(tspan.size)
 
         yy_tmp = self.aux.np_yy
         yp_tmp = self.aux.np_yp
 
-        tt_out[0] = tspan[0]
-        svec2np(self.yy, yy_out[0, :])
-        svec2np(self.yp, yp_out[0, :])
+        svec2np(self.yy, yy_tmp)
+        svec2np(self.yp, yp_tmp)
+        self._save(store, tspan[0], yy_tmp, yp_tmp)
 
         # 17) Advance solution in time
         stop = 0
@@ -989,7 +1740,7 @@ cdef class IDA:
         while True:
             tend = tspan[ind]
 
-            flag = IDASolve(self.mem, tend, &tt, self.yy, self.yp, IDA_NORMAL)
+            flag = self._solve(tend, &tt, IDA_NORMAL)
 
             svec2np(self.yy, yy_tmp)
             svec2np(self.yp, yp_tmp)
@@ -1006,9 +1757,7 @@ cdef class IDA:
             if flag == IDA_ROOT_RETURN and not stop:
                 pass
             else:
-                tt_out[ind] = tt
-                yy_out[ind, :] = yy_tmp
-                yp_out[ind, :] = yp_tmp
+                self._save(store, tt, yy_tmp, yp_tmp)
 
                 ind += 1
 
@@ -1019,19 +1768,7 @@ cdef class IDA:
             elif stop:
                 break
 
-        if self.aux.eventsfn:
-            i_ev, t_ev, y_ev, yp_ev = _collect_events(self.aux)
-        else:
-            i_ev, t_ev, y_ev, yp_ev = [None]*4
-
-        nfev, njev = _collect_stats(self.mem)
-
-        result = IDAResult(
-            message=IDAMESSAGES[flag], success=flag >= 0, status=flag,
-            t=tt_out[:ind], y=yy_out[:ind], yp=yp_out[:ind],
-            i_events=i_ev, t_events=t_ev, y_events=y_ev, yp_events=yp_ev,
-            nfev=nfev, njev=njev,
-        )
+        result = self._store_result(store, flag)
 
         flag = IDAClearStopTime(self.mem)
         if flag < 0:
@@ -1044,34 +1781,32 @@ cdef class IDA:
                               np.ndarray[DTYPE_t, ndim=1] yp0
         ):
 
-        cdef int ind
         cdef int flag
         cdef int stop
         cdef sunrealtype tt
         cdef sunrealtype tend
+        cdef OutputStore store
+        cdef OutputThinning thin
 
         _ = self._init_step(tspan[0], y0, yp0)
 
         # Setup solution storage
-        # Pre-allocate some memory (for 1000 time steps) to fill. Periodically
-        # add 500 more more in if the pre-allocated memory gets filled.
-        tt_out = np.empty(1000, DTYPE)
-        yy_out = np.empty((1000, self.NEQ), DTYPE)
-        yp_out = np.empty((1000, self.NEQ), DTYPE)
-
-        extra_t = np.empty(500, DTYPE)
-        extra_y = np.empty((500, self.NEQ), DTYPE)
+        # Pre-allocate some memory (for 1000 time steps) to fill. The store
+        # doubles in size when filled, so copies stay linear in the step count.
+        store = self._new_store(1000)
+        thin = self._new_thinning()
 
         yy_tmp = self.aux.np_yy
         yp_tmp = self.aux.np_yp
 
-        tt_out[0] = tspan[0]
-        svec2np(self.yy, yy_out[0, :])
-        svec2np(self.yp, yp_out[0, :])
+        svec2np(self.yy, yy_tmp)
+        svec2np(self.yp, yp_tmp)
+        self._save(store, tspan[0], yy_tmp, yp_tmp)
+        if thin is not None:
+            thin.reset(tspan[0], yy_tmp)
 
         tend = tspan[-1]
         stop = 0
-        ind = 1
 
         flag = IDASetStopTime(self.mem, tend)
         if flag < 0:
@@ -1079,7 +1814,7 @@ cdef class IDA:
 
         # 17) Advance solution in time
         while True:
-            flag = IDASolve(self.mem, tend, &tt, self.yy, self.yp, IDA_ONE_STEP)
+            flag = self._solve(tend, &tt, IDA_ONE_STEP)
 
             svec2np(self.yy, yy_tmp)
             svec2np(self.yp, yp_tmp)
@@ -1091,19 +1826,10 @@ cdef class IDA:
             elif flag < 0:
                 stop = 1
 
-            if ind == tt_out.size - 1:
-                tt_out = np.concatenate((tt_out, extra_t))
-                yy_out = np.concatenate((yy_out, extra_y))
-                yp_out = np.concatenate((yp_out, extra_y))
-
             if flag == IDA_ROOT_RETURN and not stop:
                 pass
-            else:
-                tt_out[ind] = tt
-                yy_out[ind, :] = yy_tmp
-                yp_out[ind, :] = yp_tmp
-
-                ind += 1
+            elif stop or thin is None or thin.keep(tt, yy_tmp):
+                self._save(store, tt, yy_tmp, yp_tmp)
 
             if self.aux.pyerr is not None:
                 raise self.aux.pyerr
@@ -1112,19 +1838,7 @@ cdef class IDA:
             elif stop:
                 break
 
-        if self.aux.eventsfn:
-            i_ev, t_ev, y_ev, yp_ev = _collect_events(self.aux)
-        else:
-            i_ev, t_ev, y_ev, yp_ev = [None]*4
-
-        nfev, njev = _collect_stats(self.mem)
-
-        result = IDAResult(
-            message=IDAMESSAGES[flag], success=flag >= 0, status=flag,
-            t=tt_out[:ind], y=yy_out[:ind], yp=yp_out[:ind],
-            i_events=i_ev, t_events=t_ev, y_events=y_ev, yp_events=yp_ev,
-            nfev=nfev, njev=njev,
-        )
+        result = self._store_result(store, flag)
 
         flag = IDAClearStopTime(self.mem)
         if flag < 0:
@@ -1147,6 +1861,9 @@ cdef class IDA:
             raise ValueError(f"'method' is invalid. Valid values are {valid}.")
         elif not self._initialized:
             raise ValueError("'init_step' must be run prior to 'step'.")
+        elif self._tracer is not None and method == "normal":
+            raise ValueError("'trace' records internal steps, so it requires"
+                             " method='onestep'.")
 
         if tstop is None:
             pass
@@ -1155,6 +1872,207 @@ cdef class IDA:
         
         return self._step(t, method, tstop)
 
+    def interpolate(self, object t, int k):
+        cdef int flag
+        cdef Py_ssize_t i
+        cdef np.ndarray[DTYPE_t, ndim=1] tq
+
+        if not self._initialized:
+            raise ValueError("'init_step' must be run prior to 'interpolate'.")
+
+        t = np.asarray(t, DTYPE)
+        if t.ndim > 1:
+            raise ValueError("'t' must be a float or 1D array.")
+
+        tq = np.atleast_1d(t)
+        out = np.empty((tq.size, self.NEQ), DTYPE)
+
+        for i in range(tq.size):
+            flag = IDAGetDky(self.mem, tq[i], k, self.dky)
+            if flag == IDA_BAD_T or flag == IDA_BAD_K:
+                raise ValueError("IDAGetDky - " + IDAMESSAGES[flag])
+            elif flag < 0:
+                raise RuntimeError("IDAGetDky - " + IDAMESSAGES[flag])
+
+            svec2np(self.dky, out[i, :])
+
+        return out[0] if t.ndim == 0 else out
+
+    def get_stats(self):
+        if self.mem is NULL:
+            raise ValueError("A solve or 'init_step' must be run prior to"
+                             " 'get_stats'.")
+
+        return _collect_stats(self.mem)
+
+    def get_trace(self):
+        if self._tracer is None:
+            raise ValueError("'trace' must be enabled to use 'get_trace'.")
+
+        return self._tracer.to_numpy()
+
+    cdef tuple _advance(self, sunrealtype tend, int itask):
+        """Take one IDASolve call for iter_steps, returning (flag, tt)."""
+        cdef int flag
+        cdef sunrealtype tt
+
+        flag = self._solve(tend, &tt, itask)
+
+        return flag, tt
+
+    def iter_steps(self, object tspan, object y0, object yp0,
+                   object chunksize):
+
+        tspan = np.asarray(tspan, DTYPE)
+        y0 = np.asarray(y0, DTYPE)
+        yp0 = np.asarray(yp0, DTYPE)
+
+        diff = np.diff(tspan)
+        if not all(diff > 0) ^ all(diff < 0):
+            raise ValueError("'tspan' must stictly increase or decrease.")
+        elif tspan.size < 2:
+            raise ValueError("'tspan' length must be >= 2.")
+        elif tspan.size > 2 and self._tracer is not None:
+            raise ValueError("'trace' records internal steps, so it requires"
+                             " onestep solves, i.e., len(tspan) == 2.")
+
+        if chunksize is None:
+            size = 1
+        elif not isinstance(chunksize, Integral):
+            raise TypeError("'chunksize' must be type int, or None.")
+        elif chunksize < 1:
+            raise ValueError("'chunksize' must be positive.")
+        else:
+            size = chunksize
+
+        if y0.ndim != 1:
+            raise ValueError("'y0' must be a 1D array.")
+        elif yp0.shape != y0.shape:
+            raise ValueError("'y0' and 'yp0' must be the same size.")
+
+        save_idx = self._options["save_idx"]
+        if save_idx is not None \
+                and not all(0 <= i < y0.size for i in save_idx):
+            raise ValueError(f"'save_idx' values must be in [0, {y0.size}).")
+
+        # inputs are checked here, since the generator body only runs once
+        # iteration starts
+        return self._iter_steps(tspan, y0, yp0, size, chunksize)
+
+    def _iter_steps(self, object tspan, object y0, object yp0,
+                    Py_ssize_t size, object chunksize):
+        """Generator behind 'iter_steps', for already validated inputs."""
+        cdef int flag
+        cdef int stop
+        cdef int itask
+        cdef OutputStore store
+        cdef OutputThinning thin
+
+        _ = self._init_step(tspan[0], y0, yp0)
+
+        # release the stream's stop time and init state even if the
+        # generator is closed or abandoned before it is exhausted
+        try:
+            # Reused output storage, yielded one row or one chunk at a time
+            store = self._new_store(size)
+            save_y = self._options["save_y"]
+            save_yp = self._options["save_yp"]
+
+            yy_tmp = self.aux.np_yy
+            yp_tmp = self.aux.np_yp
+
+            svec2np(self.yy, yy_tmp)
+            svec2np(self.yp, yp_tmp)
+            self._save(store, tspan[0], yy_tmp, yp_tmp)
+
+            onestep = tspan.size == 2
+            thin = self._new_thinning() if onestep else None
+            if thin is not None:
+                thin.reset(tspan[0], yy_tmp)
+
+            itask = IDA_ONE_STEP if onestep else IDA_NORMAL
+
+            flag = IDASetStopTime(self.mem, <sunrealtype> tspan[-1])
+            if flag < 0:
+                raise RuntimeError("IDASetStopTime - " + IDAMESSAGES[flag])
+
+            # 17) Advance solution in time
+            stop = 0
+            k = 1
+
+            while True:
+                if store.size == size or stop:
+                    record = [x for x in store.arrays() if x is not None]
+                    if chunksize is None:
+                        yield tuple(x[0] for x in record)
+                    else:
+                        yield tuple(record)
+
+                    store.size = 0
+
+                if stop:
+                    break
+
+                tend = tspan[-1] if onestep else tspan[k]
+                flag, tt = self._advance(tend, itask)
+
+                svec2np(self.yy, yy_tmp)
+                svec2np(self.yp, yp_tmp)
+
+                if flag == IDA_ROOT_RETURN:
+                    stop = _handle_events(self.mem, self.aux, tt, yy_tmp, yp_tmp)
+                elif flag == IDA_TSTOP_RETURN:
+                    stop = 1
+                elif not onestep and k == tspan.size - 1:
+                    stop = 1
+                elif flag < 0:
+                    stop = 1
+
+                if flag == IDA_ROOT_RETURN and not stop:
+                    pass
+                elif stop or thin is None or thin.keep(tt, yy_tmp):
+                    self._save(store, tt, yy_tmp, yp_tmp)
+                    k += 1
+
+                if self.aux.pyerr is not None:
+                    raise self.aux.pyerr
+                elif PyErr_CheckSignals() == -1:
+                    return
+
+            if self.aux.eventsfn:
+                i_ev, t_ev, y_ev, yp_ev = _collect_events(self.aux)
+            else:
+                i_ev, t_ev, y_ev, yp_ev = [None]*4
+
+            stats = _collect_stats(self.mem)
+
+            # summary with the last saved point, i.e., the current solution
+            y_last = store.select(yy_tmp[None, :].copy())[0] if save_y else None
+            if save_yp:
+                yp_last = store.select(yp_tmp[None, :].copy())[0]
+                yp_ev = store.select(yp_ev)
+            else:
+                yp_last, yp_ev = None, None
+
+            if self.aux.outputfn is not None:
+                oo_last = self.aux.np_oo.copy()
+            else:
+                oo_last = None
+
+            result = IDAResult(
+                message=IDAMESSAGES[flag], success=flag >= 0, status=flag,
+                t=tt, y=y_last, yp=yp_last, outputs=oo_last, i_events=i_ev,
+                t_events=t_ev, y_events=store.select(y_ev), yp_events=yp_ev,
+                nfev=stats['nfev'], njev=stats['njev'], stats=stats,
+                profile=self._profile(),
+                auto=self._auto,
+            )
+
+            return result
+        finally:
+            IDAClearStopTime(self.mem)
+            self._initialized = False
+
     def solve(self, object tspan, object y0, object yp0):
 
         tspan = np.asarray(tspan, DTYPE)
@@ -1165,7 +2083,10 @@ cdef class IDA:
         if not all(diff > 0) ^ all(diff < 0):
             raise ValueError("'tspan' must stictly increase or decrease.")
 
-        if tspan.size > 2:
+        if tspan.size > 2 and self._tracer is not None:
+            raise ValueError("'trace' records internal steps, so it requires"
+                             " onestep solves, i.e., len(tspan) == 2.")
+        elif tspan.size > 2:
             soln = self._normal_solve(tspan, y0, yp0)
         elif tspan.size == 2:
             soln = self._onestep_solve(tspan, y0, yp0)
@@ -1212,12 +2133,7 @@ cdef _prepare_events(object eventsfn, int num_events):
 
     # add extra fields for _handle_events function
     eventsfn._i_tmp = np.zeros(num_events, INT_TYPE)
-    eventsfn._i_cnt = np.zeros(num_events, INT_TYPE)
-
-    eventsfn._i = []
-    eventsfn._t = []
-    eventsfn._y = []
-    eventsfn._yp = []
+    _reset_events(eventsfn)
 
     eventsfn._max_events = []
     for i, term in enumerate(terminal):
@@ -1229,6 +2145,16 @@ cdef _prepare_events(object eventsfn, int num_events):
             eventsfn._max_events.append(term)   
 
 
+cdef _reset_events(object eventsfn):
+    """Clear recorded events and terminal counts, e.g., for a new solve."""
+    eventsfn._i_cnt = np.zeros(eventsfn._i_tmp.size, INT_TYPE)
+
+    eventsfn._i = []
+    eventsfn._t = []
+    eventsfn._y = []
+    eventsfn._yp = []
+
+
 cdef _handle_events(void* mem, AuxData aux, sunrealtype tt, np.ndarray yy_tmp,
                     np.ndarray yp_tmp):
 
@@ -1269,24 +2195,106 @@ cdef _collect_events(AuxData aux):
     return i_events, t_events, y_events, yp_events
 
 
-cdef _collect_stats(void* mem):
-    cdef long int nfev
-    cdef long int njev
+cdef dict _collect_stats(void* mem):
+    """Return integrator, nonlinear, and linear solver counters."""
+    cdef long int nsteps, nfev, nlinsetups, netfails, ngevals
+    cdef long int nniters, nncfails
+    cdef long int njev, npevals, npsolves, nliters, nlcfails
+    cdef long int njtsetups, njvevals, nfevls
+    cdef int qlast, qcur
+    cdef sunrealtype hinused, hlast, hcur, tcur
+
+    flag = IDAGetIntegratorStats(mem, &nsteps, &nfev, &nlinsetups, &netfails,
+                                 &qlast, &qcur, &hinused, &hlast, &hcur, &tcur)
+    if flag < 0:
+        raise RuntimeError("IDAGetIntegratorStats - " + IDAMESSAGES[flag])
+
+    flag = IDAGetNonlinSolvStats(mem, &nniters, &nncfails)
+    if flag < 0:
+        raise RuntimeError("IDAGetNonlinSolvStats - " + IDAMESSAGES[flag])
 
-    flag = IDAGetNumResEvals(mem, &nfev)
+    flag = IDAGetNumGEvals(mem, &ngevals)
     if flag < 0:
-        raise RuntimeError("IDAGetNumResEvals - " + IDAMESSAGES[flag])
+        raise RuntimeError("IDAGetNumGEvals - " + IDAMESSAGES[flag])
 
     flag = IDAGetNumJacEvals(mem, &njev)
     if flag < 0:
         raise RuntimeError("IDAGetNumJacEvals - " + LSMESSAGES[flag])
 
-    return nfev, njev
+    flag = IDAGetNumPrecEvals(mem, &npevals)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumPrecEvals - " + LSMESSAGES[flag])
+
+    flag = IDAGetNumPrecSolves(mem, &npsolves)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumPrecSolves - " + LSMESSAGES[flag])
+
+    flag = IDAGetNumLinIters(mem, &nliters)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumLinIters - " + LSMESSAGES[flag])
+
+    flag = IDAGetNumLinConvFails(mem, &nlcfails)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumLinConvFails - " + LSMESSAGES[flag])
+
+    flag = IDAGetNumJTSetupEvals(mem, &njtsetups)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumJTSetupEvals - " + LSMESSAGES[flag])
+
+    flag = IDAGetNumJtimesEvals(mem, &njvevals)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumJtimesEvals - " + LSMESSAGES[flag])
+
+    flag = IDAGetNumLinResEvals(mem, &nfevls)
+    if flag < 0:
+        raise RuntimeError("IDAGetNumLinResEvals - " + LSMESSAGES[flag])
+
+    return {
+        'nsteps': nsteps, 'nfev': nfev, 'njev': njev, 'ngevals': ngevals,
+        'netfails': netfails, 'nniters': nniters, 'nncfails': nncfails,
+        'nlinsetups': nlinsetups, 'nliters': nliters, 'nlcfails': nlcfails,
+        'npevals': npevals, 'npsolves': npsolves, 'njtsetups': njtsetups,
+        'njvevals': njvevals, 'nfevls': nfevls, 'qlast': qlast, 'qcur': qcur,
+        'hinused': hinused, 'hlast': hlast, 'hcur': hcur, 'tcur': tcur,
+    }
+
+
+cdef void _trace_step(void* mem, StepTracer tracer) noexcept:
+    """Record the last internal step for the 'trace' option."""
+    cdef long int nsteps, nfev, nlinsetups, netfails, nniters, njev
+    cdef int qlast, qcur
+    cdef sunrealtype hinused, hlast, hcur, tcur
+
+    IDAGetIntegratorStats(mem, &nsteps, &nfev, &nlinsetups, &netfails, &qlast,
+                          &qcur, &hinused, &hlast, &hcur, &tcur)
+    IDAGetNumNonlinSolvIters(mem, &nniters)
+    IDAGetNumJacEvals(mem, &njev)
+
+    tracer.record(tcur, hlast, qlast, nsteps, nniters, netfails, njev)
+
+
+cdef bint _all_native(dict options):
+    """Return True if every callback in use is a LowLevelCallable."""
+
+    # the 'sparsity' difference quotient Jacobian is evaluated in Python
+    if options["sparsity"] is not None and options["jacfn"] is None:
+        return False
+
+    funcs = [options["resfn"], options["eventsfn"], options["jacfn"]]
+    for name in ("precond", "jactimes"):
+        if options[name] is not None:
+            funcs.extend([options[name].setupfn, options[name].solvefn])
+
+    return all(f is None or isinstance(f, LowLevelCallable) for f in funcs)
 
 
 def _check_signature(name: str, func: Callable, expected: tuple[int]) -> int:
     """Check 'resfn', 'eventsfn', and 'jacfn' signatures."""
 
+    if isinstance(func, LowLevelCallable):
+        _check_native(name, func)
+        return 0 if name == "resfn" else None
+
     signature = inspect.signature(func)
     parameters = signature.parameters.values()
 
@@ -1313,11 +2321,20 @@ def _check_signature(name: str, func: Callable, expected: tuple[int]) -> int:
     return with_userdata
 
 
+def _check_native(name: str, func: LowLevelCallable) -> None:
+    """Check LowLevelCallable signatures against NATIVE_SIGNATURES."""
+
+    if func.signature != NATIVE_SIGNATURES[name]:
+        raise ValueError(f"'{name}' has an invalid LowLevelCallable signature"
+                         f" '{func.signature}'. It must be"
+                         f" '{NATIVE_SIGNATURES[name]}'.")
+
+
 def _check_options(options: dict) -> None:
 
     # resfn
-    if not isinstance(options["resfn"], Callable):
-        raise TypeError("'resfn' must be type Callable.")
+    if not isinstance(options["resfn"], (Callable, LowLevelCallable)):
+        raise TypeError("'resfn' must be type Callable or LowLevelCallable.")
     else:
         expected = (4, 5)
         with_userdata = _check_signature("resfn", options["resfn"], expected)
@@ -1389,7 +2406,7 @@ def _check_options(options: dict) -> None:
     iterative = {"gmres", "bicgstab", "tfqmr"}
     direct = {"dense", "lapackdense", "band", "lapackband", "sparse"}
     
-    valid = iterative | direct
+    valid = iterative | direct | {"auto"}
 
     linsolver = options["linsolver"].lower()
     if not isinstance(linsolver, str):
@@ -1425,15 +2442,20 @@ def _check_options(options: dict) -> None:
     sparsity = options["sparsity"]
     if sparsity is None:
         pass 
+    elif isinstance(sparsity, str) and sparsity == "auto":
+        pass  # detected from the Jacobian pattern, see _resolve_auto
     elif sp.issparse(sparsity):
-        sparsity = sparsity.tocsc()
+        sparsity = sparsity.tocsc(copy=True)
+        sparsity.sum_duplicates()  # sorted CSC, see jacband.sparse_slots
     elif isinstance(sparsity, np.ndarray):
         sparsity = sp.csc_matrix(sparsity)
     else:
-        raise TypeError("'sparsity' must be either a sparse scipy matrix or a"
-                        " 2D numpy array.")
+        raise TypeError("'sparsity' must be either a sparse scipy matrix, a"
+                        " 2D numpy array, or 'auto'.")
 
-    if sparsity is None:
+    auto_sparsity = isinstance(sparsity, str)
+
+    if sparsity is None or auto_sparsity:
         pass
     elif sparsity.shape[0] != sparsity.shape[1]:
         raise ValueError("'sparsity' must be a square matrix.")
@@ -1447,7 +2469,7 @@ def _check_options(options: dict) -> None:
     # nthreads
     ncpu_cores = os.cpu_count()
     nthreads = options["nthreads"]
-    if linsolver == "sparse" and sparsity is not None:
+    if (linsolver == "sparse" and sparsity is not None) or linsolver == "auto":
         if nthreads is None:
             nthreads = 1
         elif not isinstance(nthreads, Integral):
@@ -1475,7 +2497,8 @@ def _check_options(options: dict) -> None:
         warn("Ignoring 'krylov_dim' since 'linsolver' is not iterative.")
 
     # consistency between linsolver and lband/uband
-    if ("band" in linsolver) and (lband is None or uband is None):
+    if ("band" in linsolver) and (lband is None or uband is None) \
+            and not auto_sparsity:
         raise ValueError("banded solvers requires integer 'lband', 'uband'.")
     elif ("band" not in linsolver) and (lband is not None or uband is not None):
         warn("Ignoring 'lband', 'uband' since 'linsolver' is not banded.")
@@ -1484,7 +2507,7 @@ def _check_options(options: dict) -> None:
     if linsolver == "sparse" and sparsity is None:
         raise ValueError("'sparse' solver requires 'sparsity' not be None.")
 
-    elif linsolver != "sparse" and nthreads is not None:
+    elif linsolver not in {"sparse", "auto"} and nthreads is not None:
         warn("Ignoring 'nthreads' since 'linsolver' is not 'sparse'.")
 
     # max_order
@@ -1544,12 +2567,18 @@ def _check_options(options: dict) -> None:
     eventsfn = options["eventsfn"]
     if eventsfn is None:
         pass
-    elif not isinstance(eventsfn, Callable):
-        raise TypeError("'eventsfn' must be type Callable.")
+    elif not isinstance(eventsfn, (Callable, LowLevelCallable)):
+        raise TypeError("'eventsfn' must be type Callable or LowLevelCallable.")
     else:
         expected = (4 + with_userdata,)
         _ = _check_signature("eventsfn", eventsfn, expected)
 
+    # LowLevelCallable cannot hold attributes (e.g., 'terminal') but a subclass
+    # can, so swap one in for the event tracking done in _prepare_events
+    if type(eventsfn) is LowLevelCallable:
+        eventsfn = _LowLevelEvents(eventsfn)
+        options["eventsfn"] = eventsfn
+
     # num_events
     num_events = options["num_events"]    
     if num_events == 0:
@@ -1573,8 +2602,8 @@ def _check_options(options: dict) -> None:
     jacfn = options["jacfn"]
     if jacfn is None:
         pass
-    elif not isinstance(jacfn, Callable):
-        raise TypeError("'jacfn' must be type Callable.")
+    elif not isinstance(jacfn, (Callable, LowLevelCallable)):
+        raise TypeError("'jacfn' must be type Callable or LowLevelCallable.")
     else:
         expected = (6 + with_userdata,)
         _ = _check_signature("jacfn", jacfn, expected)
@@ -1583,6 +2612,24 @@ def _check_options(options: dict) -> None:
         raise ValueError("'jacfn' is not compatitle with iterative linear"
                          f" solvers: {iterative}.")
 
+    # jac_storage
+    valid = {"full", "compact"}
+    jac_storage = options["jac_storage"]
+    if not isinstance(jac_storage, str):
+        raise TypeError("'jac_storage' must be type str.")
+    elif jac_storage not in valid:
+        raise ValueError(f"{jac_storage=} is invalid. Must be in {valid}.")
+
+    if jac_storage == "compact" and linsolver in iterative:
+        raise ValueError("'jac_storage' can only be 'compact' if 'linsolver'"
+                         f" is in {direct}.")
+    elif jac_storage == "compact" and linsolver == "auto":
+        raise ValueError("'jac_storage' cannot be 'compact' with the 'auto'"
+                         " linsolver, since the layout of 'JJ' depends on"
+                         " the solver that is selected.")
+    elif jac_storage == "compact" and jacfn is None:
+        warn("Ignoring 'jac_storage' since 'jacfn' is None.")
+
     # preference between sparsity and jacfn
     if (sparsity is not None) and (jacfn is not None):
         warn("Sparse Jacobian approximation will be ignored in favor of"
@@ -1627,3 +2674,96 @@ def _check_options(options: dict) -> None:
     if jactimes and linsolver in direct:
         raise ValueError("'jactimes' is not compatitle with direct linear"
                          f" solvers: {direct}.")
+
+    # consistency with 'auto' linsolver and sparsity, see _resolve_auto
+    if linsolver == "auto" and (precond or jactimes):
+        raise ValueError("'auto' linsolver only selects direct solvers, so it"
+                         " cannot be combined with 'precond' or 'jactimes'.")
+
+    probe = auto_sparsity or (linsolver == "auto" and sparsity is None)
+    if probe and isinstance(options["resfn"], LowLevelCallable):
+        raise ValueError("Detecting the Jacobian pattern for 'auto' requires"
+                         " a Python 'resfn'. Pass 'sparsity' instead.")
+
+    # zero_copy
+    if not isinstance(options["zero_copy"], bool):
+        raise TypeError("'zero_copy' must be type bool.")
+
+    # dense_output
+    if not isinstance(options["dense_output"], bool):
+        raise TypeError("'dense_output' must be type bool.")
+
+    # save_idx
+    save_idx = options["save_idx"]
+    if save_idx is None:
+        pass
+    elif not isinstance(save_idx, Iterable):
+        raise TypeError("'save_idx' must be type Iterable.")
+    elif not all(isinstance(x, Integral) for x in save_idx):
+        raise TypeError("All 'save_idx' values must be type int.")
+
+    # save_yp
+    if not isinstance(options["save_yp"], bool):
+        raise TypeError("'save_yp' must be type bool.")
+    elif options["dense_output"] and not options["save_yp"]:
+        raise ValueError("'dense_output' requires 'save_yp=True'.")
+
+    # save_order
+    valid = {"C", "F"}
+    if options["save_order"] not in valid:
+        raise ValueError(f"'save_order' is invalid. Valid values are {valid}.")
+
+    # outputfn
+    outputfn = options["outputfn"]
+    if outputfn is None:
+        pass
+    elif not isinstance(outputfn, Callable):
+        raise TypeError("'outputfn' must be type Callable.")
+    else:
+        expected = (4 + with_userdata,)
+        _ = _check_signature("outputfn", outputfn, expected)
+
+    # num_outputs
+    num_outputs = options["num_outputs"]
+    if not isinstance(num_outputs, Integral):
+        raise TypeError("'num_outputs' must be type int.")
+    elif num_outputs < 0:
+        raise ValueError("'num_outputs' must be positive or zero.")
+
+    # consistency between outputfn and num_outputs
+    if outputfn and not num_outputs:
+        raise ValueError("'num_outputs' cannot be 0 if 'outputfn' is set.")
+    elif num_outputs and not outputfn:
+        warn("'num_outputs' will be ignored since 'outputfn' is not set.")
+        options["num_outputs"] = 0
+
+    # save_y
+    if not isinstance(options["save_y"], bool):
+        raise TypeError("'save_y' must be type bool.")
+    elif options["dense_output"] and not options["save_y"]:
+        raise ValueError("'dense_output' requires 'save_y=True'.")
+
+    # thin_rtol, thin_atol, thin_dt
+    for key in ["thin_rtol", "thin_atol", "thin_dt"]:
+        if options[key] is None:
+            pass
+        elif not isinstance(options[key], Real):
+            raise TypeError(f"'{key}' must be type float, or None.")
+        elif options[key] < 0.:
+            raise ValueError(f"'{key}' must be positive or zero.")
+
+    thinned = any(options[key] is not None for key in
+                  ["thin_rtol", "thin_atol", "thin_dt"])
+    if options["dense_output"] and thinned:
+        raise ValueError("'dense_output' cannot be combined with 'thin_*'.")
+
+    # profile
+    if not isinstance(options["profile"], bool):
+        raise TypeError("'profile' must be type bool.")
+
+    # trace
+    if isinstance(options["trace"], bool) \
+            or not isinstance(options["trace"], Integral):
+        raise TypeError("'trace' must be type int.")
+    elif options["trace"] < 0:
+        raise ValueError("'trace' must be positive or zero.")
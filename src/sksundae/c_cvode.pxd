@@ -21,6 +21,8 @@ cdef extern from "cvode/cvode.h":
     int CV_SUCCESS
     int CV_TSTOP_RETURN
     int CV_ROOT_RETURN
+    int CV_BAD_K
+    int CV_BAD_T
     
     # initialization functions
     void* CVodeCreate(int imethod, SUNContext ctx)
@@ -54,11 +56,20 @@ cdef extern from "cvode/cvode.h":
 
     # solver function
     int CVode(void* mem, sunrealtype tend, N_Vector yret, sunrealtype* tret, 
-              int itask)
+              int itask) nogil
     
     # optional output functions
     int CVodeGetRootInfo(void* mem, int* rootsfound)
     int CVodeGetNumRhsEvals(void* mem, long int* nrevals)
+    int CVodeGetNumGEvals(void* mem, long int* ngevals)
+    int CVodeGetIntegratorStats(void* mem, long int* nsteps, long int* nfevals,
+                                long int* nlinsetups, long int* netfails,
+                                int* qlast, int* qcur, sunrealtype* hinused,
+                                sunrealtype* hlast, sunrealtype* hcur,
+                                sunrealtype* tcur)
+    int CVodeGetNonlinSolvStats(void* mem, long int* nniters, long int* nnfails)
+    int CVodeGetNumNonlinSolvIters(void* mem, long int* nniters)
+    int CVodeGetDky(void* mem, sunrealtype t, int k, N_Vector dky)
     
     # free functions
     void CVodeFree(void** mem)
@@ -96,3 +107,7 @@ cdef extern from "cvode/cvode_ls.h":
 
     # optional outputs from LS interface
     int CVodeGetNumJacEvals(void* mem, long int* njevals)
+    int CVodeGetLinSolveStats(void* mem, long int* njevals, long int* nfevalsLS,
+                              long int* nliters, long int* nlcfails,
+                              long int* npevals, long int* npsolves,
+                              long int* njtsetups, long int* njtimes)
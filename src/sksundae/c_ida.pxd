@@ -21,6 +21,8 @@ cdef extern from "ida/ida.h":
     int IDA_SUCCESS
     int IDA_TSTOP_RETURN
     int IDA_ROOT_RETURN
+    int IDA_BAD_K
+    int IDA_BAD_T
     
     # initialization functions
     void* IDACreate(SUNContext ctx)
@@ -58,13 +60,22 @@ cdef extern from "ida/ida.h":
 
     # solver function
     int IDASolve(void* mem, sunrealtype tend, sunrealtype* tret, N_Vector yret,
-                 N_Vector ypret, int itask)
+                 N_Vector ypret, int itask) nogil
     
     # optional output functions
     int IDAGetConsistentIC(void* mem, N_Vector yy0_mod, N_Vector yp0_mod)
     int IDAGetRootInfo(void* mem, int* rootsfound)
     int IDAGetNumResEvals(void* mem, long int* nrevals)
     int IDAGetCurrentStep(void* mem, sunrealtype* hcur)
+    int IDAGetNumGEvals(void* mem, long int* ngevals)
+    int IDAGetIntegratorStats(void* mem, long int* nsteps, long int* nrevals,
+                              long int* nlinsetups, long int* netfails,
+                              int* qlast, int* qcur, sunrealtype* hinused,
+                              sunrealtype* hlast, sunrealtype* hcur,
+                              sunrealtype* tcur)
+    int IDAGetNonlinSolvStats(void* mem, long int* nniters, long int* nnfails)
+    int IDAGetNumNonlinSolvIters(void* mem, long int* nniters)
+    int IDAGetDky(void* mem, sunrealtype t, int k, N_Vector dky)
     
     # free functions
     void IDAFree(void** mem)
@@ -103,3 +114,10 @@ cdef extern from "ida/ida_ls.h":
 
     # optional outputs from LS interface
     int IDAGetNumJacEvals(void* mem, long int* njevals)
+    int IDAGetNumPrecEvals(void* mem, long int* npevals)
+    int IDAGetNumPrecSolves(void* mem, long int* npsolves)
+    int IDAGetNumLinIters(void* mem, long int* nliters)
+    int IDAGetNumLinConvFails(void* mem, long int* nlcfails)
+    int IDAGetNumJTSetupEvals(void* mem, long int* njtsetups)
+    int IDAGetNumJtimesEvals(void* mem, long int* njvevals)
+    int IDAGetNumLinResEvals(void* mem, long int* nrevalsLS)
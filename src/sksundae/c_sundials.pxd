@@ -19,9 +19,14 @@ cdef extern from "sundials/sundials_types.h":
     ctypedef int sunbooleantype
     ctypedef _SUNContext* SUNContext
 
+    ctypedef struct _SUNProfiler:
+        pass
+
+    ctypedef _SUNProfiler* SUNProfiler
+
     ctypedef void (*SUNErrHandlerFn)(int line, const char* func, const char* file,
                                      const char* msg, int err_code, void* err_user_data,
-                                     SUNContext ctx) except *
+                                     SUNContext ctx) noexcept
 
     int SUN_COMM_NULL
 
@@ -34,6 +39,14 @@ cdef extern from "sundials/sundials_context.h":
     int SUNContext_PushErrHandler(SUNContext ctx, SUNErrHandlerFn err_fn,
                                   void* err_user_data)
 
+    int SUNContext_GetProfiler(SUNContext ctx, SUNProfiler* profiler)
+
+# sundials_profiler.h
+cdef extern from "sundials/sundials_profiler.h":
+    int SUNProfiler_Reset(SUNProfiler p)
+    int SUNProfiler_GetElapsedTime(SUNProfiler p, const char* name,
+                                   double* time)
+
 # sundials_nvector.h
 cdef extern from "sundials/sundials_nvector.h":
     ctypedef struct _N_Vector:
@@ -53,7 +66,7 @@ cdef extern from "sundials/sundials_matrix.h":
         SUNMATRIX_BAND
         SUNMATRIX_SPARSE
 
-    SUNMatrix_ID SUNMatGetID(SUNMatrix A)
+    SUNMatrix_ID SUNMatGetID(SUNMatrix A) nogil
 
     void SUNMatDestroy(SUNMatrix A)
 
@@ -6,17 +6,22 @@ from .c_sundials cimport *  # Access to types
 cdef extern from "sunmatrix/sunmatrix_dense.h":
     SUNMatrix SUNDenseMatrix(sunindextype M, sunindextype N, SUNContext ctx)
 
-    sunrealtype** SUNDenseMatrix_Cols(SUNMatrix A)
+    sunindextype SUNDenseMatrix_Columns(SUNMatrix A) nogil
+    sunrealtype* SUNDenseMatrix_Data(SUNMatrix A) nogil
+    sunrealtype** SUNDenseMatrix_Cols(SUNMatrix A) nogil
 
 # sunmatrix_band.h
 cdef extern from "sunmatrix/sunmatrix_band.h":
     SUNMatrix SUNBandMatrix(sunindextype M, sunindextype mu, sunindextype ml,
                             SUNContext ctx)
 
-    sunindextype SUNBandMatrix_StoredUpperBandwidth(SUNMatrix A)
-    sunindextype SUNBandMatrix_LowerBandwidth(SUNMatrix A)
-    sunindextype SUNBandMatrix_UpperBandwidth(SUNMatrix A)
-    sunrealtype** SUNBandMatrix_Cols(SUNMatrix A)
+    sunindextype SUNBandMatrix_Columns(SUNMatrix A) nogil
+    sunindextype SUNBandMatrix_StoredUpperBandwidth(SUNMatrix A) nogil
+    sunindextype SUNBandMatrix_LowerBandwidth(SUNMatrix A) nogil
+    sunindextype SUNBandMatrix_UpperBandwidth(SUNMatrix A) nogil
+    sunindextype SUNBandMatrix_LDim(SUNMatrix A) nogil
+    sunrealtype* SUNBandMatrix_Data(SUNMatrix A) nogil
+    sunrealtype** SUNBandMatrix_Cols(SUNMatrix A) nogil
 
 # sunmatrix_sparse.h
 cdef extern from "sunmatrix/sunmatrix_sparse.h":
@@ -26,6 +31,7 @@ cdef extern from "sunmatrix/sunmatrix_sparse.h":
     SUNMatrix SUNSparseMatrix(sunindextype M, sunindextype N, sunindextype NNZ,
                               int sparsetype, SUNContext ctx)
 
-    sunrealtype* SUNSparseMatrix_Data(SUNMatrix A)
-    sunindextype* SUNSparseMatrix_IndexValues(SUNMatrix A)
-    sunindextype* SUNSparseMatrix_IndexPointers(SUNMatrix A)
\ No newline at end of file
+    sunindextype SUNSparseMatrix_Columns(SUNMatrix A) nogil
+    sunrealtype* SUNSparseMatrix_Data(SUNMatrix A) nogil
+    sunindextype* SUNSparseMatrix_IndexValues(SUNMatrix A) nogil
+    sunindextype* SUNSparseMatrix_IndexPointers(SUNMatrix A) nogil
\ No newline at end of file
@@ -3,6 +3,8 @@
 from __future__ import annotations
 from typing import Callable
 
+from scipy import LowLevelCallable
+
 
 class CVODEJacTimes:
     """Jacobian-vector product."""
@@ -17,19 +19,19 @@ class CVODEJacTimes:
 
         Parameters
         ----------
-        setupfn : Callable or None
+        setupfn : Callable, LowLevelCallable, or None
             A function to setup data before solving the Jacobian-vector product.
             Use None if not needed. The required signature is in the notes.
-        solvefn : Callable
+        solvefn : Callable or LowLevelCallable
             A function that solves for the Jacobian-vector product `J*v` (or
             an approximation to it). The required signature is in the notes.
 
         Raises
         ------
         TypeError
-            'setupfn' must be type Callable or None.
+            'setupfn' must be type Callable, LowLevelCallable, or None.
         TypeError
-            'solvefn' must be type Callable.
+            'solvefn' must be type Callable or LowLevelCallable.
 
         Notes
         -----
@@ -53,11 +55,13 @@ class CVODEJacTimes:
 
         if setupfn is None:
             pass
-        elif not isinstance(setupfn, Callable):
-            raise TypeError("'setupfn' must be type Callable.")
+        elif not isinstance(setupfn, (Callable, LowLevelCallable)):
+            raise TypeError("'setupfn' must be type Callable or"
+                            " LowLevelCallable.")
 
-        if not isinstance(solvefn, Callable):
-            raise TypeError("'solvefn' must be type Callable.")
+        if not isinstance(solvefn, (Callable, LowLevelCallable)):
+            raise TypeError("'solvefn' must be type Callable or"
+                            " LowLevelCallable.")
 
         self.setupfn = setupfn
         self.solvefn = solvefn
@@ -3,6 +3,8 @@
 from __future__ import annotations
 from typing import Callable
 
+from scipy import LowLevelCallable
+
 
 class CVODEPrecond:
     """Preconditioner wrapper."""
@@ -17,10 +19,10 @@ class CVODEPrecond:
 
         Parameters
         ----------
-        setupfn : Callable or None
+        setupfn : Callable, LowLevelCallable, or None
             A function to setup data before solving the preconditioned problem.
             Use None if not needed. The required signature is in the notes.
-        solvefn : Callable
+        solvefn : Callable or LowLevelCallable
             A function that solves the preconditioned problem `P*zvec = rvec`.
             P is a preconditioner matrix approximating `I - gamma*J`, at least
             crudely. The required signature is in the notes.
@@ -31,9 +33,9 @@ class CVODEPrecond:
         Raises
         ------
         TypeError
-            'setupfn' must be type Callable or None.
+            'setupfn' must be type Callable, LowLevelCallable, or None.
         TypeError
-            'solvefn' must be type Callable.
+            'solvefn' must be type Callable or LowLevelCallable.
         ValueError
             'side' must be in {'left', 'right', 'both'}.
 
@@ -95,11 +97,13 @@ class CVODEPrecond:
 
         if setupfn is None:
             pass
-        elif not isinstance(setupfn, Callable):
-            raise TypeError("'setupfn' must be type Callable.")
+        elif not isinstance(setupfn, (Callable, LowLevelCallable)):
+            raise TypeError("'setupfn' must be type Callable or"
+                            " LowLevelCallable.")
 
-        if not isinstance(solvefn, Callable):
-            raise TypeError("'solvefn' must be type Callable.")
+        if not isinstance(solvefn, (Callable, LowLevelCallable)):
+            raise TypeError("'solvefn' must be type Callable or"
+                            " LowLevelCallable.")
 
         if side not in {'left', 'right', 'both'}:
             raise ValueError("'side' must be in {'left', 'right', 'both'}.")
@@ -5,24 +5,30 @@ from __future__ import annotations
 from typing import Callable, Literal, TYPE_CHECKING
 
 from sksundae._cy_cvode import CVODE as _CVODE, CVODEResult as _CVODEResult
+from sksundae.utils import StepIterator
+from sksundae.sinks import OutputSink, _as_sink
 
 if TYPE_CHECKING:  # pragma: no cover
+    from os import PathLike
     from numpy import ndarray
+    from scipy import LowLevelCallable
 
 
 class CVODE:
     """SUNDIALS CVODE solver."""
 
-    def __init__(self, rhsfn: Callable, **options) -> None:
+    def __init__(self, rhsfn: Callable | LowLevelCallable,
+                 **options) -> None:
         """
         This class wraps the C-based variable-coefficient ordinary differential
         equations (CVODE) solver from SUNDIALS [1]_ [2]_.
 
         Parameters
         ----------
-        rhsfn : Callable
+        rhsfn : Callable or LowLevelCallable
             Right-hand-side function with signature `f(t, y, yp[, userdata])`.
-            See the notes for more information.
+            Compiled functions are also supported, see the notes for more
+            information.
         **options : dict, optional
             Keyword arguments to describe the solver options. A full list of
             names, types, descriptions, and defaults is given below.
@@ -53,7 +59,11 @@ class CVODE:
             'tfqmr') the number of Krylov dimensions is set using 'krylov_dim'.
             'lapackdense' and 'lapackband' can also be used as alternatives to
             'dense' and 'band'. They use OpenBLAS-linked LAPACK [4]_ routines,
-            but can have noticeable overhead for small (<100) systems.
+            but can have noticeable overhead for small (<100) systems. With
+            'auto', the Jacobian pattern is detected by probing 'rhsfn' at the
+            initial values, and a direct solver is chosen from its size,
+            density, and bandwidths, see `jacband.select_linsolver`. Results
+            then include an 'auto' field with the choice and the reason.
         lband : int or None, optional
             Lower Jacobian bandwidth. Given an ODE system `yp = f(t, y)`,
             the Jacobian is `J = df_i/dy_j`. Required when 'linsolver' is
@@ -62,14 +72,18 @@ class CVODE:
         uband : int or None, optional
             Upper Jacobian bandwidth. Required when 'linsolver' is 'band'. Use
             zero if no elements are above the main diagonal. Defaults to None.
-        sparsity : 2D np.array or sparse matrix or None, optional
+        sparsity : np.array, sparse matrix, JacobianStructure, 'auto', or None
             Jacobian sparsity pattern. Required when 'linsolver' is 'sparse'.
             The shape must be (N, N) where N is the size of the system. Zero
             entries indicate fixed zeros in the Jacobian. If 'jacfn' is None,
             this argument activates a custom Jacobian routine (not part of the
             original SUNDIALS package). The routine works with all direct linear
             solvers but may increase step count. Reduce 'max_step' to help with
-            this, if needed. Defaults to None.
+            this, if needed. A :class:`~sksundae.jacband.JacobianStructure`
+            also provides the routine's column coloring, which otherwise is
+            computed during construction. Use 'auto' to detect the pattern
+            from 'rhsfn' at the initial values, which also fills in missing
+            'lband' and 'uband' for banded solvers. Defaults to None.
         nthreads : int or None, optional
             Number of threads to use with the 'sparse' linear solver. If None
             (default), 1 is used. Use -1 to use all available threads.
@@ -101,7 +115,7 @@ class CVODE:
             Values should be in `{-2, -1, 1, 2}` which apply `y[i] < 0`,
             `y[i] <= 0`, `y[i] >=0,` and `y[i] > 0`, respectively. The
             default is None.
-        eventsfn : Callable or None, optional
+        eventsfn : Callable, LowLevelCallable, or None, optional
             Events function with signature `g(t, y, events[, userdata])`.
             If None (default), no events are tracked. See the notes for more
             information. Requires 'num_events' be set when not None.
@@ -119,14 +133,30 @@ class CVODE:
                     default `[0]*num_events` is used.
 
             You can assign attributes like `eventsfn.terminal = [True]` to
-            any function in Python, after it has been defined.
+            any function in Python, after it has been defined. To set them
+            on a compiled function, use a subclass of LowLevelCallable.
         num_events : int, optional
             Number of events to track. The default is 0.
-        jacfn : Callable or None, optional
+        jacfn : Callable, LowLevelCallable, or None, optional
             Jacobian function like `J(t, y, yp, JJ[, userdata])`. Fills the
             pre-allocated 2D matrix 'JJ' with values defined by the Jacobian
             `JJ[i,j] = dyp_i/dy_j`. An internal finite difference method is
             applied when None (default).
+        jac_storage : {'full', 'compact'}, optional
+            Layout of 'JJ' in 'jacfn'. The default 'full' gives a 2D (N, N)
+            array. With 'compact', 'JJ' is the linear solver's own storage so
+            values are written in place, without a copy per evaluation. For
+            'band' and 'lapackband' solvers, 'JJ' is a (lband + uband + 1, N)
+            array in the LAPACK/SciPy `solve_banded` layout, where `J[i, j]`
+            is `JJ[uband + i - j, j]`. For the 'sparse' solver, 'JJ' is a 1D
+            array with the nonzero values of 'sparsity' in CSC order. Use
+            `jacband.sparse_slots` to find where each `J[i, j]` is stored.
+            For 'dense' and 'lapackdense', 'JJ' is an (N, N) Fortran-ordered
+            view of the SUNDIALS matrix. Compact arrays are zeroed before each
+            call, so all nonzero entries must be set every time, whereas the
+            'full' array keeps its values between calls. 'compact' is not
+            allowed with the 'auto' linear solver, since the layout would
+            depend on the solver it selects.
         precond : CVODEPrecond or None, optional
             Preconditioner functions. Only compatible with iterative linear
             solvers. Must be an instance of CVODEPrecond if not None (default).
@@ -135,6 +165,76 @@ class CVODE:
             linear solvers. Must be an instance of CVODEJacTimes when provided.
             Difference quotient approximations are used with iterative solvers
             if None (default).
+        zero_copy : bool, optional
+            If True, arrays passed to user-defined callables are views over the
+            SUNDIALS vectors rather than pre-allocated copies. This removes one
+            memcpy per array per function call, which is noticeable for large
+            systems. Views are only valid for the duration of each call, so do
+            not store references to 'y', 'yp', etc. between calls. The
+            default is False.
+        dense_output : bool, optional
+            If True, 'solve' also returns a continuous solution in the 'sol'
+            field of the result. It is a cubic Hermite interpolant built from
+            the stored 't' and 'y', and time derivatives from CVODE at each
+            stored time. This is most useful with `len(tspan) == 2`, where
+            every internal step is stored, so that one solve can be evaluated
+            at any number of times. The default is False.
+        save_idx : array_like[int] or None, optional
+            Indices of the state variables to store in 'solve' and
+            'iter_steps' outputs, including 'y_events'. Useful when only a few
+            of many states are needed, e.g., for discretized PDEs. The default
+            (None) stores all of them. Stepwise methods always return the full
+            state.
+        save_order : {'C', 'F'}, optional
+            Memory layout of the stored 'y' array. Its shape does not change,
+            but 'F' (column-major) makes each variable's history contiguous,
+            e.g., `y[:, j]`, while 'C' (default) keeps each time contiguous.
+        thin_rtol, thin_atol : float or None, optional
+            Thin the output of solves with `len(tspan) == 2` (including
+            'iter_steps'), where every internal step is otherwise stored. A
+            step is only kept when at least one state changed by more than
+            `thin_atol + thin_rtol*|y_last|` since the last kept step. If only
+            one is given, the other is zero. Both default to None, which skips
+            this check.
+        thin_dt : float or None, optional
+            When thinning, also keep a step once at least 'thin_dt' has passed
+            since the last kept step, e.g., to bound gaps during quiescent
+            periods. If given alone, outputs are only thinned by time. The
+            default is None. Terminal events and the final step are always
+            kept, regardless of the 'thin_*' options. Thinning cannot be
+            combined with 'dense_output', which needs every step.
+        outputfn : Callable or None, optional
+            Derived outputs with signature `f(t, y, yp, out[, userdata])`,
+            evaluated at each point stored by 'solve' or 'iter_steps'. It must
+            fill the 'out' array (size 'num_outputs') in place, e.g., with a
+            terminal voltage. Here, 'yp' comes from CVODE's interpolant.
+            Results gain an 'outputs' field. The default is None.
+        num_outputs : int, optional
+            Number of values written by 'outputfn'. Required when 'outputfn'
+            is set. The default is 0.
+        save_y : bool, optional
+            If False, 'y' is not stored by 'solve' or 'iter_steps' (it is
+            None, and 'iter_steps' records omit it). Combined with 'outputfn',
+            this only keeps the derived outputs. Cannot be combined with
+            `dense_output=True`. The default is True.
+        profile : bool, optional
+            If True, results include a 'profile' field with the number of
+            calls and wall time of 'rhsfn', 'eventsfn', 'jacfn', 'outputfn',
+            and the 'precond' and 'jactimes' functions, and of the 'CVode'
+            calls themselves (see the results class). Profiling uses the
+            Python wrappers, i.e., it does not release the GIL for
+            LowLevelCallable callbacks. The default is False, with no added
+            overhead.
+        trace : int, optional
+            Capacity of a step trace ring buffer. When positive, each
+            internal step records the internal time, step size and order,
+            and cumulative step, nonlinear iteration, error test failure, and
+            Jacobian evaluation counts, overwriting the oldest records once
+            full. Use 'get_trace' to read the records. Tracing requires
+            onestep solves, i.e., `len(tspan) == 2` in 'solve' and
+            'iter_steps', or `method='onestep'` in 'step', since normal
+            solves take many internal steps per call. Other calls raise a
+            ValueError while tracing. The default is 0 (disabled).
 
         Notes
         -----
@@ -158,6 +258,34 @@ class CVODE:
         dataclass, etc. and pass them all together as 'userdata'. The data can
         be unpacked as needed within the functions.
 
+        Any user-defined function (including those in 'precond' and 'jactimes')
+        can instead be a compiled C function wrapped in `scipy.LowLevelCallable`
+        (e.g., from numba's `cfunc`, ctypes, cffi, or Cython). These are called
+        directly from SUNDIALS without creating any Python objects, which is
+        much faster for small-to-medium sized problems. Compiled functions take
+        the same arguments as their Python counterparts, with arrays passed as
+        `double *` and 'userdata' replaced by the `void *` 'user_data' of the
+        LowLevelCallable. They must return an `int`: 0 for success, a positive
+        value for a recoverable error, or a negative value to halt the solver.
+        For example, 'rhsfn' needs the signature below. The 'JJ' argument
+        of 'jacfn' is a row-major buffer, i.e., `JJ[i*N + j]`. With a 'compact'
+        'jac_storage', it is instead column-major for dense solvers, i.e.,
+        `JJ[i + j*N]`, the CSC data for 'sparse' solvers, or a column-major
+        band, `JJ[(uband + i - j) + j*(lband + uband + 1)]`.
+        Boolean arguments to 'precond.setupfn' are passed as `int` and `int *`.
+
+        .. code-block:: c
+
+            int rhsfn(double t, double *y, double *yp, void *data)
+
+        Python and compiled functions can be mixed, but 'userdata' is only
+        passed to the Python functions when 'rhsfn' is also a Python function.
+
+        When every function in use is compiled (and 'jacfn' is given whenever
+        'sparsity' is set), the GIL is released for the full integration. This
+        lets separate solver instances run concurrently in threads. A single
+        instance is not thread-safe and should not be shared across threads.
+
         References
         ----------
         .. [1] A. C. Hindmarsh, P. N. Brown, K. E. Grant, S. L. Lee, R.
@@ -300,7 +428,201 @@ class CVODE:
         """
         return self.__CVODE.step(t, method, tstop)
 
-    def solve(self, tspan: ndarray, y0: ndarray) -> CVODEResult:
+    def interpolate(self, t: float | ndarray, k: int = 0) -> ndarray:
+        """
+        Interpolate the solution, or its derivatives, within the last step.
+
+        Uses the interpolating polynomial that SUNDIALS keeps for its most
+        recent internal step (`CVodeGetDky`). This gives values at intermediate
+        times, e.g., communication points in a 'onestep' loop, without
+        stopping the integrator or disturbing its step size control.
+
+        Parameters
+        ----------
+        t : float or array_like[float], shape(n,)
+            Time(s) to evaluate. All values must be within the last internal
+            step, i.e., between the previous and current step times.
+        k : int, optional
+            Derivative order, from 0 (default) up to the current method order.
+            Use `k=1` for time derivatives.
+
+        Returns
+        -------
+        dky : ndarray, shape(m,) or shape(n, m)
+            The k-th derivative of the solution at each time in 't'. Rows
+            correspond to times, consistent with the 'y' result field.
+
+        Raises
+        ------
+        ValueError
+            'init_step' must be run prior to 'interpolate'.
+        ValueError
+            't' is outside of the last step, or 'k' is out of range.
+
+        """
+        return self.__CVODE.interpolate(t, k)
+
+    def get_stats(self) -> dict:
+        """
+        Return the current integrator statistics.
+
+        Counters are read directly from SUNDIALS, so this is cheap enough to
+        call inside a 'step' loop, e.g., to monitor step size and order or to
+        detect a stiff region from rising failure counts. Every result also
+        includes a snapshot of these values in its 'stats' field.
+
+        Returns
+        -------
+        stats : dict
+            Statistics with the keys:
+
+                * nsteps: number of internal steps taken
+                * nfev: number of 'rhsfn' calls by the integrator
+                * njev: number of Jacobian evaluations
+                * ngevals: number of 'eventsfn' calls
+                * netfails: number of local error test failures
+                * nniters: number of nonlinear solver iterations
+                * nncfails: number of nonlinear convergence failures
+                * nlinsetups: number of linear solver setup calls
+                * nliters: number of linear (Krylov) iterations
+                * nlcfails: number of linear convergence failures
+                * npevals: number of preconditioner evaluations
+                * npsolves: number of preconditioner solves
+                * njtsetups: number of Jacobian-vector setup calls
+                * njvevals: number of Jacobian-vector products
+                * nfevls: number of 'rhsfn' calls for finite difference
+                  Jacobians or Jacobian-vector products
+                * qlast, qcur: method order of the last and next steps
+                * hinused: actual initial step size
+                * hlast, hcur: size of the last and next steps
+                * tcur: current internal time reached by the integrator
+
+        Raises
+        ------
+        ValueError
+            A solve or 'init_step' must be run prior to 'get_stats'.
+
+        Notes
+        -----
+        Counters are cumulative from the last call to 'init_step' or the
+        start of the last solve. Krylov and preconditioner counters remain
+        zero for direct linear solvers.
+
+        """
+        return self.__CVODE.get_stats()
+
+    def get_trace(self) -> ndarray:
+        """
+        Return the step trace records.
+
+        Records are collected with `trace > 0` and are cleared each time
+        'init_step' is called, i.e., at the start of every solve. Tracing is
+        only valid for onestep solutions (e.g., 'solve' with only two 'tspan'
+        values, or 'step' with `method='onestep'`), which give one record per
+        internal step. Other calls raise a ValueError while tracing.
+
+        Returns
+        -------
+        trace : ndarray, shape(n,)
+            Structured array, oldest record first, with fields:
+
+                * wall: wall time since 'init_step' (seconds)
+                * t: internal time reached by the integrator
+                * h: size of the last internal step
+                * order: method order of the last internal step
+                * nsteps: number of internal steps taken
+                * nni: number of nonlinear solver iterations
+                * netf: number of local error test failures
+                * njev: number of Jacobian evaluations
+
+            Only the last 'trace' records are kept.
+
+        Raises
+        ------
+        ValueError
+            'trace' must be enabled to use 'get_trace'.
+
+        See Also
+        --------
+        ~sksundae.utils.chrome_trace :
+            Export records for timeline viewers like Perfetto.
+
+        """
+        return self.__CVODE.get_trace()
+
+    def iter_steps(self, tspan: ndarray, y0: ndarray,
+                   chunksize: int | None = None) -> StepIterator:
+        """
+        Stream the solution across 'tspan' without storing it.
+
+        Steps are taken exactly as in 'solve', but each saved point is handed
+        back as soon as it is computed instead of being accumulated, so memory
+        use does not grow with the number of steps. This suits long runs that
+        are reduced, written to disk, or monitored on the fly.
+
+        Parameters
+        ----------
+        tspan : array_like[float], shape(n >= 2,)
+            Solution time span. If `len(tspan) == 2`, records are produced at
+            internally chosen steps. When `len(tspan) > 2`, records are only
+            produced at each specified time.
+        y0 : array_like[float], shape(m,)
+            State variable values at 'tspan[0]'.
+        chunksize : int or None, optional
+            Number of saved points per record. If None (default), each record
+            holds a single point. Otherwise, records hold up to 'chunksize'
+            points, with a shorter final record.
+
+        Returns
+        -------
+        :class:`~sksundae.utils.StepIterator`
+            Iterator of (t, y) records, or the stored fields listed in its
+            'fields' attribute (see 'save_y' and 'outputfn'). With
+            `chunksize=None`, 't' is a float and the arrays are 1D. Otherwise,
+            the arrays have a leading dimension for time. A summary
+            :class:`CVODEResult` with the final point, events, and stats is
+            stored in its 'result' attribute once iteration completes.
+
+        Raises
+        ------
+        ValueError
+            'tspan' must be strictly increasing or decreasing.
+        ValueError
+            'tspan' length must be >= 2.
+        TypeError
+            'chunksize' must be type int, or None.
+        ValueError
+            'chunksize' must be positive.
+        ValueError
+            'y0' must be a 1D array.
+        ValueError
+            'save_idx' values must be valid indices for 'y0'.
+
+        Notes
+        -----
+        Record arrays are views into buffers that are reused for the next
+        record. Copy them if they need to outlive the loop iteration. The
+        solver must not be stepped or solved with again until iteration has
+        finished, or the iterator is closed. Inputs are validated when
+        'iter_steps' is called, before the first record is requested.
+
+        Examples
+        --------
+        Track the maximum of the first variable without keeping the states.
+
+        .. code-block:: python
+
+            steps = solver.iter_steps([0, 100], y0, chunksize=512)
+            ymax = max(y[:, 0].max() for t, y in steps)
+
+            print(steps.result.status)
+
+        """
+        steps = self.__CVODE.iter_steps(tspan, y0, chunksize)
+        return StepIterator(steps, self.__CVODE._output_fields())
+
+    def solve(self, tspan: ndarray, y0: ndarray,
+              output: OutputSink | str | PathLike | None = None) -> CVODEResult:
         """
         Return the solution across 'tspan'.
 
@@ -314,6 +636,13 @@ class CVODE:
             State variable values at 'tspan[0]'. The length should match the
             number of equations in 'rhsfn'.
 
+        output : OutputSink, str, PathLike, or None, optional
+            Writes the solution to disk during the solve instead of keeping it
+            in memory, see :mod:`~sksundae.sinks`. Paths ending in '.h5' or
+            '.hdf5' use an HDF5Sink and other paths an NpySink (a directory
+            of .npy files). By default None, which stores the solution in the
+            returned results.
+
         Returns
         -------
         :class:`~sksundae.cvode.CVODEResult`
@@ -328,8 +657,20 @@ class CVODE:
         ValueError
             'tspan' length must be >= 2.
 
+        Notes
+        -----
+        When 'output' is given, the returned results only hold the final 't'
+        and 'y' values, plus events and stats. The full solution is read back
+        from the sink. The 'dense_output' option is ignored.
+
         """
-        return self.__CVODE.solve(tspan, y0)
+        if output is None:
+            return self.__CVODE.solve(tspan, y0)
+
+        sink = _as_sink(output)
+        steps = self.iter_steps(tspan, y0, sink.chunksize)
+
+        return sink.consume(steps)
 
 
 class CVODEResult(_CVODEResult):
@@ -353,9 +694,13 @@ class CVODEResult(_CVODEResult):
             Solution time(s). The dimension depends on the method. Stepwise
             solutions will only have 1 value whereas solutions across a full
             'tspan' will have many.
-        y : ndarray, shape(n, m)
+        y : ndarray, shape(n, m) or None
             State variable values at each solution time. Rows correspond to
-            indices in 't' and columns match indexing from 'y0'.
+            indices in 't' and columns match indexing from 'y0'. None if
+            'save_y' was False.
+        outputs : ndarray, shape(n, num_outputs) or None
+            Values from 'outputfn' at each solution time, or None if it was
+            not set.
         i_events : ndarray, shape(k, num_events) or None
             Provides an array for each detected event 'k' specifying indices
             for which event(s) occurred. `i_events[k,i] != 0` if 'events[i]'
@@ -378,6 +723,27 @@ class CVODEResult(_CVODEResult):
         njev : int
             Number of times the Jacobian was evaluated, 'jacfn' or internal
             finite difference method.
+        stats : dict
+            Integrator statistics, e.g., steps taken, error test and
+            convergence failures, and linear solver counters. See 'get_stats'
+            for the full list of keys.
+        profile : dict or None
+            Wall time breakdown from the 'profile' option, otherwise None.
+            Maps region names (e.g., 'solve', 'rhsfn', 'jacfn') to dicts with
+            'calls', and 'inclusive' and 'exclusive' times in seconds.
+            Exclusive times do not include nested regions, so 'exclusive'
+            for 'solve' is the time spent inside SUNDIALS itself. If SUNDIALS
+            was built with profiling enabled, some of its internal timers
+            (e.g., 'SUNLinSolSolve') are also included, with inclusive times
+            only.
+        auto : dict or None
+            Choices made for 'auto' in 'linsolver' and/or 'sparsity',
+            otherwise None. Includes the resolved 'linsolver', 'lband', and
+            'uband', the detected pattern's 'nnz' and 'density', whether
+            'sparsity' is used, and the 'reason' for the linear solver.
+        sol : :class:`~sksundae.utils.DenseOutput` or None
+            Continuous solution, callable as `sol(t)`. Only included in the
+            output of 'solve', and None unless 'dense_output' was True.
 
         Notes
         -----
@@ -385,8 +751,9 @@ class CVODEResult(_CVODEResult):
         event was not terminal then it will only appear in '\\*_events' outputs
         and not within the main output arrays.
 
-        'nfev' and 'njev' are cumulative for stepwise solution approaches. The
-        values are reset each time 'init_step' is called.
+        'nfev', 'njev', 'stats', 'profile', and the '\\*_events' outputs are
+        cumulative for stepwise solution approaches. The values, including
+        terminal event counts, are reset each time 'init_step' is called.
 
         """
         super().__init__(**kwargs)
@@ -0,0 +1,583 @@
+"""
+Routines for solving ensembles of related problems. For example, parameter
+sweeps where many solves share the same functions and options, but differ in
+their initial conditions and/or 'userdata'.
+
+"""
+
+from __future__ import annotations
+from typing import Callable, Any, Sequence, TYPE_CHECKING
+
+import os
+from numbers import Integral
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .ida import IDA
+from .cvode import CVODE
+from .utils import RichResult
+from .jacband import JacobianStructure
+
+if TYPE_CHECKING:  # pragma: no cover
+    from numpy.typing import ndarray
+
+__all__ = ['solve_many', 'solve_stacked', 'EnsembleResult',]
+
+_WORKER = {}  # per-process state, filled by _init_worker
+_ROOT_RETURN = 2  # IDA_ROOT_RETURN and CV_ROOT_RETURN status
+
+
+class EnsembleResult(RichResult):
+    """Results container for ensemble solves."""
+
+    _order_keys = ['message', 'success', 'status', 't', 'y', 'yp', 'messages',
+                   'i_events', 't_events', 'y_events', 'yp_events', 'nfev',
+                   'njev',]
+
+    def __init__(self, **kwargs) -> None:
+        """
+        Inherits from :class:`~sksundae.utils.RichResult`. The solution class
+        groups output from :func:`solve_many` into an object with the fields:
+
+        Parameters
+        ----------
+        message : str
+            Human-readable summary of how many members were successful.
+        success : ndarray[bool], shape(M,)
+            True for each member whose solve was successful (status >= 0).
+        status : ndarray[int], shape(M,)
+            Solver status for each member, see the 'status' field of the
+            :class:`~sksundae.ida.IDAResult` and
+            :class:`~sksundae.cvode.CVODEResult` classes. Members that raised
+            a Python exception have a status of -99.
+        t : ndarray, shape(M, n)
+            Solution times for each member. Rows that were not reached, e.g.,
+            due to a terminal event or a failed solve, are filled with NaN.
+        y : ndarray, shape(M, n, m)
+            State variable values for each member at its 't' values.
+        yp : ndarray, shape(M, n, m) or None
+            State variable time derivatives for each member at its 't' values.
+            Only available for IDA, and None when 'yp0s' was not given.
+        messages : ndarray[str], shape(M,)
+            Human-readable status message for each member. For members that
+            raised an exception this includes the exception type and message.
+        i_events, t_events, y_events, yp_events : list, length M
+            Only for :func:`solve_stacked`. Per-member event outputs with the
+            same layout as the fields from a single solve, i.e., None if the
+            member had no events.
+        nfev : ndarray[int], shape(M,)
+            Number of function evaluations for each member.
+        njev : ndarray[int], shape(M,)
+            Number of Jacobian evaluations for each member.
+
+        """
+        super().__init__(**kwargs)
+
+
+def _init_worker(factory: Callable, tspan: ndarray, y0s: ndarray,
+                 yp0s: ndarray | None, userdatas: list | None,
+                 names: list[str], shapes: list[tuple[int]]) -> None:
+    """Attach worker processes to shared outputs. Used by solve_many()."""
+    from ._cy_common import DTYPE
+
+    shms = [shared_memory.SharedMemory(name=name) for name in names]
+    out = [np.ndarray(s, DTYPE, buffer=shm.buf) for s, shm in zip(shapes, shms)]
+
+    _WORKER.clear()
+    _WORKER.update(factory=factory, tspan=tspan, y0s=y0s, yp0s=yp0s,
+                   userdatas=userdatas, shms=shms, out=out, solver=None)
+
+
+def _solve_member(state: dict, k: int) -> tuple[int, str, int, int]:
+    """Solve member 'k' and write its output into 'state["out"]'."""
+
+    tspan, userdatas = state['tspan'], state['userdatas']
+
+    try:
+        if userdatas is not None:
+            solver = state['factory'](userdatas[k])
+        elif state['solver'] is None:
+            solver = state['solver'] = state['factory']()
+        else:
+            solver = state['solver']
+
+        if isinstance(solver, IDA):
+            if state['yp0s'] is None:
+                raise ValueError("'yp0s' is required when using IDA.")
+
+            soln = solver.solve(tspan, state['y0s'][k], state['yp0s'][k])
+        else:
+            soln = solver.solve(tspan, state['y0s'][k])
+
+        # two-point spans only save endpoints, keeping output sizes fixed
+        rows = slice(None)
+        if tspan.size == 2 and soln.t.size > 2:
+            rows = [0, -1]
+
+        n = min(soln.t[rows].size, tspan.size)
+
+        names = ('t', 'y', 'yp')
+        for name, out in zip(names, state['out']):
+            value = getattr(soln, name, None)  # CVODEResult has no 'yp'
+            if value is not None:
+                out[k, :n] = value[rows][:n]
+
+    except Exception as e:
+        return -99, f"{type(e).__name__}: {e}", 0, 0
+
+    return soln.status, soln.message, soln.nfev, soln.njev
+
+
+def _solve_chunk(indices: range, state: dict | None = None) -> list[tuple]:
+    """Solve a contiguous chunk of members. Defaults to the worker state."""
+
+    if state is None:
+        state = _WORKER
+
+    return [_solve_member(state, k) for k in indices]
+
+
+def solve_many(solver_factory: Callable[..., IDA | CVODE], tspan: ndarray,
+               y0s: ndarray, yp0s: ndarray | None = None,
+               userdatas: Sequence[Any] | None = None,
+               workers: int | None = None,
+               chunksize: int | None = None) -> EnsembleResult:
+    """
+    Solve an ensemble of related problems over a process pool.
+
+    Members are spread across 'workers' processes. Outputs are written into
+    preallocated shared-memory arrays, rather than sending each result back
+    to the parent process, and failures are reported per member instead of
+    stopping the ensemble.
+
+    Parameters
+    ----------
+    solver_factory : Callable
+        Returns the :class:`~sksundae.ida.IDA` or :class:`~sksundae.cvode.CVODE`
+        solver to use. It is called with no arguments when 'userdatas' is None
+        and each worker keeps one warm solver for all of its members. Otherwise,
+        it is called as `solver_factory(userdata)` for each member, since
+        'userdata' is fixed when a solver is constructed. The factory must be
+        picklable (e.g., a module-level function or `functools.partial`) when
+        `workers > 1`.
+    tspan : array_like[float], shape(n >= 2,)
+        Solution time span, shared by all members. When `len(tspan) > 2`, the
+        output is saved at each specified time. For `len(tspan) == 2`, only
+        the first and last solution times are saved so that every member has
+        the same output size.
+    y0s : array_like[float], shape(M, m)
+        Initial state variables for each member. A single row is broadcast
+        against 'yp0s' and 'userdatas'.
+    yp0s : array_like[float], shape(M, m) or None, optional
+        Initial time derivatives for each member, required for IDA and ignored
+        by CVODE. A single row is broadcast. The default is None.
+    userdatas : Sequence[Any] or None, optional
+        Data passed to 'solver_factory' for each member. A length-1 sequence
+        is broadcast. The default is None.
+    workers : int or None, optional
+        Number of worker processes. Use 1 to solve all members sequentially in
+        the current process. The default None uses `os.cpu_count()`.
+    chunksize : int or None, optional
+        Number of members sent to a worker at a time. The default None splits
+        members into about four chunks per worker.
+
+    Returns
+    -------
+    :class:`~sksundae.ensemble.EnsembleResult`
+        Custom output class for ensemble solutions. Includes per-member output
+        arrays, statuses, and messages. See the class definition for more
+        information.
+
+    Raises
+    ------
+    ValueError
+        'tspan' must be 1D with length >= 2.
+    ValueError
+        'y0s', 'yp0s', and 'userdatas' must have compatible lengths.
+    TypeError
+        'workers' and 'chunksize' must be type int, or None.
+    ValueError
+        'workers' and 'chunksize' must be positive.
+
+    Notes
+    -----
+    Events are still detected, and terminal events stop their member early,
+    but the event outputs themselves are not collected. Use 'status' to see
+    which members stopped at an event.
+
+    """
+    from ._cy_common import DTYPE
+
+    tspan = np.asarray(tspan, dtype=DTYPE)
+    if tspan.ndim != 1 or tspan.size < 2:
+        raise ValueError("'tspan' must be 1D with length >= 2.")
+
+    y0s = np.atleast_2d(np.asarray(y0s, dtype=DTYPE))
+    if yp0s is not None:
+        yp0s = np.atleast_2d(np.asarray(yp0s, dtype=DTYPE))
+    if userdatas is not None:
+        userdatas = list(userdatas)
+
+    lengths = {len(x) for x in (y0s, yp0s, userdatas) if x is not None}
+    M = max(lengths)
+    if lengths - {1, M}:
+        raise ValueError("'y0s', 'yp0s', and 'userdatas' must have the same"
+                         " length, or length 1.")
+
+    m = y0s.shape[1]
+    y0s = np.broadcast_to(y0s, (M, m))
+    if yp0s is not None:
+        yp0s = np.broadcast_to(yp0s, (M, yp0s.shape[1]))
+    if userdatas is not None and len(userdatas) == 1:
+        userdatas = userdatas*M
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif not isinstance(workers, Integral):
+        raise TypeError("'workers' must be type int, or None.")
+    elif workers < 1:
+        raise ValueError("'workers' must be positive.")
+
+    workers = min(workers, M)
+
+    if chunksize is None:
+        chunksize = -(-M // (4*workers))
+    elif not isinstance(chunksize, Integral):
+        raise TypeError("'chunksize' must be type int, or None.")
+    elif chunksize < 1:
+        raise ValueError("'chunksize' must be positive.")
+
+    chunks = [range(i, min(i + chunksize, M)) for i in range(0, M, chunksize)]
+
+    n = tspan.size
+    shapes = [(M, n), (M, n, m)]
+    if yp0s is not None:
+        shapes.append((M, n, m))
+
+    if workers == 1:
+        out = [np.full(s, np.nan, DTYPE) for s in shapes]
+        state = dict(factory=solver_factory, tspan=tspan, y0s=y0s, yp0s=yp0s,
+                     userdatas=userdatas, out=out, solver=None)
+
+        stats = _solve_chunk(range(M), state)
+
+    else:
+        itemsize = np.dtype(DTYPE).itemsize
+        sizes = [itemsize*max(1, int(np.prod(s))) for s in shapes]
+        shms = [shared_memory.SharedMemory(create=True, size=size)
+                for size in sizes]
+
+        views = []
+        try:
+            views = [np.ndarray(s, DTYPE, buffer=shm.buf)
+                     for s, shm in zip(shapes, shms)]
+
+            for x in views:
+                x.fill(np.nan)
+
+            initargs = (solver_factory, tspan, y0s, yp0s, userdatas,
+                        [shm.name for shm in shms], shapes)
+
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=initargs) as pool:
+                stats = [s for chunk in pool.map(_solve_chunk, chunks)
+                         for s in chunk]
+
+            out = [x.copy() for x in views]
+
+        finally:
+            views = None  # buffers cannot close while views exist
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+
+    t, y, yp = out + [None]*(3 - len(out))
+    status, messages, nfev, njev = zip(*stats)
+
+    status = np.array(status, dtype=int)
+    success = status >= 0
+
+    if success.all():
+        message = "All members were successful."
+    else:
+        message = f"{M - success.sum()} of {M} members failed."
+
+    return EnsembleResult(message=message, success=success, status=status,
+                          t=t, y=y, yp=yp, messages=np.array(messages),
+                          nfev=np.array(nfev, dtype=int),
+                          njev=np.array(njev, dtype=int))
+
+
+def solve_stacked(solver: type[IDA | CVODE], fn: Callable, tspan: ndarray,
+                  y0s: ndarray, yp0s: ndarray | None = None,
+                  **options) -> EnsembleResult:
+    """
+    Solve an ensemble as one stacked, block-diagonal system.
+
+    The M members are stacked into a single system with M*m variables so
+    that one solver integrates all of them at once. This avoids per-solve
+    Python overhead, which dominates for many small problems. The Jacobian
+    is block diagonal, so the difference quotient Jacobian needs no more
+    function evaluations than for a single member.
+
+    Parameters
+    ----------
+    solver : type[IDA] or type[CVODE]
+        Solver class to use, i.e., :class:`~sksundae.ida.IDA` or
+        :class:`~sksundae.cvode.CVODE`.
+    fn : Callable
+        Residual (IDA) or right-hand-side (CVODE) function, vectorized over
+        the members. The signatures match the solver classes, but 'y', 'yp',
+        and 'res' are (M, m) views with one row per member.
+    tspan : array_like[float], shape(n >= 2,)
+        Solution time span, shared by all members. When `len(tspan) > 2`, the
+        output is saved at each specified time. For `len(tspan) == 2`, only
+        the first and last times are saved, like :func:`solve_many`.
+    y0s : array_like[float], shape(M, m)
+        Initial state variables for each member.
+    yp0s : array_like[float], shape(M, m) or None, optional
+        Initial time derivatives for each member, required for IDA and ignored
+        by CVODE. The default is None.
+    **options : dict, optional
+        Keyword options for 'solver'. These apply to the stacked system, with
+        the exceptions below. If not given, 'linsolver' defaults to 'sparse'
+        when SuperLU_MT is available, and to 'band' otherwise.
+
+        sparsity : array_like, sparse matrix, or JacobianStructure, optional
+            Jacobian sparsity pattern for one member, shape (m, m). It is
+            repeated along the diagonal for the stacked system. Defaults to a
+            dense block.
+        eventsfn : Callable or None, optional
+            Events function like `g(t, y, yp, events[, userdata])`, vectorized
+            like 'fn'. 'events' is an (M, num_events) view. The 'terminal'
+            and 'direction' attributes apply per member.
+        num_events : int, optional
+            Number of events per member. The default is 0.
+        algebraic_idx, atol : array_like, optional
+            Per-member values of shape (m,), repeated for each member. 'atol'
+            may also be a scalar.
+
+    Returns
+    -------
+    :class:`~sksundae.ensemble.EnsembleResult`
+        Custom output class for ensemble solutions. Includes per-member output
+        arrays, statuses, messages, and events. See the class definition for
+        more information.
+
+    Raises
+    ------
+    TypeError
+        'solver' must be the IDA or CVODE class.
+    ValueError
+        'tspan' must be 1D with length >= 2.
+    ValueError
+        'y0s' and 'yp0s' must have the same shape.
+
+    Notes
+    -----
+    A member stops early when one of its terminal events occurs. Its values
+    are then held constant while the other members keep integrating, and the
+    solver is reinitialized so the stacked system stays smooth. Solver errors
+    apply to the stacked system, and so to every member still integrating.
+    'nfev' and 'njev' are also totals for the stacked system.
+
+    """
+    from scipy import sparse as sp
+    from scipy.linalg import bandwidth
+    from ._cy_common import DTYPE, config
+
+    if not (isinstance(solver, type) and issubclass(solver, (IDA, CVODE))):
+        raise TypeError("'solver' must be the IDA or CVODE class.")
+
+    is_ida = issubclass(solver, IDA)
+
+    tspan = np.asarray(tspan, dtype=DTYPE)
+    if tspan.ndim != 1 or tspan.size < 2:
+        raise ValueError("'tspan' must be 1D with length >= 2.")
+
+    y0s = np.array(y0s, dtype=DTYPE, ndmin=2)
+    M, m = y0s.shape
+
+    if is_ida:
+        yp0s = np.zeros_like(y0s) if yp0s is None else yp0s
+        yp0s = np.array(yp0s, dtype=DTYPE, ndmin=2)
+        if yp0s.shape != y0s.shape:
+            raise ValueError("'y0s' and 'yp0s' must have the same shape.")
+
+    # stacked Jacobian pattern and linear solver
+    sparsity = options.pop('sparsity', None)
+    if sparsity is None:
+        sparsity = np.ones((m, m))
+    elif isinstance(sparsity, JacobianStructure):
+        sparsity = sparsity.pattern
+
+    # frozen members use an identity block, so the diagonal is always stored
+    sparsity = abs(sp.csc_matrix(sparsity)) + sp.eye(m, format='csc')
+    options['sparsity'] = sp.block_diag([sparsity]*M, format='csc')
+
+    if 'linsolver' not in options:
+        has_superlu = config['SUNDIALS_SUPERLUMT_ENABLED'] == "True"
+        options['linsolver'] = 'sparse' if has_superlu else 'band'
+
+    if 'band' in options['linsolver']:
+        lband, uband = bandwidth(sparsity.toarray())
+        options.setdefault('lband', lband)
+        options.setdefault('uband', uband)
+
+    if options.get('algebraic_idx') is not None:
+        idx = np.asarray(options['algebraic_idx'], dtype=int)
+        options['algebraic_idx'] = (idx + m*np.arange(M)[:, None]).ravel()
+
+    if np.ndim(options.get('atol', 0)) == 1:
+        options['atol'] = np.tile(options['atol'], M)
+
+    userdata = options.pop('userdata', None)
+    extra = () if userdata is None else (userdata,)
+
+    # members that stopped early are held at their final values
+    active = np.ones(M, dtype=bool)
+    frozen = np.zeros((M, m))
+
+    if is_ida:
+        def stacked_fn(t, y, yp, res):
+            y, yp, res = y.reshape(M, m), yp.reshape(M, m), res.reshape(M, m)
+            fn(t, y, yp, res, *extra)
+            res[~active] = y[~active] - frozen[~active]
+    else:
+        def stacked_fn(t, y, yp):
+            y, yp = y.reshape(M, m), yp.reshape(M, m)
+            fn(t, y, yp, *extra)
+            yp[~active] = 0.
+
+    eventsfn = options.pop('eventsfn', None)
+    num_events = options.pop('num_events', 0)
+
+    if eventsfn is not None:
+        terminal = getattr(eventsfn, 'terminal', [True]*num_events)
+        direction = getattr(eventsfn, 'direction', [0]*num_events)
+
+        max_events = np.array([int(x) if x else np.inf for x in terminal])
+
+        def mask_events(events):
+            events[~active] = 1.  # constant, so frozen members never trigger
+
+        if is_ida:
+            def stacked_events(t, y, yp, events):
+                events = events.reshape(M, num_events)
+                eventsfn(t, y.reshape(M, m), yp.reshape(M, m), events, *extra)
+                mask_events(events)
+        else:
+            def stacked_events(t, y, events):
+                events = events.reshape(M, num_events)
+                eventsfn(t, y.reshape(M, m), events, *extra)
+                mask_events(events)
+
+        stacked_events.terminal = [False]*(M*num_events)
+        stacked_events.direction = list(np.tile(direction, M))
+
+        options['eventsfn'] = stacked_events
+        options['num_events'] = M*num_events
+
+    # integrate step by step, so members can stop independently
+    stacked = solver(stacked_fn, **options)
+
+    def init(t0, y0, yp0):
+        if is_ida:
+            return stacked.init_step(t0, y0.ravel(), yp0.ravel())
+        return stacked.init_step(t0, y0.ravel())
+
+    n = tspan.size
+    t = np.full((M, n), np.nan, DTYPE)
+    y = np.full((M, n, m), np.nan, DTYPE)
+    yp = np.full((M, n, m), np.nan, DTYPE) if is_ida else None
+
+    def save(j, mask, soln):
+        t[mask, j] = soln.t
+        y[mask, j] = soln.y.reshape(M, m)[mask]
+        if is_ida:
+            yp[mask, j] = soln.yp.reshape(M, m)[mask]
+
+    status = np.zeros(M, dtype=int)
+    messages = np.empty(M, dtype=object)
+    member_events = [[] for _ in range(M)]
+    counts = np.zeros((M, num_events))
+    nfev = njev = 0
+
+    soln = init(tspan[0], y0s, yp0s)
+    save(0, active, soln)
+
+    j = 1
+    while j < n:
+        soln = stacked.step(tspan[j], tstop=tspan[-1])
+
+        if soln.status < 0:
+            status[active], messages[active] = soln.status, soln.message
+            break
+
+        reached = soln.t == tspan[j]
+        if soln.status == _ROOT_RETURN:
+            i_ev = soln.i_events[-1].reshape(M, num_events)
+            hit = (i_ev != 0) & active[:, None]
+
+            for k in np.flatnonzero(hit.any(axis=1)):
+                y_ev = soln.y.reshape(M, m)[k]
+                yp_ev = soln.yp.reshape(M, m)[k] if is_ida else None
+                member_events[k].append((i_ev[k], soln.t, y_ev, yp_ev))
+
+            counts += hit
+            stop = ((counts >= max_events) & hit).any(axis=1)
+
+            if stop.any():
+                save(j, stop, soln)
+                status[stop], messages[stop] = soln.status, soln.message
+
+                active[stop] = False
+                frozen[stop] = soln.y.reshape(M, m)[stop]
+
+                if not active.any():
+                    break
+
+                # restart so the solver does not step over the switch
+                nfev, njev = nfev + soln.nfev, njev + soln.njev
+                if is_ida:
+                    yp_new = soln.yp.reshape(M, m).copy()
+                    yp_new[stop] = 0.
+                    soln = init(soln.t, soln.y.reshape(M, m), yp_new)
+                else:
+                    soln = init(soln.t, soln.y.reshape(M, m), None)
+
+        if reached:
+            save(j, active, soln)
+            status[active], messages[active] = soln.status, soln.message
+            j += 1
+
+    nfev, njev = nfev + soln.nfev, njev + soln.njev
+
+    i_events, t_events, y_events, yp_events = [], [], [], []
+    for k in range(M):
+        if member_events[k]:
+            i_k, t_k, y_k, yp_k = zip(*member_events[k])
+            i_events.append(np.array(i_k))
+            t_events.append(np.array(t_k))
+            y_events.append(np.array(y_k))
+            yp_events.append(np.array(yp_k) if is_ida else None)
+        else:
+            i_events.append(None)
+            t_events.append(None)
+            y_events.append(None)
+            yp_events.append(None)
+
+    success = status >= 0
+
+    if success.all():
+        message = "All members were successful."
+    else:
+        message = f"{M - success.sum()} of {M} members failed."
+
+    return EnsembleResult(message=message, success=success, status=status,
+                          t=t, y=y, yp=yp, messages=messages.astype(str),
+                          nfev=np.full(M, nfev), njev=np.full(M, njev),
+                          i_events=i_events, t_events=t_events,
+                          y_events=y_events, yp_events=yp_events)
@@ -3,6 +3,8 @@
 from __future__ import annotations
 from typing import Callable
 
+from scipy import LowLevelCallable
+
 
 class IDAPrecond:
     """Preconditioner wrapper."""
@@ -18,10 +20,10 @@ class IDAPrecond:
 
         Parameters
         ----------
-        setupfn : Callable or None, optional
+        setupfn : Callable, LowLevelCallable, or None, optional
             A function to setup data before solving the preconditioned problem.
             Use None if not needed. The required signature is in the notes.
-        solvefn : Callable
+        solvefn : Callable or LowLevelCallable
             A function that solves the preconditioned problem `P*zvec = rvec`.
             P is a preconditioner matrix approximating the Jacobian, at least
             crudely. The required signature is in the notes.
@@ -29,9 +31,9 @@ class IDAPrecond:
         Raises
         ------
         TypeError
-            'setupfn' must be type Callable or None.
+            'setupfn' must be type Callable, LowLevelCallable, or None.
         TypeError
-            'solvefn' must be type Callable.
+            'solvefn' must be type Callable or LowLevelCallable.
 
         Notes
         -----
@@ -66,11 +68,13 @@ class IDAPrecond:
 
         if setupfn is None:
             pass
-        elif not isinstance(setupfn, Callable):
-            raise TypeError("'setupfn' must be type Callable.")
+        elif not isinstance(setupfn, (Callable, LowLevelCallable)):
+            raise TypeError("'setupfn' must be type Callable or"
+                            " LowLevelCallable.")
 
-        if not isinstance(solvefn, Callable):
-            raise TypeError("'solvefn' must be type Callable.")
+        if not isinstance(solvefn, (Callable, LowLevelCallable)):
+            raise TypeError("'solvefn' must be type Callable or"
+                            " LowLevelCallable.")
 
         self.setupfn = setupfn
         self.solvefn = solvefn
@@ -8,18 +8,22 @@ pattern and/or bandwidth.
 from __future__ import annotations
 from typing import Callable, Any, TYPE_CHECKING
 
+import os
 import inspect
+import tempfile
+from zipfile import BadZipFile
 from warnings import warn
 
 import numpy as np
 
 if TYPE_CHECKING:  # pragma: no cover
     from numpy.typing import ndarray
-    from scipy.sparse import spmatrix
+    from scipy.sparse import spmatrix, sparray
 
 
 def _cvode_pattern(rhsfn: Callable, t0: float, y0: ndarray,
-                   userdata: Any = None) -> ndarray:
+                   userdata: Any = None, method: str = 'columns',
+                   sparse: bool = False) -> ndarray | sparray:
     """Jacobian pattern for CVODE functions. Access via j_pattern()."""
 
     # wrap rhsfn for cases w/ and w/o userdata
@@ -52,13 +56,16 @@ def _cvode_pattern(rhsfn: Callable, t0: float, y0: ndarray,
     norm = max(srur, np.abs(yp_0).max())
     yp_0 = yp_0 / norm
 
-    # Jacobian pattern
-    def j_pattern(j):
+    # random per-column scales avoid cancellations when probing many columns
+    scale = _probe_scales(y.size, method)
+
+    # rows that change when perturbing columns 'j'
+    def changed(j):
 
         y_store = y[j]
         sign = (y[j] >= 0).astype(float) * 2 - 1
 
-        y[j] += sign * srur * max(1.0, abs(y[j]))
+        y[j] += sign * srur * scale[j] * np.maximum(1.0, np.abs(y[j]))
 
         yp = np.zeros_like(y)
         wrapper(t0, y, yp)
@@ -66,15 +73,14 @@ def _cvode_pattern(rhsfn: Callable, t0: float, y0: ndarray,
 
         y[j] = y_store
 
-        return (yp_0 != yp).astype(float)
-
-    j_cols = [j_pattern(j) for j in range(y.size)]
+        return yp_0 != yp
 
-    return np.column_stack(j_cols)
+    return _assemble_pattern(changed, y.size, method, sparse)
 
 
 def _ida_pattern(resfn: Callable, t0: float, y0: ndarray, yp0: ndarray = None,
-                 userdata: Any = None) -> ndarray:
+                 userdata: Any = None, method: str = 'columns',
+                 sparse: bool = False) -> ndarray | sparray:
     """Jacobian pattern for IDA functions. Access via j_pattern()."""
 
     # wrap resfn for cases w/ and w/o userdata
@@ -114,13 +120,17 @@ def _ida_pattern(resfn: Callable, t0: float, y0: ndarray, yp0: ndarray = None,
     rng = np.random.default_rng(42)
     rand = rng.random(2)
 
-    def j_pattern(j):
+    scale = _probe_scales(y.size, method)
+
+    # rows that change when perturbing columns 'j'
+    def changed(j):
 
         y_store, yp_store = y[j], yp[j]
         sign = (yp[j] >= 0).astype(float) * 2 - 1
 
-        y[j] += sign * srur * rand[0] * max(1.0, abs(y[j]))
-        yp[j] += sign * srur * rand[1] * max(1.0, abs(yp[j]))
+        y[j] += sign * srur * rand[0] * scale[j] * np.maximum(1.0, np.abs(y[j]))
+        yp[j] += sign * srur * rand[1] * scale[j] \
+            * np.maximum(1.0, np.abs(yp[j]))
 
         res = np.zeros_like(y)
         wrapper(t0, y, yp, res)
@@ -128,22 +138,103 @@ def _ida_pattern(resfn: Callable, t0: float, y0: ndarray, yp0: ndarray = None,
 
         y[j], yp[j] = y_store, yp_store
 
-        return (res_0 != res).astype(float)
+        return res_0 != res
+
+    return _assemble_pattern(changed, y.size, method, sparse)
+
+
+def _probe_scales(N: int, method: str) -> ndarray:
+    """Per-column perturbation scales. Only used when probing."""
+
+    if method == 'columns':
+        return np.ones(N)
+    else:
+        return np.random.default_rng(42).uniform(0.5, 1.5, N)
+
+
+def _assemble_pattern(changed: Callable, N: int, method: str,
+                      sparse: bool) -> ndarray | sparray:
+    """Build the pattern from 'changed', which perturbs a set of columns and
+    returns a boolean mask of the rows whose outputs changed."""
+
+    import scipy.sparse as sp
+
+    if method == 'columns' and not sparse:
+        j_cols = [changed(j).astype(float) for j in range(N)]
+        return np.column_stack(j_cols)
+
+    elif method == 'columns':
+        indices = [np.flatnonzero(changed(j)) for j in range(N)]
+
+        indptr = np.zeros(N + 1, dtype=int)
+        indptr[1:] = np.cumsum([idx.size for idx in indices])
+
+        indices = np.concatenate(indices) if N else np.zeros(0, dtype=int)
+        data = np.ones(indices.size)
+
+        return sp.csc_array((data, indices, indptr), shape=(N, N))
+
+    from scipy.optimize._numdiff import group_columns
 
-    j_cols = [j_pattern(j) for j in range(y.size)]
+    # Groups of columns are aligned, power-of-two sized index blocks. At each
+    # level, every active (row, group) pair is split in two, and the halves
+    # are tested. Halves that are tested by the same row get different
+    # colors, so each evaluation, which perturbs all groups of one color,
+    # tells every row about exactly one of its tested groups. Groups under
+    # inactive parents are perturbed as well, but cannot change that row.
+    levels = int(np.ceil(np.log2(N))) if N > 1 else 0
+    cols = np.arange(N)
 
-    return np.column_stack(j_cols)
+    rows = np.flatnonzero(changed(cols))
+    groups = np.zeros(rows.size, dtype=int)
+
+    for level in range(1, levels + 1):
+        if rows.size == 0:
+            break
+
+        shift = levels - level
+        ngroups = ((N - 1) >> shift) + 1
+
+        rows = np.repeat(rows, 2)
+        groups = 2*np.repeat(groups, 2) + np.tile([0, 1], groups.size)
+
+        keep = groups < ngroups
+        rows, groups = rows[keep], groups[keep]
+
+        tested = sp.csc_matrix((np.ones(rows.size), (rows, groups)),
+                               shape=(N, ngroups))
+
+        colors = group_columns(tested, order=np.arange(ngroups))
+        pair_colors = colors[groups]
+
+        active = np.zeros(rows.size, dtype=bool)
+        for color in np.unique(pair_colors):
+            perturbed = cols[colors[cols >> shift] == color]
+            delta = changed(perturbed)
+
+            pairs = pair_colors == color
+            active[pairs] = delta[rows[pairs]]
+
+        rows, groups = rows[active], groups[active]
+
+    pattern = sp.csc_array((np.ones(rows.size), (rows, groups)),
+                           shape=(N, N))
+
+    return pattern if sparse else pattern.toarray()
 
 
 def j_pattern(rhsfn: Callable, t0: float, y0: ndarray, yp0: ndarray = None,
-              userdata: Any = None) -> ndarray:
+              userdata: Any = None, method: str = 'columns',
+              sparse: bool = False) -> ndarray | sparray:
     """
     Approximate the Jacobian pattern.
 
     This function uses a numerical Jacobian approximation for `rhsfn` about
-    the given point to determine the Jacobian pattern. It requires evaluating
-    the given function `N` times based on the size of `y0` so it can be
-    slow for large systems.
+    the given point to determine the Jacobian pattern. With the default
+    'columns' method, it requires evaluating the given function `N` times
+    based on the size of `y0` so it can be slow for large systems. The
+    'probing' method perturbs many columns per evaluation instead, see the
+    notes below.
 
     Be aware that this routine may return zeros in locations where ones should
     be depending on the evaluation point `y0` (and `yp0`). It is left to
@@ -166,37 +257,66 @@ def j_pattern(rhsfn: Callable, t0: float, y0: ndarray, yp0: ndarray = None,
         State variable time derivatives to use in 'rhsfn', by default None.
     userdata : Any, optional
         Additional data to pass to 'rhsfn', by default None.
+    method : {'columns', 'probing'}, optional
+        Perturb one column per evaluation ('columns', default) or use
+        compressed probing ('probing').
+    sparse : bool, optional
+        If True, return a `scipy.sparse.csc_array`, which only stores the
+        nonzero entries. Otherwise (default), return a dense array. Use this
+        for large systems where an (N, N) dense array will not fit in memory.
 
     Returns
     -------
-    pattern : 2D np.array
-        Jacobian pattern represented by a 2D numpy array with shape (N, N).
-        Ones or zeros in the position `A[i, j]` mean that function `F_i`
-        either is or is not dependedent on variable `y_j`, respectively.
+    pattern : 2D np.array or sparse.csc_array
+        Jacobian pattern with shape (N, N). Ones or zeros in the position
+        `A[i, j]` mean that function `F_i` either is or is not dependedent on
+        variable `y_j`, respectively.
+
+    Raises
+    ------
+    ValueError
+        'method' must be 'columns' or 'probing'.
+
+    Notes
+    -----
+    The 'probing' method starts by perturbing all columns at once, and then
+    repeatedly halves the groups of columns that changed each row. Halves
+    that no row needs to tell apart are perturbed together in one
+    evaluation. Each column gets a randomly scaled perturbation so that
+    changes from columns in the same group do not cancel. The number of
+    evaluations is roughly proportional to `d*log2(N)`, where `d` is the
+    maximum number of nonzeros per row, rather than `N`. This makes the
+    pattern practical to compute for large, sparse systems, especially when
+    combined with `sparse=True`.
 
     """
 
+    if method not in {'columns', 'probing'}:
+        raise ValueError("'method' must be 'columns' or 'probing'.")
+
     if yp0 is None:
         y0 = np.asarray(y0, dtype=float)
-        return _cvode_pattern(rhsfn, t0, y0, userdata)
+        return _cvode_pattern(rhsfn, t0, y0, userdata, method, sparse)
     else:
         y0 = np.asarray(y0, dtype=float)
         yp0 = np.asarray(yp0, dtype=float)
-        return _ida_pattern(rhsfn, t0, y0, yp0, userdata)
+        return _ida_pattern(rhsfn, t0, y0, yp0, userdata, method, sparse)
 
 
-def bandwidth(A: ndarray) -> tuple[int]:
+def bandwidth(A: ndarray | spmatrix | sparray) -> tuple[int]:
     """
     Return half bandwidths of a 2D array.
 
     Uses the `scipy.linalg.bandwidth` function to determine the lower and
-    upper bandwidths of a given array. Use in conjunction with `j_pattern`
-    to find the bandwidths of a Jacobian pattern.
+    upper bandwidths of a given dense array. Sparse inputs are handled
+    directly from their nonzero entries, without densifying. Use in
+    conjunction with `j_pattern` to find the bandwidths of a Jacobian pattern.
 
     Parameters
     ----------
-    A : 2D np.array
-        Input array of size (N, M).
+    A : 2D np.array or sparse matrix/array
+        Input array of size (N, M). Explicitly stored zeros in sparse inputs
+        are ignored.
 
     Returns
     -------
@@ -206,11 +326,23 @@ def bandwidth(A: ndarray) -> tuple[int]:
         on that side. The full bandwidth is `lband + uband + 1`.
 
     """
+    import scipy.sparse as sp
     from scipy.linalg import bandwidth
-    return bandwidth(A)
 
+    if not sp.issparse(A):
+        return bandwidth(A)
+
+    A = A.tocoo()
+    nonzero = A.data != 0
 
-def reduce_bandwidth(A: ndarray | spmatrix,
+    offsets = A.col[nonzero].astype(np.int64) - A.row[nonzero]
+    if offsets.size == 0:
+        return 0, 0
+
+    return int(max(-offsets.min(), 0)), int(max(offsets.max(), 0))
+
+
+def reduce_bandwidth(A: ndarray | spmatrix | sparray,
                      symmetric: bool = False) -> tuple[ndarray]:
     """
     Find a row/col reordering to reduce bandwidth.
@@ -221,8 +353,10 @@ def reduce_bandwidth(A: ndarray | spmatrix,
 
     Parameters
     ----------
-    A : ndarray | spmatrix
+    A : ndarray | spmatrix | sparray
         A 2D (n, n) input matrix whose sparsity pattern will be reduced.
+        Sparse inputs are used directly, without densifying. Explicitly
+        stored zeros are ignored.
     symmetric : bool, optional
         True if input matrix is guaranteed symmetric, otherwise False (default).
 
@@ -242,9 +376,461 @@ def reduce_bandwidth(A: ndarray | spmatrix,
     if not sp.issparse(A):
         A = sp.csc_matrix(A)
     else:
-        A = A.tocsc()
+        A = sp.csc_matrix(A, copy=True)
+        A.eliminate_zeros()
 
     perm = reverse_cuthill_mckee(A, symmetric)
     inv_perm = np.argsort(perm)
 
     return perm, inv_perm
+
+
+def sparse_slots(sparsity: ndarray | spmatrix, rows: ndarray,
+                 cols: ndarray) -> ndarray:
+    """
+    Map (row, col) Jacobian entries to their slots in compact sparse storage.
+
+    With `linsolver='sparse'` and `jac_storage='compact'`, 'JJ' in 'jacfn'
+    is a 1D array that holds only the nonzero values of 'sparsity', stored
+    in compressed sparse column (CSC) order. Call this function once, before
+    solving, to find where each entry lives so that 'jacfn' can fill 'JJ' in
+    place, e.g., `JJ[slots] = values`.
+
+    Parameters
+    ----------
+    sparsity : ndarray | spmatrix
+        The 2D (N, N) Jacobian sparsity pattern given to the solver.
+    rows : array_like[int]
+        Row indices 'i' of the entries `J[i, j]` to locate.
+    cols : array_like[int]
+        Column indices 'j' of the entries `J[i, j]` to locate. Must broadcast
+        against 'rows'.
+
+    Returns
+    -------
+    slots : ndarray
+        Integer positions in 'JJ' for each (row, col) pair. The shape is the
+        broadcasted shape of 'rows' and 'cols'.
+
+    Raises
+    ------
+    ValueError
+        At least one (row, col) pair is not a nonzero entry of 'sparsity'.
+
+    """
+    import scipy.sparse as sp
+
+    if not sp.issparse(sparsity):
+        sparsity = sp.csc_matrix(sparsity)
+    else:
+        sparsity = sparsity.tocsc(copy=True)
+
+    sparsity.sum_duplicates()  # sorted CSC order, matching the solvers
+
+    nrows, ncols = sparsity.shape
+    rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64),
+                                     np.asarray(cols, dtype=np.int64))
+
+    counts = np.diff(sparsity.indptr)
+    keys = np.repeat(np.arange(ncols, dtype=np.int64), counts)*nrows \
+        + sparsity.indices
+
+    query = cols*nrows + rows
+    slots = np.searchsorted(keys, query)
+
+    in_range = (rows >= 0) & (rows < nrows) & (cols >= 0) & (cols < ncols)
+    if keys.size == 0:
+        found = np.zeros_like(in_range)
+    else:
+        found = keys[np.minimum(slots, keys.size - 1)] == query
+
+    if not np.all(found & in_range):
+        raise ValueError("At least one (row, col) pair is not a nonzero entry"
+                         " of 'sparsity'.")
+
+    return slots
+
+
+def select_linsolver(pattern: ndarray | spmatrix | sparray,
+                     lapack: bool | None = None,
+                     superlu: bool | None = None) -> dict:
+    """
+    Choose a direct linear solver for a Jacobian pattern.
+
+    This is the heuristic used by `linsolver='auto'` in the solvers. Small
+    systems use a dense solver. Otherwise, banded storage is preferred when
+    it is narrow and stores at most 10 times more values than the pattern
+    has nonzeros, e.g., 1D discretizations or patterns reordered with
+    `reduce_bandwidth`. Nearly full patterns (>= 10% nonzero) use a dense
+    solver, and anything else uses 'sparse' when SuperLU_MT is available.
+    Without SuperLU_MT, wide bands still use 'band' if the band storage is
+    smaller than a quarter of the dense storage, and 'dense' if not. LAPACK
+    variants replace 'dense' and 'band' when LAPACK is enabled.
+
+    Parameters
+    ----------
+    pattern : 2D np.array or sparse matrix/array
+        Jacobian pattern with shape (N, N), e.g., from `j_pattern`.
+    lapack : bool or None, optional
+        Whether the 'lapack*' solvers are available. If None (default), this
+        is read from the SUNDIALS build configuration.
+    superlu : bool or None, optional
+        Whether the 'sparse' solver is available. If None (default), this is
+        read from the SUNDIALS build configuration.
+
+    Returns
+    -------
+    choice : dict
+        The selected 'linsolver', its 'lband' and 'uband' (None unless the
+        solver is banded), the pattern's 'nnz' and 'density', and a short
+        'reason' for the choice.
+
+    Raises
+    ------
+    ValueError
+        'pattern' must be a square matrix.
+
+    """
+    import scipy.sparse as sp
+    from ._cy_common import config
+
+    if lapack is None:
+        lapack = config['SUNDIALS_BLAS_LAPACK_ENABLED'] == "True"
+    if superlu is None:
+        superlu = config['SUNDIALS_SUPERLUMT_ENABLED'] == "True"
+
+    pattern = sp.csc_array(pattern, dtype=float)
+    pattern.eliminate_zeros()
+    pattern.sum_duplicates()
+
+    N = pattern.shape[0]
+    if pattern.shape[1] != N:
+        raise ValueError("'pattern' must be a square matrix.")
+
+    nnz = pattern.nnz
+    density = nnz / N**2 if N else 1.
+
+    lband, uband = bandwidth(pattern)
+    band_storage = (lband + 2*uband + 1)*N  # includes room for LU fill
+
+    if N < 100:
+        linsolver = 'dense'
+        reason = f"small system ({N=} < 100)"
+    elif band_storage <= min(N**2 / 4, 10*nnz):
+        linsolver = 'band'
+        reason = f"banded pattern ({lband=}, {uband=}) with {nnz=}"
+    elif density >= 0.1:
+        linsolver = 'dense'
+        reason = f"nearly full pattern ({density=:.3g})"
+    elif superlu:
+        linsolver = 'sparse'
+        reason = f"sparse pattern ({density=:.3g}) with wide bands" \
+                 f" ({lband=}, {uband=})"
+    elif band_storage <= N**2 / 4:
+        linsolver = 'band'
+        reason = f"wide bands ({lband=}, {uband=}), but SuperLU_MT is not" \
+                 " enabled"
+    else:
+        linsolver = 'dense'
+        reason = f"no narrow bands ({lband=}, {uband=}) and SuperLU_MT is" \
+                 " not enabled"
+
+    if lapack and linsolver in {'dense', 'band'}:
+        linsolver = 'lapack' + linsolver
+
+    if 'band' not in linsolver:
+        lband, uband = None, None
+
+    return {'linsolver': linsolver, 'lband': lband, 'uband': uband,
+            'nnz': nnz, 'density': density, 'reason': reason}
+
+
+class JacobianStructure:
+    """Precomputed Jacobian structure artifacts."""
+
+    _version = 1  # bump if the saved .npz layout changes
+
+    def __init__(self, pattern: ndarray | spmatrix | sparray,
+                 groups: ndarray = None, perm: ndarray = None,
+                 key: str | None = None) -> None:
+        """
+        Bundles a Jacobian sparsity pattern with everything derived from it:
+        the column coloring used by the 'sparsity' difference quotient
+        Jacobian, the half bandwidths, and a Reverse Cuthill-McKee ordering.
+        Computing these is expensive for large systems, so a structure can be
+        saved to a compact `.npz` file and loaded in other processes instead.
+
+        Pass an instance as the 'sparsity' option of :class:`~sksundae.ida.IDA`
+        or :class:`~sksundae.cvode.CVODE` to reuse its pattern and coloring.
+
+        Parameters
+        ----------
+        pattern : 2D np.array or sparse matrix/array
+            Jacobian pattern with shape (N, N). Nonzero entries are stored as
+            ones and explicitly stored zeros are dropped.
+        groups : 1D np.array or None, optional
+            Column coloring for the pattern, as returned by
+            `scipy.optimize._numdiff.group_columns`. Computed if None
+            (default).
+        perm : 1D np.array or None, optional
+            Reverse Cuthill-McKee ordering from `reduce_bandwidth`. Computed if
+            None (default).
+        key : str or None, optional
+            Model hash that identifies the problem the structure belongs to.
+            Used to name and validate cached files, see `cached`. Defaults to
+            None.
+
+        Raises
+        ------
+        ValueError
+            'pattern' must be square.
+        ValueError
+            'groups' and 'perm' must have one entry per column.
+        ValueError
+            'groups' must not put two columns that share a row in the same
+            group.
+
+        Examples
+        --------
+        .. code-block:: python
+
+            import numpy as np
+            import sksundae as sun
+
+            def rhsfn(t, y, yp):
+                yp[:] = np.convolve(y, [1., -2., 1.], mode='same')
+
+            y0 = np.ones(100_000)
+            structure = sun.jacband.JacobianStructure.cached(
+                'diffusion-v1', 'cache', rhsfn, 0., y0,
+            )
+
+            solver = sun.cvode.CVODE(rhsfn, linsolver='band',
+                                     lband=structure.lband,
+                                     uband=structure.uband,
+                                     sparsity=structure)
+
+        """
+        import scipy.sparse as sp
+        from scipy.optimize._numdiff import group_columns
+
+        pattern = sp.csc_array(pattern, dtype=float, copy=True)
+        pattern.eliminate_zeros()
+        pattern.sum_duplicates()
+        pattern.data[:] = 1.
+
+        N = pattern.shape[0]
+        if pattern.shape[1] != N:
+            raise ValueError("'pattern' must be a square matrix.")
+
+        if groups is None:
+            groups = group_columns(pattern)
+        if perm is None:
+            perm, _ = reduce_bandwidth(pattern)
+
+        groups = np.asarray(groups, dtype=np.int64)
+        perm = np.asarray(perm, dtype=np.int64)
+
+        if groups.shape != (N,) or perm.shape != (N,):
+            raise ValueError("'groups' and 'perm' must have one entry per"
+                             " column.")
+
+        # structurally orthogonal: no row has two nonzeros in the same group
+        nz_groups = np.repeat(groups, np.diff(pattern.indptr))
+        pairs = nz_groups*N + pattern.indices
+        if np.unique(pairs).size != pairs.size:
+            raise ValueError("'groups' is not a valid coloring of 'pattern'.")
+
+        self.pattern = pattern
+        self.groups = groups
+        self.bands = bandwidth(pattern)
+        self.perm = perm
+        self.inv_perm = np.argsort(perm)
+        self.key = key
+
+    def __repr__(self) -> str:
+        N, nnz = self.pattern.shape[0], self.pattern.nnz
+        return (f"JacobianStructure(N={N}, nnz={nnz}, bands={self.bands},"
+                f" ngroups={self.ngroups}, key={self.key!r})")
+
+    @property
+    def lband(self) -> int:
+        """Lower half bandwidth."""
+        return self.bands[0]
+
+    @property
+    def uband(self) -> int:
+        """Upper half bandwidth."""
+        return self.bands[1]
+
+    @property
+    def ngroups(self) -> int:
+        """Number of column groups, i.e., function evaluations per DQ
+        Jacobian."""
+        return int(self.groups.max()) + 1 if self.groups.size else 0
+
+    @classmethod
+    def from_function(cls, rhsfn: Callable, t0: float, y0: ndarray,
+                      yp0: ndarray = None, userdata: Any = None,
+                      method: str = 'probing',
+                      key: str | None = None) -> JacobianStructure:
+        """
+        Detect the pattern with `j_pattern` and build the structure.
+
+        Parameters
+        ----------
+        rhsfn : Callable
+            Right-hand-side (CVODE) or residual (IDA) function, see
+            `j_pattern`.
+        t0 : float
+            Input time to use in 'rhsfn'.
+        y0 : ndarray
+            State variables to use in 'rhsfn'.
+        yp0 : ndarray or None, optional
+            State variable time derivatives to use in 'rhsfn'. Required for
+            IDA functions, and None (default) for CVODE functions.
+        userdata : Any, optional
+            Additional data to pass to 'rhsfn', by default None.
+        method : {'probing', 'columns'}, optional
+            Pattern detection method, by default 'probing'.
+        key : str or None, optional
+            Model hash to store with the structure, by default None.
+
+        Returns
+        -------
+        structure : JacobianStructure
+            The detected structure.
+
+        """
+        pattern = j_pattern(rhsfn, t0, y0, yp0, userdata, method, sparse=True)
+        return cls(pattern, key=key)
+
+    def save(self, file: str | os.PathLike) -> None:
+        """
+        Write the structure to a compressed `.npz` file.
+
+        Only the CSC index arrays of the pattern are stored, along with the
+        coloring and permutation, so the file size is O(nnz).
+
+        Parameters
+        ----------
+        file : str or PathLike
+            Output file. NumPy appends '.npz' if it is missing.
+
+        """
+        np.savez_compressed(
+            file,
+            version=self._version,
+            shape=self.pattern.shape,
+            indices=self.pattern.indices,
+            indptr=self.pattern.indptr,
+            groups=self.groups,
+            perm=self.perm,
+            key='' if self.key is None else str(self.key),
+        )
+
+    @classmethod
+    def load(cls, file: str | os.PathLike) -> JacobianStructure:
+        """
+        Read a structure written by `save`.
+
+        Parameters
+        ----------
+        file : str or PathLike
+            A `.npz` file from `save`.
+
+        Returns
+        -------
+        structure : JacobianStructure
+            The loaded structure.
+
+        Raises
+        ------
+        ValueError
+            The file was written with an incompatible format version.
+
+        """
+        import scipy.sparse as sp
+
+        with np.load(file, allow_pickle=False) as data:
+            if int(data['version']) != cls._version:
+                raise ValueError(f"Incompatible structure file {file}.")
+
+            indices, indptr = data['indices'], data['indptr']
+            pattern = sp.csc_array((np.ones(indices.size), indices, indptr),
+                                   shape=tuple(data['shape']))
+
+            key = str(data['key']) or None
+
+            return cls(pattern, data['groups'], data['perm'], key)
+
+    @classmethod
+    def cached(cls, key: str, cache_dir: str | os.PathLike, rhsfn: Callable,
+               t0: float, y0: ndarray, yp0: ndarray = None,
+               userdata: Any = None,
+               method: str = 'probing') -> JacobianStructure:
+        """
+        Load the structure for 'key' from 'cache_dir', or build and save it.
+
+        The key is a user-provided model hash. It must change whenever the
+        Jacobian pattern of the model could change (e.g., different
+        discretization or physics), since cached files are never compared
+        against 'rhsfn'. Files are written atomically, so concurrent worker
+        processes can share one cache directory. Files from an incompatible
+        format version, or that cannot be read, are rebuilt and overwritten.
+
+        Parameters
+        ----------
+        key : str
+            Model hash. Used as the file name, '<key>.npz'.
+        cache_dir : str or PathLike
+            Cache directory, created if needed.
+        rhsfn, t0, y0, yp0, userdata, method
+            Passed to `from_function` when the cache misses.
+
+        Returns
+        -------
+        structure : JacobianStructure
+            The cached, or newly built, structure.
+
+        Raises
+        ------
+        TypeError
+            'key' must be type str.
+        ValueError
+            'key' must be a non-empty file name, without path separators.
+
+        """
+        if not isinstance(key, str):
+            raise TypeError("'key' must be type str.")
+        elif not key or os.path.basename(key) != key or key in {'.', '..'}:
+            raise ValueError("'key' must be a non-empty file name, without"
+                             " path separators.")
+
+        file = os.path.join(cache_dir, key + '.npz')
+
+        # stale versions, or truncated or unreadable files, are rebuilt
+        if os.path.exists(file):
+            try:
+                structure = cls.load(file)
+            except (ValueError, OSError, KeyError, EOFError, BadZipFile):
+                structure = None
+
+            if structure is not None and structure.key == key:
+                return structure
+
+        structure = cls.from_function(rhsfn, t0, y0, yp0, userdata, method,
+                                      key=key)
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(suffix='.npz', dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                structure.save(f)
+            os.replace(tmp, file)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+        return structure
@@ -0,0 +1,340 @@
+"""
+On-disk output sinks for solutions that do not fit in memory. Pass a sink, or
+a path, to the 'output' argument of `solve` and chunks of the solution are
+written to disk as the integration proceeds, rather than being accumulated in
+the returned results.
+
+"""
+
+from __future__ import annotations
+from typing import Iterator, TYPE_CHECKING
+
+import os
+import queue
+import struct
+import threading
+from numbers import Integral
+
+import numpy as np
+
+from .utils import StepIterator
+
+if TYPE_CHECKING:  # pragma: no cover
+    from numpy.typing import ndarray
+    from .utils import RichResult
+
+__all__ = ['OutputSink', 'NpySink', 'HDF5Sink',]
+
+_NPY_HEADER_LEN = 128  # fixed so the shape can be rewritten in place
+_FIELD_NAMES = ('t', 'y', 'yp', 'outputs')
+_EVENT_NAMES = ('i_events', 't_events', 'y_events', 'yp_events')
+
+
+class OutputSink:
+    """Base class for on-disk solution storage."""
+
+    def __init__(self, path: str | os.PathLike, chunksize: int = 1024,
+                 max_pending: int = 8) -> None:
+        """
+        Sinks receive the solution in chunks of 'chunksize' saved points and
+        hand them to a background thread, which writes them to disk. The
+        integrator only waits on disk I/O when 'max_pending' chunks are still
+        queued, which bounds memory use if the disk cannot keep up.
+
+        Subclasses implement `_open`, `_append`, `_write_events`, and
+        `_close`. Only `_append` runs on the writer thread.
+
+        Parameters
+        ----------
+        path : str or PathLike
+            Output location. Existing data at 'path' is overwritten.
+        chunksize : int, optional
+            Number of saved points per write, by default 1024.
+        max_pending : int, optional
+            Maximum number of chunks queued for writing, by default 8.
+
+        Raises
+        ------
+        TypeError
+            'chunksize' and 'max_pending' must be type int.
+        ValueError
+            'chunksize' and 'max_pending' must be positive.
+
+        """
+        for name, value in [('chunksize', chunksize),
+                            ('max_pending', max_pending)]:
+            if not isinstance(value, Integral):
+                raise TypeError(f"'{name}' must be type int.")
+            elif value < 1:
+                raise ValueError(f"'{name}' must be positive.")
+
+        self.path = os.fspath(path)
+        self.chunksize = chunksize
+        self.max_pending = max_pending
+
+    def _open(self, names: tuple[str], rows: tuple[tuple[int]]) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def _append(self, name: str, data: ndarray) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def _write_events(self, events: dict[str, ndarray]) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def _close(self) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def _writer(self, pending: queue.Queue) -> None:
+        """Writer thread. Drains 'pending' until a None sentinel arrives."""
+
+        while True:
+            record = pending.get()
+            if record is None:
+                return
+
+            try:
+                if self._error is None:
+                    for name, data in zip(self._names, record):
+                        self._append(name, data)
+
+            except BaseException as e:
+                self._error = e  # re-raised by the solving thread
+
+    def consume(self, steps: Iterator) -> RichResult | None:
+        """
+        Write all records from an `iter_steps` iterator.
+
+        This is what `solve` uses when 'output' is given. It is public so that
+        sinks can also be filled from iterators created elsewhere.
+
+        Parameters
+        ----------
+        steps : Iterator
+            Chunked records, e.g., from `iter_steps(..., chunksize=n)`.
+
+        Returns
+        -------
+        result : IDAResult, CVODEResult, or None
+            The iterator's summary result, see
+            :class:`~sksundae.utils.StepIterator`. Event fields are also
+            written to the sink.
+
+        """
+        if not isinstance(steps, StepIterator):
+            steps = StepIterator(steps)
+
+        pending = queue.Queue(self.max_pending)
+        thread = None
+
+        self._error = None
+
+        try:
+            for record in steps:
+                if thread is None:
+                    self._names = steps.fields or ('t', 'y', 'yp')
+                    self._open(self._names, [r.shape[1:] for r in record])
+
+                    thread = threading.Thread(target=self._writer,
+                                              args=(pending,), daemon=True)
+                    thread.start()
+
+                if self._error is not None:
+                    break
+
+                pending.put(tuple(np.array(r) for r in record))
+
+        finally:
+            if thread is not None:
+                pending.put(None)
+                thread.join()
+
+                if self._error is None and steps.result is not None:
+                    result = steps.result
+                    events = {name: getattr(result, name, None)
+                              for name in _EVENT_NAMES}
+
+                    self._write_events(events)
+
+                self._close()
+
+        if self._error is not None:
+            raise self._error
+
+        return steps.result
+
+
+class NpySink(OutputSink):
+    """Directory of growing .npy files."""
+
+    def __init__(self, path: str | os.PathLike, chunksize: int = 1024,
+                 max_pending: int = 8) -> None:
+        """
+        Writes one file per stored field, i.e., 't.npy', 'y.npy', 'yp.npy'
+        (IDA only), and 'outputs.npy' (with 'outputfn'), into the 'path'
+        directory, which is created if needed. Event fields are saved as
+        'i_events.npy', 't_events.npy', etc. when events occurred. Each file
+        is a standard .npy file, so it can be read back lazily with
+        `np.load(file, mmap_mode='r')`, even for trajectories larger than
+        memory.
+
+        Parameters
+        ----------
+        path : str or PathLike
+            Output directory. Existing files with the names above are
+            overwritten.
+        chunksize : int, optional
+            Number of saved points per write, by default 1024.
+        max_pending : int, optional
+            Maximum number of chunks queued for writing, by default 8.
+
+        Examples
+        --------
+        .. code-block:: python
+
+            import numpy as np
+            import sksundae as sun
+
+            def rhsfn(t, y, yp):
+                yp[0] = -y[0]
+
+            solver = sun.cvode.CVODE(rhsfn)
+            _ = solver.solve([0, 10], [1], output=sun.sinks.NpySink('soln'))
+
+            y = np.load('soln/y.npy', mmap_mode='r')
+
+        """
+        super().__init__(path, chunksize, max_pending)
+
+    def _header(self, shape: tuple[int]) -> bytes:
+        """Version 1.0 .npy header, padded to a fixed length."""
+        from ._cy_common import DTYPE
+
+        descr = np.lib.format.dtype_to_descr(np.dtype(DTYPE))
+        header = repr({'descr': descr, 'fortran_order': False,
+                       'shape': shape})
+
+        prefix = np.lib.format.magic(1, 0)
+        size = _NPY_HEADER_LEN - len(prefix) - 2
+
+        header = header.ljust(size - 1) + '\n'
+        return prefix + struct.pack('<H', size) + header.encode('latin1')
+
+    def _open(self, names: tuple[str], rows: tuple[tuple[int]]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+
+        for name in _FIELD_NAMES + _EVENT_NAMES:  # avoid mixing with old data
+            file = os.path.join(self.path, name + '.npy')
+            if os.path.exists(file):
+                os.remove(file)
+
+        self._files = {}
+        self._shapes = {}
+        for name, row in zip(names, rows):
+            fh = open(os.path.join(self.path, name + '.npy'), 'wb')
+            fh.write(self._header((0, *row)))
+
+            self._files[name] = fh
+            self._shapes[name] = (0, *row)
+
+    def _append(self, name: str, data: ndarray) -> None:
+        from ._cy_common import DTYPE
+
+        data = np.ascontiguousarray(data, dtype=DTYPE)
+        self._files[name].write(data.tobytes())
+
+        n, *row = self._shapes[name]
+        self._shapes[name] = (n + data.shape[0], *row)
+
+    def _write_events(self, events: dict[str, ndarray]) -> None:
+        for name, value in events.items():
+            if value is not None:
+                np.save(os.path.join(self.path, name + '.npy'), value)
+
+    def _close(self) -> None:
+        for name, fh in self._files.items():
+            fh.seek(0)
+            fh.write(self._header(self._shapes[name]))
+            fh.close()
+
+
+class HDF5Sink(OutputSink):
+    """HDF5 file with resizable datasets."""
+
+    def __init__(self, path: str | os.PathLike, chunksize: int = 1024,
+                 max_pending: int = 8, compression: str | None = None) -> None:
+        """
+        Writes one dataset per stored field, i.e., 't', 'y', 'yp' (IDA only),
+        and 'outputs' (with 'outputfn'), to an HDF5 file, along with event
+        datasets ('i_events', 't_events', etc.) when events
+        occurred. The datasets are chunked along time using 'chunksize'.
+        Requires the optional `h5py` package.
+
+        Parameters
+        ----------
+        path : str or PathLike
+            Output file. An existing file is overwritten.
+        chunksize : int, optional
+            Number of saved points per write, by default 1024.
+        max_pending : int, optional
+            Maximum number of chunks queued for writing, by default 8.
+        compression : str or None, optional
+            Dataset compression filter passed to `h5py`, e.g., 'gzip'. By
+            default None (no compression).
+
+        Raises
+        ------
+        ImportError
+            `h5py` is required for HDF5 output.
+
+        """
+        super().__init__(path, chunksize, max_pending)
+
+        try:
+            import h5py
+        except ImportError as e:
+            raise ImportError("'h5py' is required for HDF5 output. Install"
+                              " it, or use NpySink instead.") from e
+
+        self._h5py = h5py
+        self.compression = compression
+
+    def _open(self, names: tuple[str], rows: tuple[tuple[int]]) -> None:
+        from ._cy_common import DTYPE
+
+        self._file = self._h5py.File(self.path, 'w')
+
+        for name, row in zip(names, rows):
+            self._file.create_dataset(
+                name, shape=(0, *row), maxshape=(None, *row), dtype=DTYPE,
+                chunks=(self.chunksize, *row), compression=self.compression,
+            )
+
+    def _append(self, name: str, data: ndarray) -> None:
+        dataset = self._file[name]
+
+        n = dataset.shape[0]
+        dataset.resize(n + data.shape[0], axis=0)
+        dataset[n:] = data
+
+    def _write_events(self, events: dict[str, ndarray]) -> None:
+        for name, value in events.items():
+            if value is not None:
+                self._file.create_dataset(name, data=value)
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+def _as_sink(output: OutputSink | str | os.PathLike) -> OutputSink:
+    """Return 'output' as a sink. HDF5 suffixes select HDF5Sink."""
+
+    if isinstance(output, OutputSink):
+        return output
+    elif not isinstance(output, (str, os.PathLike)):
+        raise TypeError("'output' must be type OutputSink, str, or PathLike.")
+
+    _, ext = os.path.splitext(os.fspath(output))
+    if ext.lower() in {'.h5', '.hdf5'}:
+        return HDF5Sink(output)
+    else:
+        return NpySink(output)
@@ -3,9 +3,18 @@ General-purpose module for shared utilities across the package.
 
 """
 
+from __future__ import annotations
+from typing import Iterator, TYPE_CHECKING
+
+import os
+import json
+
 import numpy as np
 
-__all__ = ['RichResult',]
+if TYPE_CHECKING:  # pragma: no cover
+    from numpy.typing import ndarray
+
+__all__ = ['RichResult', 'DenseOutput', 'StepIterator', 'chrome_trace',]
 
 
 # RichResult and its formatters are modified copies from scipy._lib._util
@@ -103,6 +112,240 @@ class RichResult:
             return self.__class__.__name__ + '()'
 
 
+class DenseOutput:
+    """Continuous solution built from stored steps."""
+
+    def __init__(self, t: ndarray, y: ndarray, yp: ndarray) -> None:
+        """
+        A piecewise cubic Hermite interpolant, similar to `OdeSolution` from
+        `scipy.integrate`. Each interval between stored solution times uses
+        the values and time derivatives at both ends, so the interpolant and
+        its first derivative are continuous. Instances are returned in the
+        'sol' field of solver results when `dense_output=True`.
+
+        Parameters
+        ----------
+        t : array_like[float], shape(n >= 2,)
+            Solution times, either increasing or decreasing. Repeated times
+            (e.g., at events) keep only the last value.
+        y : array_like[float], shape(n, m)
+            State variable values at each time in 't'.
+        yp : array_like[float], shape(n, m)
+            State variable time derivatives at each time in 't'.
+
+        Raises
+        ------
+        ValueError
+            At least two distinct solution times are required.
+
+        Examples
+        --------
+        Evaluate a single, cheap solve at any number of times afterward. The
+        times do not need to be sorted.
+
+        .. code-block:: python
+
+            import numpy as np
+            import sksundae as sun
+
+            def rhsfn(t, y, yp):
+                yp[0] = -y[0]
+
+            solver = sun.cvode.CVODE(rhsfn, dense_output=True)
+            soln = solver.solve([0, 10], [1])
+
+            y = soln.sol(np.linspace(0, 10, 1001))
+            assert y.shape == (1001, 1)
+
+        """
+        from ._cy_common import DTYPE
+
+        t = np.asarray(t, dtype=DTYPE)
+        y = np.asarray(y, dtype=DTYPE)
+        yp = np.asarray(yp, dtype=DTYPE)
+
+        if t.size > 1 and t[-1] < t[0]:
+            t, y, yp = t[::-1], y[::-1], yp[::-1]
+
+        keep = np.r_[np.diff(t) > 0, True]
+        if keep.sum() < 2:
+            raise ValueError("At least two distinct solution times are"
+                             " required.")
+
+        self.ts = t[keep]
+        self._y = y[keep]
+        self._yp = yp[keep]
+
+        self.t_min = self.ts[0]
+        self.t_max = self.ts[-1]
+
+    def __call__(self, t: float | ndarray) -> ndarray:
+        """
+        Evaluate the solution.
+
+        Parameters
+        ----------
+        t : float or array_like[float], shape(k,)
+            Times to evaluate. All values must be within [t_min, t_max].
+
+        Returns
+        -------
+        y : ndarray, shape(m,) or shape(k, m)
+            Interpolated state variables. Rows correspond to the times in 't',
+            consistent with the 'y' field of the results classes.
+
+        Raises
+        ------
+        ValueError
+            At least one value in 't' is outside [t_min, t_max].
+
+        """
+        t = np.asarray(t, dtype=self.ts.dtype)
+        tq = np.atleast_1d(t)
+
+        if np.any(tq < self.t_min) or np.any(tq > self.t_max):
+            raise ValueError("At least one value in 't' is outside of the"
+                             " interval [t_min, t_max].")
+
+        i = np.searchsorted(self.ts, tq, side='right') - 1
+        i = np.clip(i, 0, self.ts.size - 2)
+
+        h = (self.ts[i + 1] - self.ts[i])[:, None]
+        s = (tq - self.ts[i])[:, None] / h
+
+        s2, s3 = s*s, s*s*s
+        h00 = 2.*s3 - 3.*s2 + 1.
+        h10 = s3 - 2.*s2 + s
+        h01 = -2.*s3 + 3.*s2
+        h11 = s3 - s2
+
+        y = h00*self._y[i] + h10*h*self._yp[i] \
+            + h01*self._y[i + 1] + h11*h*self._yp[i + 1]
+
+        return y[0] if t.ndim == 0 else y
+
+
+class StepIterator:
+    """Iterator over streamed solver steps."""
+
+    def __init__(self, steps: Iterator,
+                 fields: tuple[str] | None = None) -> None:
+        """
+        Wraps the generator behind `iter_steps` so that the summary of the
+        solve is still available once iteration finishes. Instances are
+        returned by the `iter_steps` methods of both solvers.
+
+        Parameters
+        ----------
+        steps : Iterator
+            A generator that yields step records and returns a results
+            instance when exhausted.
+        fields : tuple[str] or None, optional
+            Names of the values in each record, e.g., ('t', 'y', 'yp'). By
+            default None (unnamed).
+
+        Attributes
+        ----------
+        fields : tuple[str] or None
+            Names of the values in each record.
+        result : IDAResult, CVODEResult, or None
+            Summary of the solve, available after the last record has been
+            consumed. Includes the final 't' and 'y' (and 'yp' for IDA),
+            event data, and stats. None until then.
+
+        """
+        self._steps = steps
+        self.fields = fields
+        self.result = None
+
+    def __iter__(self) -> StepIterator:
+        return self
+
+    def __next__(self) -> tuple:
+        try:
+            return next(self._steps)
+        except StopIteration as stop:
+            if self.result is None:
+                self.result = stop.value
+            raise
+
+    def close(self) -> None:
+        """Stop iterating early and release the solver for other calls."""
+        self._steps.close()
+
+
+def chrome_trace(trace: ndarray, file: str | os.PathLike | None = None,
+                 name: str = 'solver') -> dict:
+    """
+    Convert a step trace to the Chrome trace event format.
+
+    The output can be opened in Perfetto (https://ui.perfetto.dev) or in
+    `chrome://tracing`. Each record becomes a 'step' slice on the timeline,
+    spanning the wall time since the previous record, with the record's
+    values as arguments. Counter tracks for the step size, method order, and
+    cumulative nonlinear iterations, error test failures, and Jacobian
+    evaluations are also added, so that step size collapses and bursts of
+    failures line up with the slices.
+
+    Parameters
+    ----------
+    trace : ndarray
+        Structured array from the solvers' `get_trace` method.
+    file : str, PathLike, or None, optional
+        If given, the JSON output is also written to this file. By default
+        None.
+    name : str, optional
+        Process name shown in the viewer, by default 'solver'.
+
+    Returns
+    -------
+    events : dict
+        Trace with a 'traceEvents' list, ready for `json.dump`.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import sksundae as sun
+
+        def rhsfn(t, y, yp):
+            yp[0] = -y[0]
+
+        solver = sun.cvode.CVODE(rhsfn, trace=10000)
+        _ = solver.solve([0, 10], [1])
+
+        sun.utils.chrome_trace(solver.get_trace(), 'trace.json')
+
+    """
+    meta = {'name': 'process_name', 'ph': 'M', 'pid': 0, 'tid': 0,
+            'args': {'name': name}}
+
+    events = [meta]
+    counters = ('h', 'order', 'nni', 'netf', 'njev')
+
+    start = trace['wall'][0] if trace.size else 0.
+    for rec in trace:
+        ts = 1e6*rec['wall']
+        args = {key: rec[key].item() for key in trace.dtype.names}
+
+        events.append({'name': 'step', 'ph': 'X', 'pid': 0, 'tid': 0,
+                       'ts': 1e6*start, 'dur': ts - 1e6*start, 'args': args})
+
+        for key in counters:
+            events.append({'name': key, 'ph': 'C', 'pid': 0, 'ts': ts,
+                           'args': {key: args[key]}})
+
+        start = rec['wall']
+
+    output = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    if file is not None:
+        with open(file, 'w') as f:
+            json.dump(output, f)
+
+    return output
+
+
 def _indenter(s, n=0):
     """Ensures lines after the first are indented by the specified amount."""
 
@@ -1,7 +1,13 @@
+import json
+
+import pytest
 import numpy as np
 import sksundae as sun
+import numpy.testing as npt
 
-from sksundae.utils import RichResult, _format_float_10
+from sksundae.utils import (
+    RichResult, DenseOutput, StepIterator, chrome_trace, _format_float_10,
+)
 
 
 def test_expected_config():
@@ -43,3 +49,78 @@ def test_format_float_10():
     assert _format_float_10(0.123456789) == ' 1.235e-01'
     assert _format_float_10(1.234567890) == ' 1.235e+00'
     assert _format_float_10(1234.567890) == ' 1.235e+03'
+
+
+def test_DenseOutput():
+
+    # cubic Hermite interpolation is exact for cubic polynomials
+    t = np.array([0., 0.3, 1., 1., 2.5])  # repeated times are dropped
+    y = np.column_stack([t**3 - t, 2.*t])
+    yp = np.column_stack([3.*t**2 - 1., 2.*np.ones_like(t)])
+
+    sol = DenseOutput(t, y, yp)
+    assert sol.t_min == 0. and sol.t_max == 2.5
+    npt.assert_allclose(sol.ts, [0., 0.3, 1., 2.5])
+
+    tq = np.array([2.5, 0.1, 1.7, 0.])  # unsorted queries
+    npt.assert_allclose(sol(tq), np.column_stack([tq**3 - tq, 2.*tq]),
+                        atol=1e-12)
+
+    assert sol(0.5).shape == (2,)
+
+    # decreasing times are supported
+    sol = DenseOutput(t[::-1], y[::-1], yp[::-1])
+    npt.assert_allclose(sol(tq), np.column_stack([tq**3 - tq, 2.*tq]),
+                        atol=1e-12)
+
+    with pytest.raises(ValueError):
+        _ = sol(3.)
+
+    with pytest.raises(ValueError):
+        _ = DenseOutput([1., 1.], y[:2], yp[:2])
+
+
+def test_StepIterator():
+
+    def steps():
+        yield 1
+        yield 2
+        return 'done'
+
+    it = StepIterator(steps())
+    assert iter(it) is it
+    assert it.result is None
+
+    assert list(it) == [1, 2]
+    assert it.result == 'done'
+
+    with pytest.raises(StopIteration):  # stays exhausted
+        _ = next(it)
+
+    assert it.result == 'done'
+
+
+def test_chrome_trace(tmp_path):
+
+    def rhsfn(t, y, yp):
+        yp[0] = -y[0]
+
+    solver = sun.cvode.CVODE(rhsfn, trace=100)
+    _ = solver.solve([0, 1], [1])
+
+    trace = solver.get_trace()
+    output = chrome_trace(trace, tmp_path / 'trace.json', name='CVODE')
+
+    with open(tmp_path / 'trace.json') as f:
+        assert json.load(f) == output
+
+    events = output['traceEvents']
+    steps = [e for e in events if e['ph'] == 'X']
+    counters = [e for e in events if e['ph'] == 'C']
+
+    assert events[0]['args']['name'] == 'CVODE'
+    assert len(steps) == trace.size and len(counters) == 5*trace.size
+    assert [s['args']['nsteps'] for s in steps] == list(trace['nsteps'])
+    assert all(s['dur'] >= 0 for s in steps)
+
+    assert chrome_trace(trace[:0], name='CVODE')['traceEvents'] == events[:1]
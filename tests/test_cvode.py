@@ -1,10 +1,14 @@
 import pickle
+import ctypes
 
 import pytest
 import numpy as np
 import numpy.testing as npt
 
+from scipy import LowLevelCallable
+
 from sksundae.cvode import CVODE, CVODEResult
+from sksundae.jacband import JacobianStructure
 
 
 def ode(t, y, yp):
@@ -130,6 +134,221 @@ def test_cvode_sparsity(linsolver):  # using cvLSSparseDQJac for dense/band
     npt.assert_allclose(soln.y, ode_soln(soln.t, y0))
 
 
+@pytest.mark.parametrize('linsolver', ['dense', 'band'])
+def test_cvode_sparsity_groups(linsolver):  # several columns per DQ group
+    from scipy.linalg import expm
+
+    N = 12
+    A = np.diag(-2*np.ones(N)) + np.diag(np.ones(N-1), 1) \
+        + np.diag(np.ones(N-1), -1)
+
+    def rhsfn(t, y, yp):
+        yp[:] = A.dot(y)
+
+    options = {}
+    if linsolver == 'band':
+        options.update({'lband': 1, 'uband': 1})
+
+    solver = CVODE(rhsfn, rtol=1e-9, atol=1e-12, linsolver=linsolver,
+                   sparsity=(A != 0), **options)
+
+    y0 = np.linspace(0, 1, N)
+    soln = solver.solve([0, 1], y0)
+
+    assert soln.njev > 0
+    npt.assert_allclose(soln.y[-1], expm(A).dot(y0), rtol=1e-6)
+
+    # a precomputed structure reuses the pattern and its column coloring
+    structure = JacobianStructure(A != 0)
+    assert structure.bands == (1, 1) and structure.ngroups < N
+
+    solver = CVODE(rhsfn, rtol=1e-9, atol=1e-12, linsolver=linsolver,
+                  sparsity=structure, **options)
+
+    soln_structure = solver.solve([0, 1], y0)
+
+    assert soln_structure.nfev == soln.nfev
+    npt.assert_allclose(soln_structure.y, soln.y)
+
+
+def test_cvode_auto():
+    from scipy.linalg import expm
+
+    from sksundae.cvode import CVODEPrecond
+
+    def rhsfn(t, y, yp):
+        yp[:] = np.convolve(y, [1., -2., 1.], mode='same')
+
+    N = 120
+    A = np.diag(-2*np.ones(N)) + np.diag(np.ones(N-1), 1) \
+        + np.diag(np.ones(N-1), -1)
+
+    y0 = np.linspace(0, 1, N)
+
+    assert CVODE(rhsfn).solve([0, 1], y0).auto is None
+
+    # the banded pattern is detected and also used for the DQ Jacobian
+    solver = CVODE(rhsfn, rtol=1e-9, atol=1e-12, linsolver='auto',
+                   sparsity='auto')
+
+    soln = solver.solve([0, 1], y0)
+
+    assert soln.auto['linsolver'] in {'band', 'lapackband'}
+    assert (soln.auto['lband'], soln.auto['uband']) == (1, 1)
+    assert soln.auto['nnz'] == 3*N - 2 and soln.auto['sparsity']
+    assert soln.njev > 0
+    npt.assert_allclose(soln.y[-1], expm(A).dot(y0), rtol=1e-6)
+
+    # stepwise results report the same choice
+    assert solver.init_step(0, y0).auto == soln.auto
+    assert solver.step(0.5).auto == soln.auto
+
+    # only direct solvers are selected
+    def psolve(t, y, yp, rv, zv, gamma, delta, lr):
+        zv[:] = rv
+
+    with pytest.raises(ValueError):
+        _ = CVODE(rhsfn, linsolver='auto', precond=CVODEPrecond(None, psolve))
+
+    def jacfn(t, y, yp, JJ):
+        pass
+
+    with pytest.raises(ValueError, match='compact'):  # layout not yet known
+        _ = CVODE(rhsfn, linsolver='auto', jacfn=jacfn, jac_storage='compact')
+
+    # patterns are only detected from Python functions
+    rhsfn_t = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_double,
+                               ctypes.POINTER(ctypes.c_double),
+                               ctypes.POINTER(ctypes.c_double),
+                               ctypes.c_void_p)
+
+    @rhsfn_t
+    def c_rhsfn(t, y, yp, data):
+        return 0
+
+    with pytest.raises(ValueError):
+        _ = CVODE(LowLevelCallable(c_rhsfn), linsolver='auto')
+
+    _ = CVODE(LowLevelCallable(c_rhsfn), linsolver='auto',
+              sparsity=np.eye(N))
+
+
+def test_cvode_compact_jacfn():
+    N = 12
+    A = np.diag(-2*np.ones(N)) + np.diag(np.ones(N-1), 1) \
+        + np.diag(np.ones(N-1), -1)
+
+    def rhsfn(t, y, yp):
+        yp[:] = A.dot(y)
+
+    def jacfn_full(t, y, yp, JJ):
+        assert JJ.flags.c_contiguous  # persistent row-major array
+        JJ[:, :] = A
+
+    def jacfn_dense(t, y, yp, JJ):
+        assert JJ.flags.f_contiguous  # view of the SUNDenseMatrix data
+        JJ[:, :] = A
+
+    def jacfn_compact(t, y, yp, JJ):
+        assert JJ.shape == (4, N)  # 'solve_banded' layout, JJ[u + i - j, j]
+        JJ[0, :] = 0.
+        JJ[1, 1:] = 1.
+        JJ[2, :] = -2.
+        JJ[3, :-1] = 1.
+
+    y0 = np.linspace(0, 1, N)
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'linsolver': 'band', 'lband': 1,
+               'uband': 2}
+
+    soln_full = CVODE(rhsfn, jacfn=jacfn_full, rtol=1e-9, atol=1e-12)
+    soln_full = soln_full.solve([0, 1], y0)
+
+    solver = CVODE(rhsfn, jacfn=jacfn_dense, jac_storage='compact',
+                   rtol=1e-9, atol=1e-12)
+
+    soln = solver.solve([0, 1], y0)
+    npt.assert_allclose(soln.y, soln_full.y)
+
+    # 'full' arrays keep their values between calls, compact ones are zeroed
+    for jac_storage, kept in [('full', True), ('compact', False)]:
+        received = []
+
+        def jacfn(t, y, yp, JJ):
+            received.append(JJ.any())
+            JJ[:, :] = A
+
+        solver = CVODE(rhsfn, jacfn=jacfn, jac_storage=jac_storage,
+                       rtol=1e-9, atol=1e-12)
+
+        _ = solver.solve([0, 1], y0)
+
+        assert len(received) > 1
+        assert received[1:] == [kept]*(len(received) - 1)
+
+    solver = CVODE(rhsfn, jacfn=jacfn_compact, jac_storage='compact',
+                   **options)
+
+    soln = solver.solve([0, 1], y0)
+
+    assert soln.njev > 0
+    npt.assert_allclose(soln.y, soln_full.y)
+
+    # compiled functions fill a column-major buffer, with ldim = l + u + 1
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    rhsfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, vptr)
+    jacfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, vptr)
+
+    @rhsfn_t
+    def c_rhsfn(t, y, yp, data):
+        for i in range(N):
+            yp[i] = -2*y[i]
+            yp[i] += y[i-1] if i > 0 else 0.
+            yp[i] += y[i+1] if i < N - 1 else 0.
+        return 0
+
+    @jacfn_t
+    def c_jacfn(t, y, yp, JJ, data):
+        for j in range(N):
+            JJ[0 + 4*j] = 0.
+            JJ[1 + 4*j] = 1. if j > 0 else 0.
+            JJ[2 + 4*j] = -2.
+            JJ[3 + 4*j] = 1. if j < N - 1 else 0.
+        return 0
+
+    solver = CVODE(LowLevelCallable(c_rhsfn), jac_storage='compact',
+                   jacfn=LowLevelCallable(c_jacfn), **options)
+
+    soln = solver.solve([0, 1], y0)
+    npt.assert_allclose(soln.y, soln_full.y, rtol=1e-5)
+
+    # compiled functions fill dense matrices in column-major order
+    @jacfn_t
+    def c_jacfn_dense(t, y, yp, JJ, data):
+        for j in range(N):
+            JJ[j + N*j] = -2.
+            if j > 0:
+                JJ[(j - 1) + N*j] = 1.
+            if j < N - 1:
+                JJ[(j + 1) + N*j] = 1.
+        return 0
+
+    solver = CVODE(LowLevelCallable(c_rhsfn), jac_storage='compact',
+                   jacfn=LowLevelCallable(c_jacfn_dense), rtol=1e-9,
+                   atol=1e-12)
+
+    soln = solver.solve([0, 1], y0)
+    npt.assert_allclose(soln.y, soln_full.y, rtol=1e-5)
+
+    # 'compact' requires a direct linear solver
+    with pytest.raises(ValueError):
+        _ = CVODE(rhsfn, jac_storage='compact', linsolver='gmres')
+
+    with pytest.raises(ValueError):
+        _ = CVODE(rhsfn, jac_storage='banded')
+
+
 def test_cvode_constraints():
     y0 = np.array([1, 2])
 
@@ -225,6 +444,204 @@ def test_cvode_jacfn():
     npt.assert_allclose(soln.y, ode_soln(soln.t, y0))
 
 
+def test_cvode_zero_copy():
+    y0 = np.array([1, 2])
+
+    with pytest.raises(TypeError):  # zero_copy must be a bool
+        _ = CVODE(ode, zero_copy=1)
+
+    def eventsfn(t, y, events):
+        events[0] = y[0] - 1.55
+
+    eventsfn.terminal = [False]
+
+    def jacfn(t, y, yp, JJ):
+        JJ[1, 1] = 1
+
+    options = {
+        'rtol': 1e-9, 'atol': 1e-12, 'jacfn': jacfn, 'eventsfn': eventsfn,
+        'num_events': 1,
+    }
+
+    tspan = np.linspace(0, 10, 11)
+    soln_copy = CVODE(ode, **options).solve(tspan, y0)
+    soln_view = CVODE(ode, zero_copy=True, **options).solve(tspan, y0)
+
+    npt.assert_allclose(soln_view.y, ode_soln(soln_view.t, y0))
+    npt.assert_allclose(soln_view.y, soln_copy.y)
+    npt.assert_allclose(soln_view.y_events, soln_copy.y_events)
+    assert soln_view.nfev == soln_copy.nfev
+
+    # arrays passed to callbacks are views over SUNDIALS memory
+    def ode_w_check(t, y, yp):
+        assert not y.flags.owndata
+        assert not yp.flags.owndata
+        ode(t, y, yp)
+
+    solver = CVODE(ode_w_check, zero_copy=True, **options)
+    soln = solver.solve(tspan, y0)
+    assert soln.success
+
+
+def test_cvode_native_callbacks():
+    y0 = np.array([1, 2])
+
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    rhsfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, vptr)
+    jacfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, vptr)
+
+    @rhsfn_t
+    def c_ode(t, y, yp, data):
+        yp[0] = 0.1
+        yp[1] = y[1]
+        return 0
+
+    @rhsfn_t
+    def c_eventsfn(t, y, events, data):
+        events[0] = y[0] - 1.55
+        return 0
+
+    @jacfn_t
+    def c_jacfn(t, y, yp, JJ, data):
+        JJ[3] = 1  # row-major, JJ[i*N + j]
+        return 0
+
+    def eventsfn(t, y, events):
+        events[0] = y[0] - 1.55
+
+    eventsfn.terminal = [False]
+
+    def jacfn(t, y, yp, JJ):
+        JJ[1, 1] = 1
+
+    class Events(LowLevelCallable):  # subclass to allow 'terminal'
+        pass
+
+    c_events = Events(c_eventsfn)
+    c_events.terminal = [False]
+
+    options = {'rtol': 1e-9, 'atol': 1e-12}
+
+    tspan = np.linspace(0, 10, 11)
+    solver = CVODE(ode, jacfn=jacfn, eventsfn=eventsfn, num_events=1,
+                   **options)
+    soln_py = solver.solve(tspan, y0)
+
+    solver = CVODE(LowLevelCallable(c_ode), jacfn=LowLevelCallable(c_jacfn),
+                   eventsfn=c_events, num_events=1, **options)
+
+    soln_c = solver.solve(tspan, y0)
+    npt.assert_allclose(soln_c.y, ode_soln(soln_c.t, y0))
+    npt.assert_allclose(soln_c.y, soln_py.y)
+    npt.assert_allclose(soln_c.y_events, soln_py.y_events)
+    assert soln_c.nfev == soln_py.nfev
+
+    # mixing Python/native, and DQ Jacobian from 'sparsity' w/ native rhsfn
+    solver = CVODE(LowLevelCallable(c_ode), eventsfn=eventsfn, num_events=1,
+                   sparsity=np.eye(2), **options)
+
+    soln = solver.solve(tspan, y0)
+    npt.assert_allclose(soln.y, soln_py.y)
+
+    # events are terminal by default, w/o needing a subclass
+    solver = CVODE(LowLevelCallable(c_ode), num_events=1,
+                   eventsfn=LowLevelCallable(c_eventsfn), **options)
+
+    soln = solver.solve(tspan, y0)
+    assert soln.status == 2
+    npt.assert_allclose(soln.t[-1], 5.5)
+
+    # 'user_data' pointer is passed through
+    @rhsfn_t
+    def c_ode_w_data(t, y, yp, data):
+        rate = ctypes.cast(data, ptr)[0]
+        yp[0] = rate
+        yp[1] = y[1]
+        return 0
+
+    rate = ctypes.c_double(0.1)
+    user_data = ctypes.cast(ctypes.pointer(rate), vptr)
+
+    solver = CVODE(LowLevelCallable(c_ode_w_data, user_data), **options)
+
+    soln = solver.solve(tspan, y0)
+    npt.assert_allclose(soln.y, ode_soln(soln.t, y0))
+
+    # negative return values halt the solver
+    @rhsfn_t
+    def c_bad_ode(t, y, yp, data):
+        return -1
+
+    soln = CVODE(LowLevelCallable(c_bad_ode)).solve(tspan, y0)
+    assert not soln.success
+
+    # signatures are checked
+    with pytest.raises(ValueError):
+        _ = CVODE(LowLevelCallable(c_jacfn))
+
+    with pytest.raises(ValueError):
+        _ = CVODE(ode, jacfn=LowLevelCallable(c_ode))
+
+
+def test_cvode_native_threads():  # ctypes callbacks retake the GIL
+    from concurrent.futures import ThreadPoolExecutor
+
+    y0 = np.array([1, 2])
+
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    rhsfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, vptr)
+    jacfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, vptr)
+
+    @rhsfn_t
+    def c_ode(t, y, yp, data):
+        yp[0] = 0.1
+        yp[1] = y[1]
+        return 0
+
+    @jacfn_t
+    def c_jacfn(t, y, yp, JJ, data):
+        JJ[3] = 1
+        return 0
+
+    tspan = np.linspace(0, 10, 11)
+    options = {'rtol': 1e-9, 'atol': 1e-12}
+
+    # all native callbacks use the LowLevelCallable path, dense and band JJ
+    for linsolver in [{'linsolver': 'dense'},
+                      {'linsolver': 'band', 'lband': 0, 'uband': 0}]:
+        solver = CVODE(LowLevelCallable(c_ode),
+                       jacfn=LowLevelCallable(c_jacfn), **linsolver,
+                       **options)
+
+        soln = solver.solve(tspan, y0)
+        npt.assert_allclose(soln.y, ode_soln(soln.t, y0))
+        assert soln.njev > 0
+
+    # separate instances can run concurrently in threads
+    def run(_):
+        solver = CVODE(LowLevelCallable(c_ode),
+                       jacfn=LowLevelCallable(c_jacfn), **options)
+
+        return solver.solve(tspan, y0)
+
+    with ThreadPoolExecutor(4) as pool:
+        solns = list(pool.map(run, range(8)))
+
+    for soln in solns:
+        npt.assert_allclose(soln.y, ode_soln(soln.t, y0))
+
+    # step method also works with only native callbacks
+    solver = CVODE(LowLevelCallable(c_ode), **options)
+    solver.init_step(0., y0)
+
+    soln = solver.step(10.)
+    npt.assert_allclose(soln.y, ode_soln(soln.t, y0))
+
+
 def test_failures_on_exceptions():
 
     # exception in rhsfn
@@ -313,3 +730,295 @@ def test_pickling(tmp_path):
 
     npt.assert_allclose(loaded_soln.t, soln.t)
     npt.assert_allclose(loaded_soln.y, soln.y)
+
+
+def test_cvode_dense_output():
+    y0 = np.array([1, 2])
+
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12, dense_output=True)
+
+    soln = solver.solve([0, 10], y0)
+
+    tq = np.linspace(0, 10, 1001)
+    npt.assert_allclose(soln.sol(tq), ode_soln(tq, y0), rtol=1e-5)
+    npt.assert_allclose(soln.sol(soln.t), soln.y)
+
+    soln = solver.solve(np.linspace(0, 1, 21), y0)
+    npt.assert_allclose(soln.sol(tq[:101]), ode_soln(tq[:101], y0), rtol=1e-5)
+
+    soln = CVODE(ode).solve([0, 10], y0)
+    assert soln.sol is None
+
+    with pytest.raises(TypeError):
+        _ = CVODE(ode, dense_output=1)
+
+
+def test_cvode_interpolate():
+    y0 = np.array([1, 2])
+
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12)
+
+    with pytest.raises(ValueError):  # have to call init_step first
+        _ = solver.interpolate(0.)
+
+    t_prev = solver.init_step(0, y0).t
+    for _ in range(10):
+        t_next = solver.step(10, method='onestep').t
+
+        tq = np.linspace(t_prev, t_next, 5)
+        npt.assert_allclose(solver.interpolate(tq), ode_soln(tq, y0),
+                            rtol=1e-6)
+
+        yp = solver.interpolate(t_next, k=1)
+        npt.assert_allclose(yp, [0.1, y0[1]*np.exp(t_next)], rtol=1e-4)
+
+        t_prev = t_next
+
+    with pytest.raises(ValueError):  # outside of the last step
+        _ = solver.interpolate(t_prev - 1.)
+
+    with pytest.raises(ValueError):  # 'k' larger than the method order
+        _ = solver.interpolate(t_next, k=6)
+
+
+@pytest.mark.parametrize('tspan', [[0, 10], np.linspace(0, 10, 11)])
+def test_cvode_iter_steps(tspan):
+    y0 = np.array([1, 2])
+
+    def eventsfn(t, y, events):
+        events[0] = y[0] - 1.55
+
+    eventsfn.terminal = [False]
+
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'eventsfn': eventsfn,
+               'num_events': 1}
+
+    soln = CVODE(ode, **options).solve(tspan, y0)
+
+    solver = CVODE(ode, **options)  # events accumulate per solver instance
+    steps = solver.iter_steps(tspan, y0)
+    records = [(t, y.copy()) for t, y in steps]
+
+    npt.assert_allclose([r[0] for r in records], soln.t)
+    npt.assert_allclose([r[1] for r in records], soln.y)
+
+    assert steps.result.status == soln.status
+    assert steps.result.t == soln.t[-1]
+    npt.assert_allclose(steps.result.y, soln.y[-1])
+    npt.assert_allclose(steps.result.t_events, soln.t_events)
+    assert steps.result.nfev == soln.nfev
+
+    solver = CVODE(ode, **options)
+    steps = solver.iter_steps(tspan, y0, chunksize=4)
+    chunks = [(t.copy(), y.copy()) for t, y in steps]
+
+    assert all(c[0].size <= 4 for c in chunks)
+    npt.assert_allclose(np.concatenate([c[0] for c in chunks]), soln.t)
+    npt.assert_allclose(np.concatenate([c[1] for c in chunks]), soln.y)
+    assert steps.result.success
+
+    with pytest.raises(TypeError):
+        _ = solver.iter_steps(tspan, y0, chunksize=2.)
+
+    with pytest.raises(ValueError):
+        _ = solver.iter_steps(tspan, y0, chunksize=0)
+
+    with pytest.raises(ValueError):
+        _ = solver.iter_steps([0], y0)  # raised at call time
+
+    with pytest.raises(ValueError):  # out of range for 'y0'
+        _ = CVODE(ode, save_idx=[2]).iter_steps(tspan, y0)
+
+    # closing a stream early restores the solver for other calls
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12)
+    steps = solver.iter_steps([0, 10], y0)
+    _ = next(steps)
+    steps.close()
+
+    with pytest.raises(ValueError):  # stream's init_step no longer active
+        _ = solver.step(5.)
+
+    _ = solver.init_step(0., y0)
+    assert solver.step(15., tstop=None).t == 15.  # stream's tstop cleared
+
+
+@pytest.mark.parametrize('tspan', [[0, 10], np.linspace(0, 10, 11)])
+def test_cvode_save_options(tspan):
+    y0 = np.array([1, 2])
+
+    full = CVODE(ode, rtol=1e-9, atol=1e-12).solve(tspan, y0)
+
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12, save_idx=[1],
+                   save_order='F', dense_output=True)
+
+    soln = solver.solve(tspan, y0)
+    assert soln.y.shape == (full.t.size, 1)
+    assert soln.y.flags.f_contiguous
+
+    npt.assert_allclose(soln.t, full.t)
+    npt.assert_allclose(soln.y, full.y[:, [1]])
+    npt.assert_allclose(soln.sol(5.), ode_soln(5., y0)[[1]], rtol=1e-4)
+    assert soln.sol(5.).dtype == soln.y.dtype
+
+    steps = solver.iter_steps(tspan, y0)
+    y = np.array([y.copy() for t, y in steps])
+    npt.assert_allclose(y, full.y[:, [1]])
+
+    with pytest.raises(ValueError):  # out of range
+        _ = CVODE(ode, save_idx=[-1]).solve(tspan, y0)
+
+    with pytest.raises(TypeError):
+        _ = CVODE(ode, save_idx=1)
+
+    with pytest.raises(ValueError):
+        _ = CVODE(ode, save_order='c')
+
+
+def test_cvode_thinning():
+    y0 = np.array([1, 2])
+
+    full = CVODE(ode, rtol=1e-9, atol=1e-12).solve([0, 10], y0)
+
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12, thin_atol=1.)
+
+    soln = solver.solve([0, 10], y0)
+    assert 2 < soln.t.size < full.t.size
+    assert soln.t[-1] == 10.  # final step kept
+    npt.assert_allclose(soln.y, ode_soln(soln.t, y0), rtol=1e-6)
+
+    steps = solver.iter_steps([0, 10], y0, chunksize=10)
+    t = np.concatenate([t.copy() for t, y in steps])
+    npt.assert_allclose(t, soln.t)
+
+    with pytest.raises(TypeError):
+        _ = CVODE(ode, thin_atol=[1.])
+
+    with pytest.raises(ValueError):
+        _ = CVODE(ode, thin_rtol=-1.)
+
+    with pytest.raises(ValueError):  # 'sol' would skip the dropped steps
+        _ = CVODE(ode, thin_atol=1., dense_output=True)
+
+
+def test_cvode_outputfn(tmp_path):
+    y0 = np.array([1, 2])
+    tspan = np.linspace(0, 10, 11)
+
+    def outputfn(t, y, yp, out):
+        out[0] = y[0] + y[1]
+        out[1] = yp[1]
+
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12, outputfn=outputfn,
+                   num_outputs=2, save_y=False)
+
+    soln = solver.solve(tspan, y0)
+    exact = ode_soln(tspan, y0)
+
+    assert soln.y is None
+    npt.assert_allclose(soln.outputs[:, 0], exact.sum(axis=1), rtol=1e-6)
+    npt.assert_allclose(soln.outputs[:, 1], exact[:, 1], rtol=1e-4)
+
+    # derived outputs are also written by on-disk sinks
+    _ = solver.solve(tspan, y0, output=tmp_path)
+    npt.assert_allclose(np.load(tmp_path / 'outputs.npy'), soln.outputs)
+    assert not (tmp_path / 'y.npy').exists()
+
+    with pytest.raises(TypeError):
+        _ = CVODE(ode, outputfn=1, num_outputs=1)
+
+    with pytest.raises(ValueError):
+        _ = CVODE(ode, outputfn=outputfn, num_outputs=-1)
+
+
+def test_cvode_stats():
+    y0 = np.array([1, 2])
+
+    solver = CVODE(ode, rtol=1e-9, atol=1e-12)
+
+    with pytest.raises(ValueError):  # have to call init_step first
+        _ = solver.get_stats()
+
+    soln = solver.init_step(0, y0)
+    assert soln.stats['nsteps'] == 0
+
+    nsteps = 0
+    for _ in range(10):
+        soln = solver.step(10, method='onestep')
+        stats = solver.get_stats()
+
+        assert stats['nsteps'] == nsteps + 1
+        assert stats['tcur'] == soln.t
+        assert stats['nfev'] == soln.nfev and stats['njev'] == soln.njev
+        assert 1 <= stats['qlast'] <= 5 and stats['hlast'] > 0.
+
+        nsteps = stats['nsteps']
+
+    def eventsfn(t, y, events):
+        events[0] = y[0] - 1.5
+
+    soln = CVODE(ode, linsolver='gmres', eventsfn=eventsfn,
+                 num_events=1).solve([0, 10], y0)
+
+    assert soln.stats['nliters'] > 0 and soln.stats['njvevals'] > 0
+    assert soln.stats['ngevals'] > 0 and soln.stats['njev'] == 0
+    assert soln.stats['nsteps'] == len(soln.t) - 1
+    assert solver.get_stats()['ngevals'] == 0
+
+
+def test_cvode_profile():
+    y0 = np.array([1, 2])
+
+    def eventsfn(t, y, events):
+        events[0] = y[0] - 1.5
+
+    eventsfn.terminal = [False]
+
+    soln = CVODE(ode, eventsfn=eventsfn, num_events=1,
+                 profile=True).solve([0, 1], y0)
+    profile = soln.profile
+
+    assert set(profile) == {'solve', 'rhsfn', 'eventsfn'}
+    assert profile['solve']['calls'] == len(soln.t) - 1
+    assert profile['rhsfn']['calls'] > 0 and profile['eventsfn']['calls'] > 0
+
+    for region in profile.values():
+        assert 0. <= region['exclusive'] <= region['inclusive']
+
+    assert CVODE(ode).solve([0, 1], y0).profile is None
+
+    with pytest.raises(TypeError):
+        _ = CVODE(ode, profile='yes')
+
+
+def test_cvode_trace():
+    y0 = np.array([1, 2])
+    tspan = np.linspace(0, 1, 11)
+
+    solver = CVODE(ode, trace=100)
+
+    # normal solves take many internal steps per call, so are rejected
+    with pytest.raises(ValueError):
+        _ = solver.solve(tspan, y0)
+
+    with pytest.raises(ValueError):
+        _ = solver.iter_steps(tspan, y0)
+
+    _ = solver.init_step(0., y0)
+    with pytest.raises(ValueError):
+        _ = solver.step(1., method='normal')
+
+    # onestep calls record every internal step
+    while solver.step(1., method='onestep', tstop=1.).t < 1.:
+        pass
+
+    stats = solver.get_stats()
+    trace = solver.get_trace()
+    npt.assert_equal(trace['nsteps'], np.arange(1, stats['nsteps'] + 1))
+    assert trace['nni'][-1] == stats['nniters']
+    assert trace['t'][-1] == 1.
+
+    with pytest.raises(TypeError):
+        _ = CVODE(ode, trace=1.)
+
+    with pytest.raises(TypeError):  # not a capacity of 1
+        _ = CVODE(ode, trace=True)
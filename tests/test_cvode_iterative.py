@@ -1,7 +1,11 @@
+import ctypes
+
 import pytest
 import numpy as np
 import numpy.testing as npt
 
+from scipy import LowLevelCallable
+
 from sksundae.cvode import CVODE, CVODEPrecond, CVODEJacTimes
 
 
@@ -144,6 +148,12 @@ def test_w_precond_solve(linsolver, side):
     soln = solver.solve(tspan, y0)
     assert soln.success
 
+    solver = CVODE(rhsfn, linsolver=linsolver, precond=precond,
+                   userdata=userdata, zero_copy=True)
+
+    soln_view = solver.solve(tspan, y0)
+    npt.assert_allclose(soln_view.y, soln.y)
+
 
 def test_jactimes():
 
@@ -183,3 +193,63 @@ def test_w_jactimes_solve(linsolver):
 
     soln = solver.solve(tspan, y0)
     assert soln.success
+
+    solver = CVODE(jvode, linsolver=linsolver, jactimes=jactimes,
+                   userdata=userdata, zero_copy=True)
+
+    soln_view = solver.solve(tspan, y0)
+    npt.assert_allclose(soln_view.y, soln.y)
+
+
+@pytest.mark.parametrize('linsolver', ('gmres', 'bicgstab', 'tfqmr'))
+def test_native_precond_and_jactimes(linsolver):
+    tspan = np.array([0, 10])
+    y0 = np.array([1, 2])
+
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr, iptr = ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_int)
+
+    psetup_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ctypes.c_int,
+                                iptr, dbl, vptr)
+    psolve_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, ptr, dbl,
+                                dbl, ctypes.c_int, vptr)
+    jvsetup_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, vptr)
+    jvsolve_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, ptr, vptr)
+
+    @psetup_t
+    def c_psetupfn(t, y, yp, jok, jnew, gamma, data):
+        jnew[0] = 0 if jok else 1
+        return 0
+
+    @psolve_t
+    def c_psolvefn(t, y, yp, rvec, zvec, gamma, delta, lr, data):
+        zvec[0] = rvec[0]
+        zvec[1] = rvec[1] / (1 - gamma)
+        return 0
+
+    @jvsetup_t
+    def c_jvsetupfn(t, y, yp, data):
+        return 0
+
+    @jvsolve_t
+    def c_jvsolvefn(t, y, yp, v, Jv, data):
+        Jv[0] = 0
+        Jv[1] = v[1]
+        return 0
+
+    precond = CVODEPrecond(LowLevelCallable(c_psetupfn),
+                           LowLevelCallable(c_psolvefn))
+
+    jactimes = CVODEJacTimes(LowLevelCallable(c_jvsetupfn),
+                             LowLevelCallable(c_jvsolvefn))
+
+    solver = CVODE(ode, linsolver=linsolver, rtol=1e-9, atol=1e-12,
+                   precond=precond, jactimes=jactimes)
+
+    soln = solver.solve(tspan, y0)
+    npt.assert_allclose(soln.y, ode_soln(soln.t, y0), rtol=1e-5)
+
+    # signatures are checked
+    precond = CVODEPrecond(None, LowLevelCallable(c_jvsolvefn))
+    with pytest.raises(ValueError):
+        _ = CVODE(ode, linsolver=linsolver, precond=precond)
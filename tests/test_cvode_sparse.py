@@ -72,3 +72,58 @@ def test_sparse_solver():
 
     soln = solver.solve(tspan, y0)
     assert soln.success
+
+
+@pytest.mark.skipif(not has_superlu, reason='SuperLU_MT not enabled')
+def test_sparse_compact_jacfn():
+    from sksundae.jacband import sparse_slots
+
+    tspan = np.linspace(0, 3000, 1000)
+
+    y0 = np.tile([2, 0], reps=N)
+
+    # no (0, 0) entries, so CVODE adds the diagonal to the SUNMatrix in place
+    sparsity = np.zeros((2*N, 2*N))
+    for i in range(N):
+        sparsity[2*i:2*(i+1), 2*i:2*(i+1)] = np.array([[0, 1], [1, 1]])
+
+    k = 2*np.arange(N)[:, None]
+    rows = np.hstack([k, k + 1, k + 1]).ravel()
+    cols = np.hstack([k + 1, k, k + 1]).ravel()
+
+    slots = sparse_slots(sparsity, rows, cols)
+
+    def blocks(y):
+        y0, y1 = y[0::2], y[1::2]
+        return np.column_stack([
+            np.ones_like(y0), -2000*y0*y1 - 1, 1000*(1 - y0**2),
+        ]).ravel()
+
+    def jacfn_full(t, y, yp, JJ):
+        JJ[rows, cols] = blocks(y)
+
+    def jacfn_compact(t, y, yp, JJ):
+        assert JJ.shape == (sparsity.sum(),)
+        JJ[slots] = blocks(y)
+
+    options = {'atol': 1e-8, 'linsolver': 'sparse', 'sparsity': sparsity}
+
+    solver = cvode.CVODE(rhsfn_narrow, jacfn=jacfn_full, **options)
+    soln_full = solver.solve(tspan, y0)
+
+    solver = cvode.CVODE(rhsfn_narrow, jacfn=jacfn_compact,
+                         jac_storage='compact', **options)
+
+    soln = solver.solve(tspan, y0)
+    assert soln.success
+    assert soln.njev > 0
+    np.testing.assert_allclose(soln.y, soln_full.y)
+
+    # 'compact' requires the 'sparse' solver
+    with pytest.raises(ValueError):
+        _ = cvode.CVODE(rhsfn_narrow, jacfn=jacfn_compact,
+                        jac_storage='compact')
+
+    # ignored without 'jacfn'
+    with pytest.warns(UserWarning):
+        _ = cvode.CVODE(rhsfn_narrow, jac_storage='compact', **options)
@@ -0,0 +1,228 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sksundae.ida import IDA
+from sksundae.cvode import CVODE
+from sksundae.ensemble import solve_many, solve_stacked
+
+
+def rhsfn(t, y, yp, k):
+    yp[:] = -k*y
+
+
+def resfn(t, y, yp, res):
+    res[:] = yp + y
+
+
+def resfn_fails(t, y, yp, res, k):
+    if k < 0:
+        raise ValueError("Negative rate.")
+
+    res[:] = yp + k*y
+
+
+def cvode_factory(k):
+    return CVODE(rhsfn, userdata=k, rtol=1e-9, atol=1e-12)
+
+
+def ida_factory():
+    return IDA(resfn, rtol=1e-9, atol=1e-12)
+
+
+def ida_factory_fails(k):
+    return IDA(resfn_fails, userdata=k, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_solve_many_userdatas(workers):
+    tspan = np.linspace(0, 1, 6)
+    y0s = np.array([[1., 2.]])
+    ks = [0.5, 1., 2.]
+
+    soln = solve_many(cvode_factory, tspan, y0s, userdatas=ks,
+                      workers=workers)
+
+    assert soln.success.all()
+    assert soln.y.shape == (3, 6, 2) and soln.yp is None
+    for i, k in enumerate(ks):
+        npt.assert_allclose(soln.t[i], tspan)
+        expected = y0s*np.exp(-k*tspan[:, None])
+        npt.assert_allclose(soln.y[i], expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_solve_many_warm_solver(workers):
+    tspan = [0, 1]  # only endpoints are saved
+    y0s = np.random.rand(5, 3)
+    yp0s = -y0s
+
+    soln = solve_many(ida_factory, tspan, y0s, yp0s, workers=workers,
+                      chunksize=2)
+
+    assert soln.success.all()
+    assert soln.t.shape == (5, 2)
+    npt.assert_allclose(soln.t, [[0, 1]]*5)
+    npt.assert_allclose(soln.y[:, -1], y0s*np.exp(-1), rtol=1e-6)
+    assert all(soln.nfev > 0)
+
+    single = ida_factory().solve(tspan, y0s[0], yp0s[0])
+    assert soln.y.dtype == soln.yp.dtype == single.y.dtype  # solver precision
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_solve_many_failures(workers):
+    tspan = np.linspace(0, 1, 3)
+    y0s = np.ones(2)
+    yp0s = -np.ones(2)
+
+    soln = solve_many(ida_factory_fails, tspan, y0s, yp0s,
+                      userdatas=[1., -1.], workers=workers)
+
+    npt.assert_equal(soln.success, [True, False])
+    assert soln.status[1] == -99
+    assert 'Negative rate' in soln.messages[1]
+    assert np.isnan(soln.y[1]).all()
+    assert not np.isnan(soln.y[0]).any()
+
+    # IDA requires yp0s
+    soln = solve_many(ida_factory, tspan, y0s, workers=1)
+    assert not soln.success.any()
+
+
+def rhsfn_sine(t, y, yp):
+    yp[0] = 2*np.pi*np.cos(2*np.pi*t)
+
+
+def eventsfn_sine(t, y, events):
+    events[0] = y[0]
+
+
+eventsfn_sine.terminal = [3]
+
+
+def cvode_events_factory():
+    return CVODE(rhsfn_sine, eventsfn=eventsfn_sine, num_events=1, rtol=1e-9,
+                 atol=1e-12)
+
+
+def cvode_save_factory(save_idx):
+    return CVODE(rhsfn, userdata=1., save_idx=save_idx)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_solve_many_events(workers):  # warm solvers must not share events
+    tspan = np.linspace(0, 3, 301)
+    y0s = 0.1*np.ones((3, 1))
+
+    soln = solve_many(cvode_events_factory, tspan, y0s, workers=workers,
+                      chunksize=3)
+
+    # the third root of 0.1 + sin(2*pi*t) stops each member
+    t_stop = 1.5 + np.arcsin(0.1) / (2*np.pi)
+
+    npt.assert_equal(soln.status, [2, 2, 2])
+    npt.assert_allclose(np.nanmax(soln.t, axis=1), [t_stop]*3, rtol=1e-6)
+
+
+def test_solve_many_output_failures():
+    tspan = np.linspace(0, 1, 3)
+
+    # saving 3 columns for a 2-state member cannot be copied into 'y'
+    soln = solve_many(cvode_save_factory, tspan, np.ones(2),
+                      userdatas=[[0, 1], [0, 1, 0]], workers=1)
+
+    npt.assert_equal(soln.success, [True, False])
+    assert soln.status[1] == -99
+    assert 'ValueError' in soln.messages[1]
+
+
+def test_solve_many_bad_inputs():
+    y0s = np.ones((3, 2))
+
+    with pytest.raises(ValueError):
+        _ = solve_many(ida_factory, [0], y0s, y0s)
+
+    with pytest.raises(ValueError):
+        _ = solve_many(ida_factory, [0, 1], y0s, y0s[:2])
+
+    with pytest.raises(TypeError):
+        _ = solve_many(ida_factory, [0, 1], y0s, y0s, workers=1.)
+
+    with pytest.raises(ValueError):
+        _ = solve_many(ida_factory, [0, 1], y0s, y0s, workers=0)
+
+    with pytest.raises(ValueError):
+        _ = solve_many(ida_factory, [0, 1], y0s, y0s, chunksize=0)
+
+
+def rhsfn_stacked(t, y, yp, k):
+    yp[:, 0] = -k*y[:, 0]
+    yp[:, 1] = y[:, 0] - y[:, 1]
+
+
+def resfn_stacked(t, y, yp, res, k):
+    res[:, 0] = yp[:, 0] + k*y[:, 0]
+    res[:, 1] = y[:, 0] + y[:, 1] - 1.  # algebraic
+
+
+def eventsfn_stacked(t, y, yp, events, k):
+    events[:, 0] = y[:, 0] - 0.5
+
+
+def test_solve_stacked_cvode():
+    ks = np.array([0.5, 1., 2., 4.])
+    y0s = np.tile([1., 0.], (4, 1))
+    tspan = np.linspace(0, 2, 11)
+
+    soln = solve_stacked(CVODE, rhsfn_stacked, tspan, y0s, userdata=ks,
+                         sparsity=[[1, 0], [1, 1]], rtol=1e-9, atol=1e-12)
+
+    assert soln.success.all() and soln.yp is None
+    assert soln.y.shape == (4, 11, 2)
+
+    for i, k in enumerate(ks):
+        single = CVODE(rhsfn, userdata=k, rtol=1e-9, atol=1e-12)
+        expected = single.solve(tspan, [1., 1.]).y[:, 0]
+
+        npt.assert_allclose(soln.t[i], tspan)
+        npt.assert_allclose(soln.y[i, :, 0], expected, rtol=1e-6)
+
+
+def test_solve_stacked_ida_events():
+    ks = np.array([0.1, 1., 2.])
+    y0s = np.tile([1., 0.], (3, 1))
+    yp0s = np.column_stack([-ks, ks])
+    tspan = np.linspace(0, 1, 6)
+
+    eventsfn_stacked.terminal = [True]
+    eventsfn_stacked.direction = [-1]
+
+    soln = solve_stacked(IDA, resfn_stacked, tspan, y0s, yp0s, userdata=ks,
+                         algebraic_idx=[1], eventsfn=eventsfn_stacked,
+                         num_events=1, rtol=1e-9, atol=1e-12)
+
+    assert soln.success.all()
+    npt.assert_equal(soln.status[1:], 2)  # stopped at terminal events
+    assert soln.t_events[0] is None
+
+    for i, k in enumerate(ks):
+        if soln.t_events[i] is None:
+            npt.assert_allclose(soln.t[i], tspan)
+            npt.assert_allclose(soln.y[i, :, 0], np.exp(-k*tspan), rtol=1e-6)
+            continue
+
+        t_ev = np.log(2.)/k
+        npt.assert_allclose(soln.t_events[i], [t_ev], rtol=1e-6)
+        npt.assert_allclose(soln.y_events[i][0], [0.5, 0.5], rtol=1e-6)
+
+        # the event is the last saved row, like a terminal event in 'solve'
+        last = np.flatnonzero(~np.isnan(soln.t[i]))[-1]
+        npt.assert_allclose(soln.t[i, last], t_ev, rtol=1e-6)
+        assert np.isnan(soln.y[i, last + 1:]).all()
+
+    with pytest.raises(TypeError):
+        _ = solve_stacked(ida_factory, resfn_stacked, tspan, y0s)
+
+    with pytest.raises(ValueError):
+        _ = solve_stacked(IDA, resfn_stacked, tspan, y0s, yp0s[:2])
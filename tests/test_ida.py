@@ -1,10 +1,14 @@
 import pickle
+import ctypes
 
 import pytest
 import numpy as np
 import numpy.testing as npt
 
+from scipy import LowLevelCallable
+
 from sksundae.ida import IDA, IDAResult
+from sksundae.jacband import JacobianStructure
 
 
 def ode(t, y, yp, res):
@@ -196,6 +200,216 @@ def test_ida_sparsity(linsolver):  # using idaLSSparseDQJac for dense/band
     npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
 
 
+@pytest.mark.parametrize('linsolver', ['dense', 'band'])
+def test_ida_sparsity_groups(linsolver):  # several columns per DQ group
+    from scipy.linalg import expm
+
+    N = 12
+    A = np.diag(-2*np.ones(N)) + np.diag(np.ones(N-1), 1) \
+        + np.diag(np.ones(N-1), -1)
+
+    def resfn(t, y, yp, res):
+        res[:] = yp - A.dot(y)
+
+    options = {}
+    if linsolver == 'band':
+        options.update({'lband': 1, 'uband': 1})
+
+    solver = IDA(resfn, rtol=1e-9, atol=1e-12, linsolver=linsolver,
+                 sparsity=(A != 0), **options)
+
+    y0 = np.linspace(0, 1, N)
+    soln = solver.solve([0, 1], y0, A.dot(y0))
+
+    assert soln.njev > 0
+    npt.assert_allclose(soln.y[-1], expm(A).dot(y0), rtol=1e-6)
+
+    # a precomputed structure reuses the pattern and its column coloring
+    structure = JacobianStructure(A != 0)
+    assert structure.bands == (1, 1) and structure.ngroups < N
+
+    solver = IDA(resfn, rtol=1e-9, atol=1e-12, linsolver=linsolver,
+                sparsity=structure, **options)
+
+    soln_structure = solver.solve([0, 1], y0, A.dot(y0))
+
+    assert soln_structure.nfev == soln.nfev
+    npt.assert_allclose(soln_structure.y, soln.y)
+
+
+def test_ida_auto():
+    from scipy.linalg import expm
+
+    def resfn(t, y, yp, res):
+        res[:] = yp - np.convolve(y, [1., -2., 1.], mode='same')
+
+    def soln_exact(y0):
+        N = y0.size
+        A = np.diag(-2*np.ones(N)) + np.diag(np.ones(N-1), 1) \
+            + np.diag(np.ones(N-1), -1)
+
+        return expm(A).dot(y0), A.dot(y0)
+
+    y0 = np.linspace(0, 1, 120)
+    y1, yp0 = soln_exact(y0)
+
+    assert IDA(resfn).solve([0, 1], y0, yp0).auto is None
+
+    # the banded pattern is detected at the initial values
+    solver = IDA(resfn, rtol=1e-9, atol=1e-12, linsolver='auto')
+    soln = solver.solve([0, 1], y0, yp0)
+
+    assert soln.auto['linsolver'] in {'band', 'lapackband'}
+    assert (soln.auto['lband'], soln.auto['uband']) == (1, 1)
+    assert soln.auto['nnz'] == 3*y0.size - 2
+    assert not soln.auto['sparsity']
+    npt.assert_allclose(soln.y[-1], y1, rtol=1e-6)
+
+    # resolved again if the size changes, small systems are dense
+    y1_small, yp0_small = soln_exact(y0[:10])
+    soln = solver.solve([0, 1], y0[:10], yp0_small)
+
+    assert soln.auto['linsolver'] == 'dense'
+    npt.assert_allclose(soln.y[-1], y1_small, rtol=1e-6)
+
+    # 'sparsity' fills in the bandwidths and uses the DQ coloring
+    solver = IDA(resfn, rtol=1e-9, atol=1e-12, linsolver='band',
+                 sparsity='auto')
+
+    soln = solver.solve([0, 1], y0, yp0)
+
+    assert soln.auto['linsolver'] == 'band' and soln.auto['sparsity']
+    assert (soln.auto['lband'], soln.auto['uband']) == (1, 1)
+    npt.assert_allclose(soln.y[-1], y1, rtol=1e-6)
+
+    with pytest.raises(TypeError):
+        _ = IDA(resfn, sparsity='probing')
+
+    with pytest.raises(ValueError):  # iterative solvers cannot use 'sparsity'
+        _ = IDA(resfn, linsolver='gmres', sparsity='auto')
+
+    def jacfn(t, y, yp, res, cj, JJ):
+        pass
+
+    with pytest.raises(ValueError, match='compact'):  # layout not yet known
+        _ = IDA(resfn, linsolver='auto', jacfn=jacfn, jac_storage='compact')
+
+
+def test_ida_compact_jacfn():
+    N = 12
+    A = np.diag(-2*np.ones(N)) + np.diag(np.ones(N-1), 1) \
+        + np.diag(np.ones(N-1), -1)
+
+    def resfn(t, y, yp, res):
+        res[:] = yp - A.dot(y)
+
+    def jacfn_full(t, y, yp, res, cj, JJ):
+        assert JJ.flags.c_contiguous  # persistent row-major array
+        JJ[:, :] = cj*np.eye(N) - A
+
+    def jacfn_dense(t, y, yp, res, cj, JJ):
+        assert JJ.flags.f_contiguous  # view of the SUNDenseMatrix data
+        JJ[:, :] = cj*np.eye(N) - A
+
+    def jacfn_compact(t, y, yp, res, cj, JJ):
+        assert JJ.shape == (4, N)  # 'solve_banded' layout, JJ[u + i - j, j]
+        JJ[0, :] = 0.
+        JJ[1, 1:] = -1.
+        JJ[2, :] = cj + 2.
+        JJ[3, :-1] = -1.
+
+    y0 = np.linspace(0, 1, N)
+    yp0 = A.dot(y0)
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'linsolver': 'band', 'lband': 1,
+               'uband': 2}
+
+    soln_full = IDA(resfn, jacfn=jacfn_full, rtol=1e-9, atol=1e-12)
+    soln_full = soln_full.solve([0, 1], y0, yp0)
+
+    solver = IDA(resfn, jacfn=jacfn_dense, jac_storage='compact',
+                 rtol=1e-9, atol=1e-12)
+
+    soln = solver.solve([0, 1], y0, yp0)
+    npt.assert_allclose(soln.y, soln_full.y)
+
+    # 'full' arrays keep their values between calls, compact ones are zeroed
+    for jac_storage, kept in [('full', True), ('compact', False)]:
+        received = []
+
+        def jacfn(t, y, yp, res, cj, JJ):
+            received.append(JJ.any())
+            JJ[:, :] = cj*np.eye(N) - A
+
+        solver = IDA(resfn, jacfn=jacfn, jac_storage=jac_storage,
+                     rtol=1e-9, atol=1e-12)
+
+        _ = solver.solve([0, 1], y0, yp0)
+
+        assert len(received) > 1
+        assert received[1:] == [kept]*(len(received) - 1)
+
+    solver = IDA(resfn, jacfn=jacfn_compact, jac_storage='compact', **options)
+    soln = solver.solve([0, 1], y0, yp0)
+
+    assert soln.njev > 0
+    npt.assert_allclose(soln.y, soln_full.y)
+
+    # compiled functions fill a column-major buffer, with ldim = l + u + 1
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    resfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, vptr)
+    jacfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, dbl, ptr,
+                               vptr)
+
+    @resfn_t
+    def c_resfn(t, y, yp, res, data):
+        for i in range(N):
+            res[i] = yp[i] + 2*y[i]
+            res[i] -= y[i-1] if i > 0 else 0.
+            res[i] -= y[i+1] if i < N - 1 else 0.
+        return 0
+
+    @jacfn_t
+    def c_jacfn(t, y, yp, res, cj, JJ, data):
+        for j in range(N):
+            JJ[0 + 4*j] = 0.
+            JJ[1 + 4*j] = -1. if j > 0 else 0.
+            JJ[2 + 4*j] = cj + 2.
+            JJ[3 + 4*j] = -1. if j < N - 1 else 0.
+        return 0
+
+    solver = IDA(LowLevelCallable(c_resfn), jacfn=LowLevelCallable(c_jacfn),
+                 jac_storage='compact', **options)
+
+    soln = solver.solve([0, 1], y0, yp0)
+    npt.assert_allclose(soln.y, soln_full.y, rtol=1e-5)
+
+    # compiled functions fill dense matrices in column-major order
+    @jacfn_t
+    def c_jacfn_dense(t, y, yp, res, cj, JJ, data):
+        for j in range(N):
+            JJ[j + N*j] = cj + 2.
+            if j > 0:
+                JJ[(j - 1) + N*j] = -1.
+            if j < N - 1:
+                JJ[(j + 1) + N*j] = -1.
+        return 0
+
+    solver = IDA(LowLevelCallable(c_resfn), jac_storage='compact',
+                 jacfn=LowLevelCallable(c_jacfn_dense), rtol=1e-9, atol=1e-12)
+
+    soln = solver.solve([0, 1], y0, yp0)
+    npt.assert_allclose(soln.y, soln_full.y, rtol=1e-5)
+
+    # 'compact' requires a direct linear solver
+    with pytest.raises(ValueError):
+        _ = IDA(resfn, jac_storage='compact', linsolver='gmres')
+
+    with pytest.raises(ValueError):
+        _ = IDA(resfn, jac_storage='banded')
+
+
 def test_ida_constraints():
     y0 = np.array([1, 2])
     yp0 = np.array([0.1, 0.2])
@@ -322,6 +536,215 @@ def test_ida_jacfn():
     npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
 
 
+def test_ida_zero_copy():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    with pytest.raises(TypeError):  # zero_copy must be a bool
+        _ = IDA(dae, zero_copy=1)
+
+    def eventsfn(t, y, yp, events):
+        events[0] = y[0] - 1.55
+
+    eventsfn.terminal = [False]
+
+    def jacfn(t, y, yp, res, cj, JJ):
+        JJ[0, 0] = cj
+        JJ[1, 0] = 2
+        JJ[1, 1] = -1
+
+    options = {
+        'rtol': 1e-9, 'atol': 1e-12, 'algebraic_idx': [1], 'jacfn': jacfn,
+        'eventsfn': eventsfn, 'num_events': 1,
+    }
+
+    tspan = np.linspace(0, 10, 11)
+    soln_copy = IDA(dae, **options).solve(tspan, y0, yp0)
+    soln_view = IDA(dae, zero_copy=True, **options).solve(tspan, y0, yp0)
+
+    npt.assert_allclose(soln_view.y, dae_soln(soln_view.t, y0))
+    npt.assert_allclose(soln_view.y, soln_copy.y)
+    npt.assert_allclose(soln_view.y_events, soln_copy.y_events)
+    assert soln_view.nfev == soln_copy.nfev
+
+    # arrays passed to callbacks are views over SUNDIALS memory
+    def dae_w_check(t, y, yp, res):
+        assert not y.flags.owndata
+        assert not res.flags.owndata
+        dae(t, y, yp, res)
+
+    solver = IDA(dae_w_check, zero_copy=True, **options)
+    soln = solver.solve(tspan, y0, yp0)
+    assert soln.success
+
+
+def test_ida_native_callbacks():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    resfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, vptr)
+    jacfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, dbl, ptr,
+                               vptr)
+
+    @resfn_t
+    def c_dae(t, y, yp, res, data):
+        res[0] = yp[0] - 0.1
+        res[1] = 2*y[0] - y[1]
+        return 0
+
+    @resfn_t
+    def c_eventsfn(t, y, yp, events, data):
+        events[0] = y[0] - 1.55
+        return 0
+
+    @jacfn_t
+    def c_jacfn(t, y, yp, res, cj, JJ, data):
+        JJ[0] = cj  # row-major, JJ[i*N + j]
+        JJ[2] = 2
+        JJ[3] = -1
+        return 0
+
+    def eventsfn(t, y, yp, events):
+        events[0] = y[0] - 1.55
+
+    eventsfn.terminal = [False]
+
+    def jacfn(t, y, yp, res, cj, JJ):
+        JJ[0, 0] = cj
+        JJ[1, 0] = 2
+        JJ[1, 1] = -1
+
+    class Events(LowLevelCallable):  # subclass to allow 'terminal'
+        pass
+
+    c_events = Events(c_eventsfn)
+    c_events.terminal = [False]
+
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'algebraic_idx': [1]}
+
+    tspan = np.linspace(0, 10, 11)
+    solver = IDA(dae, jacfn=jacfn, eventsfn=eventsfn, num_events=1, **options)
+    soln_py = solver.solve(tspan, y0, yp0)
+
+    solver = IDA(LowLevelCallable(c_dae), jacfn=LowLevelCallable(c_jacfn),
+                 eventsfn=c_events, num_events=1, **options)
+
+    soln_c = solver.solve(tspan, y0, yp0)
+    npt.assert_allclose(soln_c.y, dae_soln(soln_c.t, y0))
+    npt.assert_allclose(soln_c.y, soln_py.y)
+    npt.assert_allclose(soln_c.y_events, soln_py.y_events)
+    assert soln_c.nfev == soln_py.nfev
+
+    # mixing Python/native, and DQ Jacobian from 'sparsity' w/ native resfn
+    solver = IDA(LowLevelCallable(c_dae), eventsfn=eventsfn, num_events=1,
+                 sparsity=np.ones((2, 2)), **options)
+
+    soln = solver.solve(tspan, y0, yp0)
+    npt.assert_allclose(soln.y, soln_py.y)
+
+    # events are terminal by default, w/o needing a subclass
+    solver = IDA(LowLevelCallable(c_dae), num_events=1,
+                 eventsfn=LowLevelCallable(c_eventsfn), **options)
+
+    soln = solver.solve(tspan, y0, yp0)
+    assert soln.status == 2
+    npt.assert_allclose(soln.t[-1], 5.5)
+
+    # 'user_data' pointer is passed through
+    @resfn_t
+    def c_dae_w_data(t, y, yp, res, data):
+        rate = ctypes.cast(data, ptr)[0]
+        res[0] = yp[0] - rate
+        res[1] = 2*y[0] - y[1]
+        return 0
+
+    rate = ctypes.c_double(0.1)
+    user_data = ctypes.cast(ctypes.pointer(rate), vptr)
+
+    solver = IDA(LowLevelCallable(c_dae_w_data, user_data), **options)
+
+    soln = solver.solve(tspan, y0, yp0)
+    npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
+
+    # negative return values halt the solver
+    @resfn_t
+    def c_bad_dae(t, y, yp, res, data):
+        return -1
+
+    soln = IDA(LowLevelCallable(c_bad_dae)).solve(tspan, y0, yp0)
+    assert not soln.success
+
+    # signatures are checked
+    with pytest.raises(ValueError):
+        _ = IDA(LowLevelCallable(c_jacfn))
+
+    with pytest.raises(ValueError):
+        _ = IDA(dae, jacfn=LowLevelCallable(c_dae))
+
+
+def test_ida_native_threads():  # ctypes callbacks retake the GIL
+    from concurrent.futures import ThreadPoolExecutor
+
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    resfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, vptr)
+    jacfn_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, dbl, ptr,
+                               vptr)
+
+    @resfn_t
+    def c_dae(t, y, yp, res, data):
+        res[0] = yp[0] - 0.1
+        res[1] = 2*y[0] - y[1]
+        return 0
+
+    @jacfn_t
+    def c_jacfn(t, y, yp, res, cj, JJ, data):
+        JJ[0] = cj
+        JJ[2] = 2
+        JJ[3] = -1
+        return 0
+
+    tspan = np.linspace(0, 10, 11)
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'algebraic_idx': [1]}
+
+    # all native callbacks use the LowLevelCallable path, dense and band JJ
+    for linsolver in [{'linsolver': 'dense'},
+                      {'linsolver': 'band', 'lband': 1, 'uband': 0}]:
+        solver = IDA(LowLevelCallable(c_dae), jacfn=LowLevelCallable(c_jacfn),
+                     **linsolver, **options)
+
+        soln = solver.solve(tspan, y0, yp0)
+        npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
+        assert soln.njev > 0
+
+    # separate instances can run concurrently in threads
+    def run(_):
+        solver = IDA(LowLevelCallable(c_dae), jacfn=LowLevelCallable(c_jacfn),
+                     **options)
+
+        return solver.solve(tspan, y0, yp0)
+
+    with ThreadPoolExecutor(4) as pool:
+        solns = list(pool.map(run, range(8)))
+
+    for soln in solns:
+        npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
+
+    # step method also works with only native callbacks
+    solver = IDA(LowLevelCallable(c_dae), **options)
+    solver.init_step(0., y0, yp0)
+
+    soln = solver.step(10.)
+    npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
+
+
 def test_failures_on_exceptions():
 
     # exception in resfn
@@ -419,3 +842,367 @@ def test_pickling(tmp_path):
 
     npt.assert_allclose(loaded_soln.t, soln.t)
     npt.assert_allclose(loaded_soln.y, soln.y)
+
+
+def test_ida_dense_output():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 2])
+
+    solver = IDA(ode, rtol=1e-9, atol=1e-12, dense_output=True)
+
+    soln = solver.solve([0, 10], y0, yp0)
+
+    tq = np.linspace(0, 10, 1001)
+    npt.assert_allclose(soln.sol(tq), ode_soln(tq, y0), rtol=1e-5)
+    npt.assert_allclose(soln.sol(soln.t), soln.y)
+
+    soln = solver.solve(np.linspace(0, 1, 21), y0, yp0)
+    npt.assert_allclose(soln.sol(tq[:101]), ode_soln(tq[:101], y0), rtol=1e-5)
+
+    soln = IDA(ode).solve([0, 10], y0, yp0)
+    assert soln.sol is None
+
+    with pytest.raises(TypeError):
+        _ = IDA(ode, dense_output=1)
+
+
+def test_ida_interpolate():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 2])
+
+    solver = IDA(ode, rtol=1e-9, atol=1e-12)
+
+    with pytest.raises(ValueError):  # have to call init_step first
+        _ = solver.interpolate(0.)
+
+    t_prev = solver.init_step(0, y0, yp0).t
+    for _ in range(10):
+        t_next = solver.step(10, method='onestep').t
+
+        tq = np.linspace(t_prev, t_next, 5)
+        npt.assert_allclose(solver.interpolate(tq), ode_soln(tq, y0),
+                            rtol=1e-6)
+
+        yp = solver.interpolate(t_next, k=1)
+        npt.assert_allclose(yp, [0.1, y0[1]*np.exp(t_next)], rtol=1e-4)
+
+        t_prev = t_next
+
+    with pytest.raises(ValueError):  # outside of the last step
+        _ = solver.interpolate(t_prev - 1.)
+
+    with pytest.raises(ValueError):  # 'k' larger than the method order
+        _ = solver.interpolate(t_next, k=6)
+
+
+@pytest.mark.parametrize('tspan', [[0, 10], np.linspace(0, 10, 11)])
+def test_ida_iter_steps(tspan):
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    def eventsfn(t, y, yp, events):
+        events[0] = y[0] - 1.55
+
+    eventsfn.terminal = [False]
+
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'algebraic_idx': [1],
+               'eventsfn': eventsfn, 'num_events': 1}
+
+    soln = IDA(dae, **options).solve(tspan, y0, yp0)
+
+    solver = IDA(dae, **options)  # events accumulate per solver instance
+    steps = solver.iter_steps(tspan, y0, yp0)
+    records = [(t, y.copy(), yp.copy()) for t, y, yp in steps]
+
+    npt.assert_allclose([r[0] for r in records], soln.t)
+    npt.assert_allclose([r[1] for r in records], soln.y)
+    npt.assert_allclose([r[2] for r in records], soln.yp)
+
+    assert steps.result.status == soln.status
+    assert steps.result.t == soln.t[-1]
+    npt.assert_allclose(steps.result.y, soln.y[-1])
+    npt.assert_allclose(steps.result.t_events, soln.t_events)
+    assert steps.result.nfev == soln.nfev
+
+    solver = IDA(dae, **options)
+    steps = solver.iter_steps(tspan, y0, yp0, chunksize=4)
+    chunks = [(t.copy(), y.copy(), yp.copy()) for t, y, yp in steps]
+
+    assert all(c[0].size <= 4 for c in chunks)
+    npt.assert_allclose(np.concatenate([c[0] for c in chunks]), soln.t)
+    npt.assert_allclose(np.concatenate([c[1] for c in chunks]), soln.y)
+    npt.assert_allclose(np.concatenate([c[2] for c in chunks]), soln.yp)
+    assert steps.result.success
+
+    with pytest.raises(TypeError):
+        _ = solver.iter_steps(tspan, y0, yp0, chunksize=2.)
+
+    with pytest.raises(ValueError):
+        _ = solver.iter_steps(tspan, y0, yp0, chunksize=0)
+
+    with pytest.raises(ValueError):
+        _ = solver.iter_steps([0], y0, yp0)  # raised at call time
+
+    with pytest.raises(ValueError):
+        _ = solver.iter_steps(tspan, y0, yp0[:1])
+
+    # closing a stream early restores the solver for other calls
+    solver = IDA(dae, rtol=1e-9, atol=1e-12, algebraic_idx=[1])
+    steps = solver.iter_steps([0, 10], y0, yp0)
+    _ = next(steps)
+    steps.close()
+
+    with pytest.raises(ValueError):  # stream's init_step no longer active
+        _ = solver.step(5.)
+
+    _ = solver.init_step(0., y0, yp0)
+    assert solver.step(15., tstop=None).t == 15.  # stream's tstop cleared
+
+
+@pytest.mark.parametrize('tspan', [[0, 10], np.linspace(0, 10, 11)])
+def test_ida_save_options(tspan):
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    def eventsfn(t, y, yp, events):
+        events[0] = y[0] - 1.55
+
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'algebraic_idx': [1],
+               'eventsfn': eventsfn, 'num_events': 1}
+
+    full = IDA(dae, **options).solve(tspan, y0, yp0)
+
+    solver = IDA(dae, save_idx=[1], save_yp=False, save_order='F',
+                 **options)
+
+    soln = solver.solve(tspan, y0, yp0)
+    assert soln.yp is None and soln.yp_events is None
+    assert soln.y.shape == (full.t.size, 1)
+    assert soln.y.flags.f_contiguous
+
+    npt.assert_allclose(soln.t, full.t)
+    npt.assert_allclose(soln.y, full.y[:, [1]])
+    npt.assert_allclose(soln.y_events, full.y_events[:, [1]])
+
+    soln = IDA(dae, save_order='F', **options).solve(tspan, y0, yp0)
+    assert soln.y[:, 0].flags.c_contiguous  # per-variable contiguous
+    npt.assert_allclose(soln.y, full.y)
+    npt.assert_allclose(soln.yp, full.yp)
+
+    # selections also apply to iter_steps records and summaries
+    solver = IDA(dae, save_idx=[1], save_yp=False, **options)
+    steps = solver.iter_steps(tspan, y0, yp0, chunksize=3)
+
+    y = np.concatenate([y.copy() for t, y in steps])
+    npt.assert_allclose(y, full.y[:, [1]])
+    npt.assert_allclose(steps.result.y, full.y[-1, [1]])
+    assert steps.result.yp is None
+
+    with pytest.raises(ValueError):  # out of range
+        _ = IDA(dae, save_idx=[2], **options).solve(tspan, y0, yp0)
+
+    with pytest.raises(TypeError):
+        _ = IDA(dae, save_idx=[0.])
+
+    with pytest.raises(TypeError):
+        _ = IDA(dae, save_yp=1)
+
+    with pytest.raises(ValueError):
+        _ = IDA(dae, save_yp=False, dense_output=True)
+
+    with pytest.raises(ValueError):
+        _ = IDA(dae, save_order='A')
+
+
+def test_ida_thinning():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    def eventsfn(t, y, yp, events):
+        events[0] = y[0] - 1.55
+
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'algebraic_idx': [1],
+               'eventsfn': eventsfn, 'num_events': 1}
+
+    full = IDA(dae, **options).solve([0, 10], y0, yp0)
+
+    soln = IDA(dae, thin_rtol=0.05, **options).solve([0, 10], y0, yp0)
+    assert 2 < soln.t.size < full.t.size
+    assert soln.t[-1] == full.t[-1]  # terminal event kept
+    npt.assert_allclose(soln.y, dae_soln(soln.t, y0), rtol=1e-6)
+
+    change = np.abs(np.diff(soln.y[:-1], axis=0)) / np.abs(soln.y[:-2])
+    assert np.all(change.max(axis=1) > 0.05)
+
+    soln = IDA(dae, thin_dt=1., **options).solve([0, 10], y0, yp0)
+    assert np.all(np.diff(soln.t[:-1]) >= 1.)
+    assert soln.t[-1] == full.t[-1]
+
+    # thinning only applies to onestep solves
+    tspan = np.linspace(0, 1, 11)
+    soln = IDA(dae, thin_dt=1., **options).solve(tspan, y0, yp0)
+    npt.assert_allclose(soln.t, tspan)
+
+    with pytest.raises(TypeError):
+        _ = IDA(dae, thin_rtol='0.1')
+
+    with pytest.raises(ValueError):
+        _ = IDA(dae, thin_dt=-1.)
+
+    with pytest.raises(ValueError):  # 'sol' would skip the dropped steps
+        _ = IDA(dae, thin_atol=1., dense_output=True)
+
+
+def test_ida_outputfn():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+    tspan = np.linspace(0, 10, 11)
+
+    def outputfn(t, y, yp, out, scale):
+        out[0] = scale*(y[0] + y[1])
+        out[1] = yp[0]
+
+    full = IDA(dae, algebraic_idx=[1]).solve(tspan, y0, yp0)
+
+    solver = IDA(lambda t, y, yp, res, _: dae(t, y, yp, res), userdata=2.,
+                 algebraic_idx=[1], outputfn=outputfn, num_outputs=2,
+                 save_y=False, save_yp=False)
+
+    soln = solver.solve(tspan, y0, yp0)
+    assert soln.y is None and soln.yp is None
+    npt.assert_allclose(soln.outputs[:, 0], 2.*full.y.sum(axis=1))
+    npt.assert_allclose(soln.outputs[:, 1], full.yp[:, 0])
+
+    steps = solver.iter_steps(tspan, y0, yp0)
+    assert steps.fields == ('t', 'outputs')
+
+    outputs = np.array([out.copy() for t, out in steps])
+    npt.assert_allclose(outputs, soln.outputs)
+    npt.assert_allclose(steps.result.outputs, soln.outputs[-1])
+
+    assert full.outputs is None
+    assert IDA(dae).iter_steps(tspan, y0, yp0).fields == ('t', 'y', 'yp')
+
+    with pytest.raises(ValueError):  # forgot num_outputs
+        _ = IDA(dae, outputfn=outputfn)
+
+    with pytest.raises(ValueError):  # wrong signature
+        _ = IDA(dae, outputfn=outputfn, num_outputs=2)
+
+    with pytest.warns(UserWarning):
+        _ = IDA(dae, num_outputs=2)
+
+    with pytest.raises(TypeError):
+        _ = IDA(dae, save_y=0)
+
+    with pytest.raises(ValueError):
+        _ = IDA(dae, save_y=False, dense_output=True)
+
+
+def test_ida_stats():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 2])
+
+    solver = IDA(ode, rtol=1e-9, atol=1e-12)
+
+    with pytest.raises(ValueError):  # have to call init_step first
+        _ = solver.get_stats()
+
+    soln = solver.init_step(0, y0, yp0)
+    assert soln.stats['nsteps'] == 0
+
+    nsteps = 0
+    for _ in range(10):
+        soln = solver.step(10, method='onestep')
+        stats = solver.get_stats()
+
+        assert stats['nsteps'] == nsteps + 1
+        assert stats['tcur'] == soln.t
+        assert stats['nfev'] == soln.nfev and stats['njev'] == soln.njev
+        assert 1 <= stats['qlast'] <= 5 and stats['hlast'] > 0.
+
+        nsteps = stats['nsteps']
+
+    soln = IDA(ode, linsolver='gmres').solve([0, 1], y0, yp0)
+    assert soln.stats['nliters'] > 0 and soln.stats['njvevals'] > 0
+    assert soln.stats['njev'] == 0
+    assert solver.get_stats()['nliters'] == 0
+
+
+def test_ida_profile():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 2])
+    tspan = np.linspace(0, 1, 11)
+
+    def jacfn(t, y, yp, res, cj, JJ):
+        JJ[0, 0] = cj
+        JJ[1, 1] = cj - 1.
+
+    def outputfn(t, y, yp, out):
+        out[0] = y.sum()
+
+    soln = IDA(ode, jacfn=jacfn).solve(tspan, y0, yp0)
+    assert soln.profile is None
+
+    solver = IDA(ode, jacfn=jacfn, outputfn=outputfn, num_outputs=1,
+                 profile=True)
+
+    soln = solver.solve(tspan, y0, yp0)
+    profile = soln.profile
+
+    assert set(profile) == {'solve', 'resfn', 'jacfn', 'outputfn'}
+    assert profile['solve']['calls'] == tspan.size - 1
+    assert profile['outputfn']['calls'] == tspan.size
+    assert profile['jacfn']['calls'] == soln.njev
+
+    for region in profile.values():
+        assert 0. <= region['exclusive'] <= region['inclusive']
+
+    nested = profile['resfn']['inclusive'] + profile['jacfn']['inclusive']
+    npt.assert_allclose(profile['solve']['exclusive'],
+                        profile['solve']['inclusive'] - nested)
+
+    # cumulative for stepwise solutions, and reset by init_step
+    _ = solver.init_step(0, y0, yp0)
+    assert solver.step(1).profile['solve']['calls'] == 1
+    assert solver.step(2).profile['solve']['calls'] == 2
+
+    with pytest.raises(TypeError):
+        _ = IDA(ode, profile=1)
+
+
+def test_ida_trace():
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 2])
+
+    with pytest.raises(ValueError):  # tracing is disabled
+        _ = IDA(ode).get_trace()
+
+    solver = IDA(ode, trace=1000)
+    assert solver.get_trace().size == 0
+
+    soln = solver.solve([0, 1], y0, yp0)
+    trace = solver.get_trace()
+
+    # onestep solves record every internal step
+    npt.assert_equal(trace['nsteps'], np.arange(1, soln.stats['nsteps'] + 1))
+    npt.assert_allclose(trace['t'], soln.t[1:])
+    npt.assert_allclose(trace['h'], np.diff(soln.t))
+    assert np.all(np.diff(trace['wall']) >= 0.)
+    assert trace['njev'][-1] == soln.njev
+
+    # ring buffer only keeps the latest steps
+    solver = IDA(ode, trace=5)
+    soln = solver.solve([0, 1], y0, yp0)
+
+    trace = solver.get_trace()
+    npt.assert_allclose(trace['t'], soln.t[-5:])
+
+    with pytest.raises(ValueError):
+        _ = IDA(ode, trace=-1)
+
+    with pytest.raises(TypeError):  # not a capacity of 1
+        _ = IDA(ode, trace=True)
+
+    with pytest.raises(ValueError):  # requires onestep solves
+        _ = IDA(ode, trace=5).solve([0, 0.5, 1], y0, yp0)
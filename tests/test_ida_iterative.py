@@ -1,7 +1,11 @@
+import ctypes
+
 import pytest
 import numpy as np
 import numpy.testing as npt
 
+from scipy import LowLevelCallable
+
 from sksundae.ida import IDA, IDAPrecond, IDAJacTimes
 
 
@@ -141,6 +145,13 @@ def test_w_precond_solve(linsolver):
     soln = solver.solve(tspan, y0, yp0)
     assert soln.success
 
+    solver = IDA(resfn, algebraic_idx=[2], calc_initcond='yp0',
+                 atol=1e-12, linsolver=linsolver, precond=precond,
+                 userdata=userdata, zero_copy=True)
+
+    soln_view = solver.solve(tspan, y0, yp0)
+    npt.assert_allclose(soln_view.y, soln.y)
+
 
 def test_jactimes():
 
@@ -181,3 +192,58 @@ def test_w_jactimes_solve(linsolver):
 
     soln = solver.solve(tspan, y0, yp0)
     assert soln.success
+
+    solver = IDA(jvdae, algebraic_idx=[1], linsolver=linsolver,
+                 jactimes=jactimes, userdata=userdata, zero_copy=True)
+
+    soln_view = solver.solve(tspan, y0, yp0)
+    npt.assert_allclose(soln_view.y, soln.y)
+
+
+@pytest.mark.parametrize('linsolver', ('gmres', 'bicgstab', 'tfqmr'))
+def test_native_precond_and_jactimes(linsolver):
+    tspan = np.array([0, 10])
+    y0 = np.array([1, 2])
+    yp0 = np.array([0.1, 0.2])
+
+    dbl, vptr = ctypes.c_double, ctypes.c_void_p
+    ptr = ctypes.POINTER(ctypes.c_double)
+
+    setup_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, dbl, vptr)
+    psolve_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, ptr, ptr,
+                                dbl, dbl, vptr)
+    jvsolve_t = ctypes.CFUNCTYPE(ctypes.c_int, dbl, ptr, ptr, ptr, ptr, ptr,
+                                 dbl, vptr)
+
+    @setup_t
+    def c_setupfn(t, y, yp, res, cj, data):
+        return 0
+
+    @psolve_t
+    def c_psolvefn(t, y, yp, res, rvec, zvec, cj, delta, data):
+        zvec[0] = rvec[0] / cj
+        zvec[1] = 2*zvec[0] - rvec[1]
+        return 0
+
+    @jvsolve_t
+    def c_jvsolvefn(t, y, yp, res, v, Jv, cj, data):
+        Jv[0] = cj*v[0]
+        Jv[1] = 2*v[0] - v[1]
+        return 0
+
+    precond = IDAPrecond(LowLevelCallable(c_setupfn),
+                         LowLevelCallable(c_psolvefn))
+
+    jactimes = IDAJacTimes(LowLevelCallable(c_setupfn),
+                           LowLevelCallable(c_jvsolvefn))
+
+    solver = IDA(dae, algebraic_idx=[1], linsolver=linsolver, rtol=1e-9,
+                 atol=1e-12, precond=precond, jactimes=jactimes)
+
+    soln = solver.solve(tspan, y0, yp0)
+    npt.assert_allclose(soln.y, dae_soln(soln.t, y0))
+
+    # signatures are checked
+    precond = IDAPrecond(None, LowLevelCallable(c_jvsolvefn))
+    with pytest.raises(ValueError):
+        _ = IDA(dae, linsolver=linsolver, precond=precond)
@@ -86,3 +86,64 @@ def test_sparse_solver():
 
     soln = solver.solve(tspan, y0, yp0)
     assert soln.success
+
+
+@pytest.mark.skipif(not has_superlu, reason='SuperLU_MT not enabled')
+def test_sparse_compact_jacfn():
+    from sksundae.jacband import sparse_slots
+
+    tspan = 4*np.logspace(-6, 6, 50)
+
+    y0 = np.tile([1, 0, 0], reps=N)
+    yp0 = np.tile([-0.04, 0.04, 0], reps=N)
+    alg = np.arange(2, 3*N, 3, dtype=int).tolist()
+
+    sparsity = np.zeros((3*N, 3*N))
+    for i in range(N):
+        sparsity[3*i:3*(i+1), 3*i:3*(i+1)] = np.ones((3, 3))
+
+    # (row, col) of each 3x3 block entry, in the order filled below
+    k = 3*np.arange(N)[:, None]
+    rows = (k + np.repeat(np.arange(3), 3)).ravel()
+    cols = (k + np.tile(np.arange(3), 3)).ravel()
+
+    slots = sparse_slots(sparsity, rows, cols)
+
+    def blocks(y, cj):
+        y0, y1, y2 = y[0::3], y[1::3], y[2::3]
+        one = np.ones_like(y0)
+
+        return np.column_stack([
+            0.04 + cj*one, -1e4*y2, -1e4*y1,
+            -0.04*one, 1e4*y2 + 6e7*y1 + cj, 1e4*y1,
+            one, one, one,
+        ]).ravel()
+
+    def jacfn_full(t, y, yp, res, cj, JJ):
+        JJ[rows, cols] = blocks(y, cj)
+
+    def jacfn_compact(t, y, yp, res, cj, JJ):
+        assert JJ.shape == (sparsity.sum(),)
+        JJ[slots] = blocks(y, cj)
+
+    options = {'rtol': 1e-6, 'atol': 1e-10, 'algebraic_idx': alg,
+               'linsolver': 'sparse', 'sparsity': sparsity}
+
+    solver = ida.IDA(resfn_narrow, jacfn=jacfn_full, **options)
+    soln_full = solver.solve(tspan, y0, yp0)
+
+    solver = ida.IDA(resfn_narrow, jacfn=jacfn_compact, jac_storage='compact',
+                     **options)
+
+    soln = solver.solve(tspan, y0, yp0)
+    assert soln.success
+    assert soln.njev > 0
+    np.testing.assert_allclose(soln.y, soln_full.y)
+
+    # 'compact' requires the 'sparse' solver
+    with pytest.raises(ValueError):
+        _ = ida.IDA(resfn_narrow, jacfn=jacfn_compact, jac_storage='compact')
+
+    # ignored without 'jacfn'
+    with pytest.warns(UserWarning):
+        _ = ida.IDA(resfn_narrow, jac_storage='compact', **options)
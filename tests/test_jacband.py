@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 import sksundae as sun
 import scipy. sparse as sp
@@ -145,6 +147,201 @@ def test_ida_jpattern():
     npt.assert_allclose(correct, approx)
 
 
+def test_jpattern_probing():
+
+    # matches the column-by-column method
+    y0 = np.tile([2, 0], reps=N)
+    for rhsfn in [cvode_narrow, cvode_wide]:
+        columns = sun.jacband.j_pattern(rhsfn, 0., y0)
+        probing = sun.jacband.j_pattern(rhsfn, 0., y0, method='probing')
+        npt.assert_array_equal(columns, probing)
+
+    y0 = np.tile([1, 0, 0], reps=N)
+    yp0 = np.tile([-0.04, 0.04, 0], reps=N)
+    for resfn in [ida_narrow, ida_wide]:
+        columns = sun.jacband.j_pattern(resfn, 0., y0, yp0)
+        probing = sun.jacband.j_pattern(resfn, 0., y0, yp0, method='probing')
+        npt.assert_array_equal(columns, probing)
+
+    # random structure, size not a power of two, with counted evaluations
+    A = sp.random(300, 300, density=0.01, format='csr', random_state=42)
+    A = A + sp.eye(300)
+
+    calls = []
+
+    def linear(t, y, yp):
+        calls.append(t)
+        yp[:] = A @ y
+
+    y0 = np.random.default_rng(42).random(300)
+
+    columns = sun.jacband.j_pattern(linear, 0., y0)
+    probing = sun.jacband.j_pattern(linear, 0., y0, method='probing')
+    npt.assert_array_equal(columns, probing)
+    npt.assert_array_equal(probing, A.toarray() != 0)
+
+    # banded problems need far fewer evaluations than columns
+    def advection(t, y, yp):
+        calls.append(t)
+        yp[:] = np.convolve(y, [1., 0., -1.], mode='same')
+
+    calls.clear()
+    probing = sun.jacband.j_pattern(advection, 0., np.ones(1000),
+                                    method='probing')
+
+    assert len(calls) < 100
+    npt.assert_array_equal(sun.jacband.bandwidth(probing), (1, 1))
+    assert probing.sum() == 2*999  # zero diagonal, y[i+1] - y[i-1]
+
+    # single state and empty patterns
+    def scalar(t, y, yp):
+        yp[0] = y[0]**2
+
+    def constant(t, y, yp):
+        yp[:] = 1.
+
+    probing = sun.jacband.j_pattern(scalar, 0., [1.], method='probing')
+    npt.assert_array_equal(probing, [[1.]])
+
+    probing = sun.jacband.j_pattern(constant, 0., np.ones(5), method='probing')
+    npt.assert_array_equal(probing, np.zeros((5, 5)))
+
+    with pytest.raises(ValueError):
+        _ = sun.jacband.j_pattern(scalar, 0., [1.], method='fast')
+
+
+@pytest.mark.parametrize('method', ['columns', 'probing'])
+def test_jpattern_sparse(method):
+
+    y0 = np.tile([2, 0], reps=N)
+    dense = sun.jacband.j_pattern(cvode_wide, 0., y0, method=method)
+    pattern = sun.jacband.j_pattern(cvode_wide, 0., y0, method=method,
+                                    sparse=True)
+
+    assert isinstance(pattern, sp.csc_array)
+    assert pattern.nnz == dense.sum()
+    npt.assert_array_equal(pattern.toarray(), dense)
+
+    y0 = np.tile([1, 0, 0], reps=N)
+    yp0 = np.tile([-0.04, 0.04, 0], reps=N)
+    dense = sun.jacband.j_pattern(ida_narrow, 0., y0, yp0, method=method)
+    pattern = sun.jacband.j_pattern(ida_narrow, 0., y0, yp0, method=method,
+                                    sparse=True)
+
+    assert isinstance(pattern, sp.csc_array)
+    npt.assert_array_equal(pattern.toarray(), dense)
+    assert sun.jacband.bandwidth(pattern) == (2, 2)
+
+
+def test_jacobian_structure(tmp_path):
+    from scipy.optimize._numdiff import group_columns
+
+    y0 = np.tile([2, 0], reps=N)
+    pattern = sun.jacband.j_pattern(cvode_wide, 0., y0)
+
+    structure = sun.jacband.JacobianStructure(pattern)
+
+    assert isinstance(structure.pattern, sp.csc_array)
+    npt.assert_array_equal(structure.pattern.toarray(), pattern)
+    npt.assert_array_equal(structure.groups, group_columns(pattern))
+    assert structure.bands == (N, N)
+    assert (structure.lband, structure.uband) == (N, N)
+    assert structure.ngroups == structure.groups.max() + 1
+    npt.assert_array_equal(structure.perm[structure.inv_perm], np.arange(2*N))
+    assert 'N=20' in repr(structure)
+
+    # save/load round trip
+    structure.key = 'wide'
+    structure.save(tmp_path / 'wide.npz')
+    loaded = sun.jacband.JacobianStructure.load(tmp_path / 'wide.npz')
+
+    assert loaded.key == 'wide'
+    assert loaded.bands == structure.bands
+    npt.assert_array_equal(loaded.pattern.toarray(), pattern)
+    npt.assert_array_equal(loaded.groups, structure.groups)
+    npt.assert_array_equal(loaded.perm, structure.perm)
+
+    loaded = pickle.loads(pickle.dumps(loaded))
+    npt.assert_array_equal(loaded.groups, structure.groups)
+
+    # from_function detects the pattern, with probing by default
+    detected = sun.jacband.JacobianStructure.from_function(cvode_wide, 0., y0)
+    npt.assert_array_equal(detected.pattern.toarray(), pattern)
+    assert detected.key is None
+
+    # invalid inputs
+    with pytest.raises(ValueError):
+        _ = sun.jacband.JacobianStructure(np.ones((2, 3)))
+
+    with pytest.raises(ValueError):
+        _ = sun.jacband.JacobianStructure(np.ones((2, 2)), groups=[0])
+
+    with pytest.raises(ValueError):  # columns share rows, so can't be grouped
+        _ = sun.jacband.JacobianStructure(np.ones((2, 2)), groups=[0, 0])
+
+    np.savez(tmp_path / 'old.npz', version=0)
+    with pytest.raises(ValueError):
+        _ = sun.jacband.JacobianStructure.load(tmp_path / 'old.npz')
+
+
+def test_jacobian_structure_cache(tmp_path):
+    calls = []
+
+    def resfn(t, y, yp, res):
+        calls.append(t)
+        ida_narrow(t, y, yp, res)
+
+    y0 = np.tile([1, 0, 0], reps=N)
+    yp0 = np.tile([-0.04, 0.04, 0], reps=N)
+
+    cache = tmp_path / 'cache'
+    args = (resfn, 0., y0, yp0)
+
+    first = sun.jacband.JacobianStructure.cached('robertson', cache, *args)
+    assert len(calls) > 0
+    assert (cache / 'robertson.npz').exists()
+    assert len(list(cache.iterdir())) == 1  # no leftover temporary files
+
+    calls.clear()
+    second = sun.jacband.JacobianStructure.cached('robertson', cache, *args)
+
+    assert len(calls) == 0
+    assert second.key == 'robertson'
+    npt.assert_array_equal(second.pattern.toarray(),
+                           first.pattern.toarray())
+    npt.assert_array_equal(second.groups, first.groups)
+
+    # a new key is a cache miss
+    _ = sun.jacband.JacobianStructure.cached('robertson-v2', cache, *args)
+    assert len(calls) > 0
+
+    # stale versions and corrupt files are rebuilt and overwritten
+    for name in ['stale', 'corrupt']:
+        if name == 'stale':
+            np.savez(cache / 'robertson.npz', version=0)
+        else:
+            data = (cache / 'robertson-v2.npz').read_bytes()
+            (cache / 'robertson.npz').write_bytes(data[:len(data) // 2])
+
+        calls.clear()
+        rebuilt = sun.jacband.JacobianStructure.cached('robertson', cache,
+                                                       *args)
+
+        assert len(calls) > 0
+        npt.assert_array_equal(rebuilt.pattern.toarray(),
+                               first.pattern.toarray())
+
+        loaded = sun.jacband.JacobianStructure.load(cache / 'robertson.npz')
+        assert loaded.key == 'robertson'
+
+    with pytest.raises(TypeError):
+        _ = sun.jacband.JacobianStructure.cached(1, cache, *args)
+
+    for key in ['', '..', 'sub/model']:
+        with pytest.raises(ValueError):
+            _ = sun.jacband.JacobianStructure.cached(key, cache, *args)
+
+
 def test_bandwidth():
 
     # wide banded matrix
@@ -169,6 +366,18 @@ def test_bandwidth():
     assert bands[0] == 2
     assert bands[1] == 2
 
+    # sparse inputs match dense, and ignore explicitly stored zeros
+    for A in [diagonal, sparsity, np.triu(sparsity), np.tril(sparsity)]:
+        for fmt in [sp.csc_array, sp.csr_matrix, sp.coo_array]:
+            bands = sun.jacband.bandwidth(fmt(A))
+            assert bands == sun.jacband.bandwidth(A)
+            assert all(isinstance(b, int) for b in bands)
+
+    stored = sp.csc_array(([1., 0.], ([0, 5], [0, 0])), shape=(6, 6))
+    assert stored.nnz == 2
+    assert sun.jacband.bandwidth(stored) == (0, 0)
+    assert sun.jacband.bandwidth(sp.csc_array((4, 4))) == (0, 0)
+
 
 def test_reduce_bandwidth():
 
@@ -216,3 +425,95 @@ def test_reduce_bandwidth():
     assert narrow_band[0] <= wide_band[0]
     assert narrow_band[1] <= wide_band[1]
     npt.assert_allclose(Bsp[inv_perm][:, inv_perm].todense(), Asp.todense())
+
+    # sparse arrays, with explicitly stored zeros left untouched
+    Csp = sp.csc_array(Anp)
+    Csp.data[0] = 0.
+
+    perm, _ = sun.jacband.reduce_bandwidth(Csp)
+    assert Csp.nnz == np.count_nonzero(Anp)
+
+    wide_band = sun.jacband.bandwidth(Csp)
+    narrow_band = sun.jacband.bandwidth(Csp[perm][:, perm])
+    assert narrow_band[0] <= wide_band[0]
+    assert narrow_band[1] <= wide_band[1]
+
+
+def test_sparse_slots():
+    A = np.array([[1, 0, 1], [1, 1, 0], [0, 1, 1]])
+
+    # slots follow CSC order, for both dense and sparse (any format) inputs
+    rows, cols = np.nonzero(A)
+    for pattern in [A, sp.coo_matrix(A), sp.csr_matrix(A)]:
+        slots = sun.jacband.sparse_slots(pattern, rows, cols)
+
+        csc = sp.csc_matrix(A)
+        data = np.zeros(csc.nnz)
+        data[slots] = np.arange(1, rows.size + 1)
+
+        filled = sp.csc_matrix((data, csc.indices, csc.indptr)).toarray()
+        npt.assert_array_equal(filled[rows, cols], np.arange(1, rows.size + 1))
+
+    # broadcasting and scalars
+    npt.assert_array_equal(sun.jacband.sparse_slots(A, [0, 1], 0), [0, 1])
+    assert sun.jacband.sparse_slots(A, 2, 2) == 5
+
+    # entries outside of the pattern
+    for row, col in [(0, 1), (3, 0), (-1, 0)]:
+        with pytest.raises(ValueError):
+            _ = sun.jacband.sparse_slots(A, row, col)
+
+
+def test_select_linsolver():
+    select = sun.jacband.select_linsolver
+
+    N = 1000
+    tridiag = sp.diags([1., -2., 1.], [-1, 0, 1], shape=(N, N))
+
+    # small systems are dense, regardless of the pattern
+    choice = select(tridiag.tocsc()[:50, :50], lapack=False, superlu=False)
+    assert choice['linsolver'] == 'dense'
+    assert choice['lband'] is None and choice['uband'] is None
+
+    # narrow bands, with LAPACK variants when available
+    choice = select(tridiag, lapack=False, superlu=False)
+    assert choice['linsolver'] == 'band'
+    assert (choice['lband'], choice['uband']) == (1, 1)
+    assert choice['nnz'] == 3*N - 2
+    assert isinstance(choice['reason'], str)
+
+    choice = select(tridiag.toarray(), lapack=True, superlu=False)
+    assert choice['linsolver'] == 'lapackband'
+
+    # wide bands use SuperLU_MT if possible, otherwise band storage
+    nx = 40
+    lap, eye = sp.diags([1., -2., 1.], [-1, 0, 1], shape=(nx, nx)), \
+        sp.identity(nx)
+
+    laplacian_2d = sp.kron(eye, lap) + sp.kron(lap, eye)
+
+    choice = select(laplacian_2d, lapack=False, superlu=True)
+    assert choice['linsolver'] == 'sparse' and choice['lband'] is None
+
+    choice = select(laplacian_2d, lapack=False, superlu=False)
+    assert choice['linsolver'] == 'band'
+    assert (choice['lband'], choice['uband']) == (nx, nx)
+
+    # without narrow bands or SuperLU_MT, fall back to dense
+    bordered = tridiag.tolil()
+    bordered[-1, :] = 1.
+    bordered[:, -1] = 1.
+
+    choice = select(bordered, lapack=False, superlu=True)
+    assert choice['linsolver'] == 'sparse'
+
+    choice = select(bordered, lapack=False, superlu=False)
+    assert choice['linsolver'] == 'dense'
+
+    # nearly full patterns are dense
+    choice = select(np.ones((200, 200)), lapack=True, superlu=True)
+    assert choice['linsolver'] == 'lapackdense'
+    assert choice['density'] == 1.
+
+    with pytest.raises(ValueError):
+        _ = select(np.ones((3, 4)))
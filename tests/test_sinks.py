@@ -0,0 +1,116 @@
+import os
+
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sksundae.ida import IDA
+from sksundae.cvode import CVODE
+from sksundae.sinks import OutputSink, NpySink, HDF5Sink, _as_sink
+
+
+def rhsfn(t, y, yp):
+    yp[0] = 0.1
+    yp[1] = -y[1]
+
+
+def resfn(t, y, yp, res):
+    res[0] = yp[0] - 0.1
+    res[1] = yp[1] + y[1]
+
+
+def eventsfn(t, y, yp, events):
+    events[0] = y[0] - 0.55
+
+
+eventsfn.terminal = [False]
+
+
+@pytest.mark.parametrize('tspan', [[0, 10], np.linspace(0, 10, 51)])
+def test_npy_sink(tmp_path, tspan):
+    y0 = np.array([0., 1.])
+    yp0 = np.array([0.1, -1.])
+
+    options = {'rtol': 1e-9, 'atol': 1e-12, 'eventsfn': eventsfn,
+               'num_events': 1}
+
+    soln = IDA(resfn, **options).solve(tspan, y0, yp0)
+
+    path = tmp_path / 'soln'
+    sink = NpySink(path, chunksize=7)
+    result = IDA(resfn, **options).solve(tspan, y0, yp0, output=sink)
+
+    assert result.status == soln.status
+    assert result.t == soln.t[-1]
+    npt.assert_allclose(result.y, soln.y[-1])
+
+    t = np.load(path / 't.npy', mmap_mode='r')
+    y = np.load(path / 'y.npy', mmap_mode='r')
+    yp = np.load(path / 'yp.npy', mmap_mode='r')
+
+    assert isinstance(y, np.memmap)
+    assert y.dtype == soln.y.dtype  # follows the solver precision
+    npt.assert_allclose(t, soln.t)
+    npt.assert_allclose(y, soln.y)
+    npt.assert_allclose(yp, soln.yp)
+
+    npt.assert_allclose(np.load(path / 't_events.npy'), soln.t_events)
+    npt.assert_allclose(np.load(path / 'y_events.npy'), soln.y_events)
+
+    # CVODE has no 'yp', and a path selects NpySink
+    soln = CVODE(rhsfn).solve(tspan, y0)
+    result = CVODE(rhsfn).solve(tspan, y0, output=tmp_path / 'cvode')
+
+    assert not os.path.exists(tmp_path / 'cvode' / 'yp.npy')
+    assert not os.path.exists(tmp_path / 'cvode' / 't_events.npy')
+    npt.assert_allclose(np.load(tmp_path / 'cvode' / 't.npy'), soln.t)
+    npt.assert_allclose(np.load(tmp_path / 'cvode' / 'y.npy'), soln.y)
+
+
+def test_hdf5_sink(tmp_path):
+    h5py = pytest.importorskip('h5py')
+
+    tspan = np.linspace(0, 10, 51)
+    y0 = np.array([0., 1.])
+
+    soln = CVODE(rhsfn).solve(tspan, y0)
+
+    path = tmp_path / 'soln.h5'
+    result = CVODE(rhsfn).solve(tspan, y0, output=str(path))
+
+    assert result.success
+    with h5py.File(path, 'r') as f:
+        npt.assert_allclose(f['t'][:], soln.t)
+        npt.assert_allclose(f['y'][:], soln.y)
+        assert f['y'].dtype == soln.y.dtype
+        assert 't_events' not in f
+
+
+def test_sink_errors(tmp_path):
+
+    class FailingSink(NpySink):
+        def _append(self, name, data):
+            raise OSError("Disk full.")
+
+    with pytest.raises(OSError, match="Disk full"):
+        _ = CVODE(rhsfn).solve([0, 10], [0, 1],
+                               output=FailingSink(tmp_path / 'soln'))
+
+    with pytest.raises(TypeError):
+        _ = CVODE(rhsfn).solve([0, 10], [0, 1], output=1)
+
+    with pytest.raises(TypeError):
+        _ = NpySink(tmp_path, chunksize=1.)
+
+    with pytest.raises(ValueError):
+        _ = NpySink(tmp_path, max_pending=0)
+
+    assert isinstance(_as_sink(tmp_path / 'soln'), NpySink)
+    assert isinstance(_as_sink(NpySink(tmp_path)), OutputSink)
+
+    try:
+        import h5py  # noqa: F401
+        assert isinstance(_as_sink(tmp_path / 'soln.hdf5'), HDF5Sink)
+    except ImportError:
+        with pytest.raises(ImportError):
+            _ = HDF5Sink(tmp_path / 'soln.h5')